@@ -1,14 +1,31 @@
-from dash import html, dash_table
-import pandas as pd
+from dash import html, Input, Output
 import dash
 import dash_bootstrap_components as dbc
 from components.navbars import navbar
+from components.tables import paged_table
+from core import catalog, compact, paging, schema, startup, store
+from core.metrics import callback
 
 
 # Register the page
 dash.register_page(__name__, path='/dataset', name="Dataset", order=1)
 
-df = pd.read_csv("datasets/matches/preprocessed_laliga2324_matches.csv", index_col=0)
+@startup.deferred("dataset table", version=store.matches_version)
+def table_frame(partition):
+    """Source columns of a partition's matches frame, with 'utc_time' formatted as in the CSV."""
+    df = store.load_matches(partition).drop(columns=store.DERIVED_COLUMNS)
+    return df.assign(utc_time=df['utc_time'].astype(str))
+
+@startup.deferred("memory report", version=store.matches_version)
+def memory_frame(partition):
+    """Bytes per column of a partition's matches frame as parsed and as kept in memory."""
+    return compact.matches_report(partition)
+
+# Header labels of the memory table
+memory_labels = {
+    'column': 'Column', 'dtype_before': 'Parsed As', 'dtype_after': 'Kept As',
+    'bytes_before': 'Bytes Parsed', 'bytes_after': 'Bytes Kept', 'saved': 'Saved %',
+}
 
 # Function to create a list item for each column's information
 def column_info_item(column_name, description, data_type):
@@ -18,132 +35,103 @@ def column_info_item(column_name, description, data_type):
         html.Span(f"({data_type})", className="text-success float-end")
     ])
 
-# Page layout
-layout = html.Div(
-    className="glassmorphism-container",
-    children=[
-        navbar,
-        html.Br(),
-        html.Br(),
-        dbc.Container([
-            dbc.Row(
-                dbc.Col(
-                    [
-                        html.H1("Dataset Structure", className="display-4 text-white text-center mt-4 mb-2"),
-                        html.P(
-                            "A detailed breakdown of the dataset used for the LaLiga 2023/24 season analysis.",
-                            className="lead text-white-50 text-center mb-5",
-                        ),
-                    ]
-                )
-            ),
-
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Identifiers", className="m-0")),
-                    dbc.CardBody(
-                        dbc.ListGroup(
-                            [
-                                column_info_item("round", "Match round number (1 to 38)", "integer"),
-                                column_info_item("home_team", "Name of the home team (e.g., 'Real Madrid', 'Barcelona')", "categorical"),
-                                column_info_item("away_team", "Name of the away team", "categorical"),
-                                column_info_item("utc_time", "Date and time of the match in UTC (e.g., '2023-08-11 17:30:00+00:00')", "datetime"),
-                            ],
-                            flush=True,
-                        )
-                    ),
-                ],
-                className="glass-card mb-4",
-            ),
-
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Match Outcomes", className="m-0")),
-                    dbc.CardBody(
-                        dbc.ListGroup(
-                            [
-                                column_info_item("full_time_home_team_goals", "Goals scored by the home team at full time", "integer"),
-                                column_info_item("full_time_away_team_goals", "Goals scored by the away team at full time", "integer"),
-                                column_info_item("full_time_result", "Match result at full time ('H' for home win, 'A' for away win, 'D' for draw)", "categorical"),
-                                column_info_item("half_time_home_team_goals", "Goals scored by the home team at half time", "integer"),
-                                column_info_item("half_time_away_team_goals", "Goals scored by the away team at half time", "integer"),
-                                column_info_item("half_time_result", "Match result at half time ('H' for home win, 'A' for away win, 'D' for draw)", "categorical"),
-                            ],
-                            flush=True,
-                        )
-                    ),
-                ],
-                className="glass-card mb-4",
-            ),
-
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Performance Metrics", className="m-0")),
-                    dbc.CardBody(
-                        dbc.ListGroup(
-                            [
-                                column_info_item("home_team_shots", "Total shots by the home team", "integer"),
-                                column_info_item("away_team_shots", "Total shots by the away team", "integer"),
-                                column_info_item("home_team_shots_on_target", "Shots on target by the home team", "integer"),
-                                column_info_item("away_team_shots_on_target", "Shots on target by the away team", "integer"),
-                                column_info_item("home_team_fouls_committed", "Fouls committed by the home team", "integer"),
-                                column_info_item("away_team_fouls_committed", "Fouls committed by the away team", "integer"),
-                                column_info_item("home_team_corners", "Corners won by the home team", "integer"),
-                                column_info_item("away_team_corners", "Corners won by the away team", "integer"),
-                            ],
-                            flush=True,
-                        )
-                    ),
-                ],
-                className="glass-card mb-4",
-            ),
+# Page layout, built on first visit rather than at import
+def layout(**kwargs):
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Dataset Structure", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "A detailed breakdown of the dataset used for the LaLiga 2023/24 season analysis.",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
 
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Disciplinary Stats", className="m-0")),
-                    dbc.CardBody(
-                        dbc.ListGroup(
-                            [
-                                column_info_item("home_team_yellow_cards", "Yellow cards received by the home team", "integer"),
-                                column_info_item("away_team_yellow_cards", "Yellow cards received by the away team", "integer"),
-                                column_info_item("home_team_red_cards", "Red cards received by the home team", "integer"),
-                                column_info_item("away_team_red_cards", "Red cards received by the away team", "integer"),
-                            ],
-                            flush=True,
-                        )
-                    ),
+                # One card per column group of the validated schema
+                *[
+                    dbc.Card(
+                        [
+                            dbc.CardHeader(html.H4(title, className="m-0")),
+                            dbc.CardBody(
+                                dbc.ListGroup(
+                                    [column_info_item(*column) for column in columns],
+                                    flush=True,
+                                )
+                            ),
+                        ],
+                        className="glass-card mb-4",
+                    )
+                    for title, columns in schema.MATCH_SCHEMA
                 ],
-                className="glass-card mb-4",
-            ),
             
                     
-            html.Br(),
+                html.Br(),
             
-            dash_table.DataTable(
-                data=df.to_dict("records"),
-                columns=[{"name": i, "id": i, "selectable": True} for i in df.columns],
-                
-                # Enables horizontal scrolling
-                style_table={'overflowX': 'auto'},
-                 
-                # Removes grid lines for a cleaner look 
-                style_as_list_view=True,
-                
-                # Glassmorphism style
-                style_cell={
-                    'padding': '10px',
-                    'backgroundColor': 'transparent',
-                    'color': 'white',
-                    'fontFamily': 'Montserrat, sans-serif',
-                },
-                style_header={
-                    'backgroundColor': 'rgba(255, 255, 255, 0.1)',
-                    'fontWeight': 'bold',
-                    'borderBottom': '1px solid rgba(255, 255, 255, 0.2)'
-                },
-                page_size=20,
-                selected_columns=[],
-            )
-    ]),
-    ]
-)
\ No newline at end of file
+                paged_table(
+                    'dataset-table',
+                    columns=[{"name": i, "id": i, "selectable": True} for i in schema.MATCH_COLUMN_TYPES],
+                ),
+
+                dbc.Card(
+                    [
+                        dbc.CardHeader(html.H4("Memory Footprint", className="m-0")),
+                        dbc.CardBody(html.P(id='dataset-memory-summary', className="text-white-50 mb-0")),
+                    ],
+                    className="glass-card mt-4 mb-4",
+                ),
+                paged_table(
+                    'dataset-memory-table',
+                    columns=[{"name": label, "id": column} for column, label in memory_labels.items()],
+                ),
+                html.Br(),
+        ]),
+        ]
+    )
+
+
+# Callback to serve the visible page of the matches table
+@callback(
+    Output('dataset-table', 'data'),
+    Output('dataset-table', 'page_count'),
+    Output('dataset-table', 'page_current'),
+    Input('dataset-table', 'page_current'),
+    Input('dataset-table', 'page_size'),
+    Input('dataset-table', 'sort_by'),
+    Input('dataset-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value'),
+)
+def update_dataset_table(page_current, page_size, sort_by, filter_query, refresh, partition):
+    df = table_frame(catalog.parse(partition))
+    return paging.query_page(df, page_current, page_size, sort_by, filter_query)
+
+
+# Memory saved per column by the compact dtypes
+@callback(
+    Output('dataset-memory-table', 'data'),
+    Output('dataset-memory-table', 'page_count'),
+    Output('dataset-memory-table', 'page_current'),
+    Output('dataset-memory-summary', 'children'),
+    Input('dataset-memory-table', 'page_current'),
+    Input('dataset-memory-table', 'page_size'),
+    Input('dataset-memory-table', 'sort_by'),
+    Input('dataset-memory-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value'),
+)
+def update_memory_table(page_current, page_size, sort_by, filter_query, refresh, partition):
+    report = memory_frame(catalog.parse(partition))
+    total = report.iloc[-1]
+    data, page_count, page_current = paging.query_page(report.iloc[:-1], page_current, page_size, sort_by, filter_query)
+    summary = (f"The matches table takes {total['bytes_after']:,} bytes in memory instead of "
+               f"{total['bytes_before']:,} as parsed ({total['saved']:.1f}% saved).")
+    return data, page_count, page_current, summary
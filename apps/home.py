@@ -17,6 +17,7 @@ layout = html.Div([
             dcc.Link("Dataset", href="/dataset", className="btn btn-outline-light m-2 custom-btn"),
             dcc.Link("Stats", href="/stats", className="btn btn-outline-light m-2 custom-btn"),
             dcc.Link("Visualization", href="/visualization", className="btn btn-outline-light m-2 custom-btn"),
+            dcc.Link("Standings", href="/standings", className="btn btn-outline-light m-2 custom-btn"),
         ], className="text-center mb-5"),
     ], className="d-flex flex-column justify-content-center align-items-center vh-100 text-white", style={'background': 'linear-gradient(135deg, #1a2a6c, #b21f1f, #fdbb2d)'}),
 ])
\ No newline at end of file
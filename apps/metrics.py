@@ -0,0 +1,97 @@
+import dash
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+import pandas as pd
+from components.figures import px, style_figure
+from components.navbars import navbar
+from components.tables import paged_table
+from core import metrics, paging, settings
+from core.metrics import callback
+
+# Internal page; not linked from the navbar
+dash.register_page(__name__, path='/metrics', name="Metrics", order=99)
+
+summary_columns = ['callback', 'calls', 'errors', 'prevented', 'p50_ms', 'p90_ms', 'p99_ms',
+                   'pandas_ms', 'plotly_ms', 'serialization_ms', 'mean_kb', 'max_kb']
+
+
+# Page layout, built on each visit
+def layout(**kwargs):
+    if settings.METRICS:
+        notice = html.P(
+            "Percentiles cover the most recent calls of each callback; phase columns are means per call. "
+            "A Prometheus scraper can read the same data from /metrics/prometheus.",
+            className="lead text-white-50 text-center mb-5",
+        )
+    else:
+        notice = dbc.Alert(
+            "Callback instrumentation is off. Start the app with LALIGA_METRICS=1 to record metrics.",
+            color="warning",
+            className="text-center mb-5",
+        )
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Callback Metrics", className="display-4 text-white text-center mt-4 mb-2"),
+                            notice,
+                        ]
+                    )
+                ),
+                paged_table(
+                    'metrics-table',
+                    columns=[{"name": c, "id": c} for c in summary_columns],
+                    page_size=25,
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Latency distribution of:", className="text-white"),
+                        dcc.Dropdown(id='metrics-callback-dropdown', options=[], placeholder="Select a callback"),
+                        dcc.Graph(id='metrics-histogram-graph', figure={}),
+                    ]),
+                    className="glass-card mt-4 mb-4",
+                ),
+                dcc.Interval(id='metrics-interval', interval=5000),
+            ])
+        ]
+    )
+
+
+# Callbacks
+
+@callback(
+    Output('metrics-table', 'data'),
+    Output('metrics-table', 'page_count'),
+    Output('metrics-table', 'page_current'),
+    Output('metrics-callback-dropdown', 'options'),
+    Input('metrics-interval', 'n_intervals'),
+    Input('metrics-table', 'page_current'),
+    Input('metrics-table', 'page_size'),
+    Input('metrics-table', 'sort_by'),
+    Input('metrics-table', 'filter_query'),
+)
+def update_metrics_table(n_intervals, page_current, page_size, sort_by, filter_query):
+    summary = pd.DataFrame(metrics.registry.summary(), columns=summary_columns)
+    data, page_count, page_current = paging.query_page(summary, page_current, page_size, sort_by, filter_query)
+    options = [{'label': name, 'value': name} for name in summary['callback']]
+    return data, page_count, page_current, options
+
+
+@callback(
+    Output('metrics-histogram-graph', 'figure'),
+    Input('metrics-callback-dropdown', 'value'),
+    Input('metrics-interval', 'n_intervals'),
+)
+def update_metrics_histogram(name, n_intervals):
+    if not name:
+        return {}
+    walls, _ = metrics.registry.recent(name)
+    fig = px.histogram(x=walls, nbins=30, title="Wall Time of Recent Calls", labels={'x': 'Wall time (ms)'})
+    return style_figure(fig)
@@ -0,0 +1,203 @@
+import dash
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+from components.figures import go, style_figure
+from components.navbars import navbar
+from components.tables import paged_table
+from core import catalog, paging, settings, similarity, startup
+from core.metrics import callback
+
+# Register the page
+dash.register_page(__name__, path='/similarity', name="Similarity", order=8)
+
+# Columns of the similar players table
+table_columns = [
+    {'name': 'Player', 'id': 'Player'},
+    {'name': 'Team', 'id': 'Team'},
+    {'name': 'Season', 'id': 'Season'},
+    {'name': 'Country', 'id': 'Country'},
+    {'name': 'Minutes', 'id': 'Minutes'},
+    {'name': 'Similarity', 'id': 'similarity'},
+]
+
+# Metrics shown in the profile chart: the ones where the selected player stands out most
+PROFILE_METRICS = 12
+
+
+def player_options(index):
+    labels = [
+        f"{player} ({team}, {catalog.parse(partition).label})"
+        for partition, player, team in zip(index.players['partition'], index.players['Player'], index.players['Team'])
+    ]
+    return [{'label': label, 'value': key} for label, key in zip(labels, index.keys)]
+
+
+def default_player(index, partition=None):
+    """The player with the most minutes in a partition, or None when it has no players."""
+    players = index.players[index.players['partition'] == catalog.parse(partition).key]
+    if players.empty:
+        return None
+    return index.keys[players['Minutes'].idxmax()]
+
+
+# Page layout, built on first visit rather than at import
+def layout(**kwargs):
+    index = similarity.load_index()
+    max_minutes = int(index.players['Minutes'].max()) if len(index) else settings.SIMILARITY_MIN_MINUTES
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Player Similarity", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "Find the players whose per-90 statistics are most like a chosen player's, across every league and season.",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H5("Player:", className="text-white"),
+                                dcc.Dropdown(
+                                    id='similarity-player-dropdown',
+                                    options=player_options(index),
+                                    value=default_player(index),
+                                    clearable=False,
+                                ),
+                            ], width=6),
+                            dbc.Col([
+                                html.H5("Search In:", className="text-white"),
+                                dcc.Dropdown(
+                                    id='similarity-partition-dropdown',
+                                    options=catalog.dropdown_options(),
+                                    value=[],
+                                    multi=True,
+                                    placeholder="All leagues and seasons",
+                                ),
+                            ], width=6),
+                        ], className="mb-3"),
+                        dbc.Row([
+                            dbc.Col([
+                                html.H5("Minimum Minutes:", className="text-white"),
+                                dcc.Slider(
+                                    id='similarity-minutes-slider',
+                                    min=settings.SIMILARITY_MIN_MINUTES,
+                                    max=max(max_minutes, settings.SIMILARITY_MIN_MINUTES),
+                                    step=90,
+                                    value=settings.SIMILARITY_MIN_MINUTES,
+                                    marks=None,
+                                    tooltip={'placement': 'bottom', 'always_visible': True},
+                                ),
+                            ], width=6),
+                            dbc.Col([
+                                html.H5("Number of Players:", className="text-white"),
+                                dcc.Slider(
+                                    id='similarity-count-slider',
+                                    min=5,
+                                    max=50,
+                                    step=5,
+                                    value=20,
+                                    marks={n: str(n) for n in range(5, 51, 5)},
+                                ),
+                            ], width=6),
+                        ]),
+                    ]),
+                    className="glass-card mb-4",
+                    style={'zIndex': 10, 'position': 'relative'},
+                ),
+                paged_table('similarity-table', columns=table_columns),
+                html.Br(),
+                dbc.Card(
+                    dbc.CardBody([
+                        dcc.Graph(id='similarity-profile-graph', figure={}),
+                    ]),
+                    className="glass-card mt-4 mb-4",
+                ),
+            ])
+        ]
+    )
+
+
+# Callbacks
+
+# The selected player follows the navbar's league/season
+@callback(
+    Output('similarity-player-dropdown', 'value'),
+    Input('partition-dropdown', 'value')
+)
+def update_similarity_player(partition):
+    return default_player(similarity.load_index(), partition)
+
+
+def similar_players(key, partitions, min_minutes, count):
+    """The most similar players to `key`, with the partition shown as a season label."""
+    neighbours = similarity.load_index().neighbours(key, count or 20, partitions, min_minutes)
+    seasons = [catalog.parse(partition).label for partition in neighbours['partition']]
+    return neighbours.drop(columns='partition').assign(Season=seasons)
+
+
+@callback(
+    Output('similarity-table', 'data'),
+    Output('similarity-table', 'page_count'),
+    Output('similarity-table', 'page_current'),
+    Input('similarity-player-dropdown', 'value'),
+    Input('similarity-partition-dropdown', 'value'),
+    Input('similarity-minutes-slider', 'value'),
+    Input('similarity-count-slider', 'value'),
+    Input('similarity-table', 'page_current'),
+    Input('similarity-table', 'page_size'),
+    Input('similarity-table', 'sort_by'),
+    Input('similarity-table', 'filter_query'),
+    Input('stats-refresh', 'data'),
+)
+def update_similarity_table(key, partitions, min_minutes, count, page_current, page_size, sort_by, filter_query, refresh):
+    if not key:
+        return [], 1, 0
+    neighbours = similar_players(key, partitions, min_minutes, count)
+    return paging.query_page(neighbours, page_current, page_size, sort_by, filter_query)
+
+
+# Standardized profile of the selected player next to the closest match
+@callback(
+    Output('similarity-profile-graph', 'figure'),
+    Input('similarity-player-dropdown', 'value'),
+    Input('similarity-partition-dropdown', 'value'),
+    Input('similarity-minutes-slider', 'value'),
+    Input('stats-refresh', 'data'),
+)
+def update_similarity_profile(key, partitions, min_minutes, refresh):
+    index = similarity.load_index()
+    if not key or index.position(key) < 0:
+        return {}
+    best = index.neighbours(key, 1, partitions, min_minutes)
+    keys = [key] + [similarity.player_key(*row) for row in best[['partition', 'Player', 'Team']].itertuples(index=False)]
+    profile = index.profile(keys)
+    profile = profile.loc[profile[key].abs().sort_values(ascending=False).index[:PROFILE_METRICS]].iloc[::-1]
+
+    fig = go.Figure([
+        go.Bar(y=profile.index, x=profile[k], name=k.split('|')[1], orientation='h')
+        for k in keys
+    ])
+    fig.update_layout(
+        title="Standardized Profile vs. Closest Match",
+        barmode='group',
+        height=600,
+        xaxis_title="Standard deviations from the average player",
+    )
+    return style_figure(fig)
+
+
+@startup.on_warmup("similarity")
+def warm_similarity():
+    """Builds the similarity index ahead of the first visit."""
+    similarity.load_index()
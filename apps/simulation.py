@@ -0,0 +1,142 @@
+import dash
+from dash import dcc, html, ctx, no_update, Input, Output
+import dash_bootstrap_components as dbc
+from components.figures import px, style_figure
+from components.navbars import navbar
+from components.tables import paged_table
+from core import catalog, paging, simulation, standings
+from core.metrics import callback
+
+# Register the page
+dash.register_page(__name__, path='/simulation', name="Simulation", order=7)
+
+# Header labels of the simulated table columns
+column_labels = {
+    'team': 'Team', 'points': 'Pts', 'expected_points': 'Expected Pts', 'attack': 'Attack', 'defence': 'Defence',
+    'title': 'Title %', 'europe': f'Top {simulation.EUROPE_PLACES} %', 'relegation': 'Relegation %',
+}
+PERCENT_COLUMNS = ['title', 'europe', 'relegation']
+
+
+def round_marks(rounds):
+    return {int(r): str(r) for r in rounds[::5]}
+
+
+def slider_range(partition=None):
+    """Rounds the simulation can start after (0 is before the first match), and the default: mid-season."""
+    rounds = standings.load_standings(partition).rounds
+    last = int(rounds[-1]) if len(rounds) else 0
+    return 0, last, last // 2, round_marks([0, *rounds])
+
+
+# Page layout, built on first visit rather than at import
+def layout(**kwargs):
+    # Controls for the default partition; the callbacks below follow the navbar selection
+    low, high, value, marks = slider_range()
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Season Simulator", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "Play out the rest of the season many times over from any round, with team strengths fitted on the results so far.",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Simulate From After Round:", className="text-white"),
+                        dcc.Slider(id='simulation-round-slider', min=low, max=high, step=1, value=value, marks=marks),
+                        html.P(id='simulation-summary', className="text-white-50 mt-3 mb-0"),
+                    ]),
+                    className="glass-card mb-4",
+                ),
+                dcc.Loading(
+                    paged_table(
+                        'simulation-table',
+                        columns=[{"name": label, "id": column} for column, label in column_labels.items()],
+                        page_size=20,
+                    ),
+                    type="circle",
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        dcc.Loading(dcc.Graph(id='simulation-position-graph', figure={}), type="circle"),
+                    ]),
+                    className="glass-card mt-4 mb-4",
+                ),
+            ])
+        ]
+    )
+
+
+# Callbacks
+
+# The round slider follows the selected partition
+@callback(
+    Output('simulation-round-slider', 'min'),
+    Output('simulation-round-slider', 'max'),
+    Output('simulation-round-slider', 'value'),
+    Output('simulation-round-slider', 'marks'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_simulation_slider(refresh, partition):
+    low, high, value, marks = slider_range(catalog.parse(partition))
+    # New results keep the chosen starting round
+    return low, high, no_update if ctx.triggered_id == 'matches-refresh' else value, marks
+
+
+@callback(
+    Output('simulation-table', 'data'),
+    Output('simulation-table', 'page_count'),
+    Output('simulation-table', 'page_current'),
+    Output('simulation-summary', 'children'),
+    Input('simulation-round-slider', 'value'),
+    Input('simulation-table', 'page_current'),
+    Input('simulation-table', 'page_size'),
+    Input('simulation-table', 'sort_by'),
+    Input('simulation-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_simulation_table(after_round, page_current, page_size, sort_by, filter_query, refresh, partition):
+    sim = simulation.load_simulation(catalog.parse(partition), after_round or 0)
+    table = sim.summary()
+    table[PERCENT_COLUMNS] = (table[PERCENT_COLUMNS] * 100).round(1)
+    data, page_count, page_current = paging.query_page(table, page_current, page_size, sort_by, filter_query)
+    summary = (f"{sim.trials:,} simulated seasons of the {sim.remaining} matches left after round {sim.after_round}. "
+               f"Home advantage: {sim.home_factor:.2f}x the away side's scoring rate.")
+    return data, page_count, page_current, summary
+
+
+# Probability of every team finishing in every position
+@callback(
+    Output('simulation-position-graph', 'figure'),
+    Input('simulation-round-slider', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_simulation_positions(after_round, refresh, partition):
+    sim = simulation.load_simulation(catalog.parse(partition), after_round or 0)
+    probabilities = sim.position_probabilities().loc[sim.summary()['team']] * 100
+    fig = px.imshow(
+        probabilities,
+        text_auto='.0f',
+        aspect='auto',
+        color_continuous_scale='Blues',
+        title="Finishing Position Probabilities (%)",
+        labels={'x': 'Position', 'y': 'Team', 'color': '%'},
+    )
+    fig.update_layout(height=700)
+    fig.update_xaxes(dtick=1, side='top')
+    return style_figure(fig)
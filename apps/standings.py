@@ -0,0 +1,179 @@
+import dash
+from dash import dcc, html, ctx, no_update, Input, Output, State
+import dash_bootstrap_components as dbc
+from components.figures import px, style_figure
+from components.navbars import navbar
+from components.tables import paged_table
+from core import catalog, paging, standings, startup
+from core.metrics import callback
+
+# Register the page
+dash.register_page(__name__, path='/standings', name="Standings", order=5)
+
+# Header labels of the standings table columns
+column_labels = {
+    'position': 'Pos', 'team': 'Team', 'played': 'P', 'won': 'W', 'drawn': 'D', 'lost': 'L',
+    'goals_for': 'GF', 'goals_against': 'GA', 'goal_difference': 'GD', 'points': 'Pts', 'form': 'Form',
+}
+
+
+def round_marks(rounds):
+    return {int(r): str(r) for r in rounds[::5]}
+
+
+# Page layout, built on first visit rather than at import
+def layout(**kwargs):
+    # Controls for the default partition; the callbacks below follow the navbar selection
+    table = standings.load_standings()
+    rounds = table.rounds
+    top_teams = list(table.table()['team'][:4])
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("League Standings", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "Follow the league table round by round, overall or for home and away matches only.",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H5("Table After Round:", className="text-white"),
+                                dcc.Slider(
+                                    id='standings-round-slider',
+                                    min=int(rounds[0]),
+                                    max=int(rounds[-1]),
+                                    step=1,
+                                    value=int(rounds[-1]),
+                                    marks=round_marks(rounds),
+                                ),
+                            ], width=8),
+                            dbc.Col([
+                                html.H5("Matches:", className="text-white"),
+                                dbc.RadioItems(
+                                    id='standings-venue-radio',
+                                    options=[
+                                        {'label': 'All', 'value': 'all'},
+                                        {'label': 'Home', 'value': 'home'},
+                                        {'label': 'Away', 'value': 'away'},
+                                    ],
+                                    value='all',
+                                    inline=True,
+                                    className="text-white",
+                                ),
+                            ], width=4),
+                        ]),
+                    ]),
+                    className="glass-card mb-4",
+                ),
+                paged_table(
+                    'standings-table',
+                    columns=[{"name": column_labels[c], "id": c} for c in standings.TABLE_COLUMNS],
+                    page_size=len(table.teams),
+                ),
+                html.Br(),
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Position Over the Season:", className="text-white"),
+                        dcc.Dropdown(
+                            id='standings-team-dropdown',
+                            options=[{'label': team, 'value': team} for team in table.teams],
+                            value=top_teams,
+                            multi=True,
+                        ),
+                        dcc.Graph(id='standings-position-graph', figure={}),
+                    ]),
+                    className="glass-card mt-4 mb-4",
+                ),
+            ])
+        ]
+    )
+
+
+# Callbacks
+
+# Round and team controls follow the selected partition
+@callback(
+    Output('standings-round-slider', 'min'),
+    Output('standings-round-slider', 'max'),
+    Output('standings-round-slider', 'value'),
+    Output('standings-round-slider', 'marks'),
+    Output('standings-team-dropdown', 'options'),
+    Output('standings-team-dropdown', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value'),
+    State('standings-round-slider', 'value'),
+    State('standings-round-slider', 'max')
+)
+def update_standings_controls(refresh, partition, round_value, round_max):
+    table = standings.load_standings(catalog.parse(partition))
+    rounds = table.rounds
+    options = [{'label': team, 'value': team} for team in table.teams]
+    if ctx.triggered_id == 'matches-refresh':
+        # New rounds move the slider along only if it was showing the latest one
+        value = int(rounds[-1]) if round_value == round_max else no_update
+        return int(rounds[0]), int(rounds[-1]), value, round_marks(rounds), options, no_update
+    top_teams = list(table.table()['team'][:4])
+    return int(rounds[0]), int(rounds[-1]), int(rounds[-1]), round_marks(rounds), options, top_teams
+
+
+# The table after the selected round is a lookup into the materialized standings
+@callback(
+    Output('standings-table', 'data'),
+    Output('standings-table', 'page_count'),
+    Output('standings-table', 'page_current'),
+    Input('standings-round-slider', 'value'),
+    Input('standings-venue-radio', 'value'),
+    Input('standings-table', 'page_current'),
+    Input('standings-table', 'page_size'),
+    Input('standings-table', 'sort_by'),
+    Input('standings-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_standings_table(round_value, venue, page_current, page_size, sort_by, filter_query, refresh, partition):
+    table = standings.load_standings(catalog.parse(partition)).table(round_value, venue or 'all')
+    return paging.query_page(table, page_current, page_size, sort_by, filter_query)
+
+
+@callback(
+    Output('standings-position-graph', 'figure'),
+    Input('standings-team-dropdown', 'value'),
+    Input('standings-venue-radio', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_position_chart(teams, venue, refresh, partition):
+    if not teams:
+        return {}
+    table = standings.load_standings(catalog.parse(partition))
+    positions = table.positions(venue or 'all')[teams]
+    fig = px.line(
+        positions,
+        x=positions.index,
+        y=teams,
+        title="League Position by Round",
+        labels={'value': 'Position', 'variable': 'Team', 'round': 'Round'},
+        markers=True,
+    )
+    # Position 1 at the top
+    fig.update_yaxes(autorange='reversed', dtick=1)
+    return style_figure(fig)
+
+
+@startup.on_warmup("standings")
+def warm_standings():
+    """Materializes the default partition's standings ahead of the first visit."""
+    standings.load_standings()
@@ -1,17 +1,16 @@
 import os
 import dash
-from dash import dcc, html, dash_table, callback, Input, Output
+from dash import dcc, html, ctx, no_update, Input, Output, State
 import dash_bootstrap_components as dbc
-import pandas as pd
 import glob  # Used to find files
 from components.navbars import navbar
-import os
+from components.tables import paged_table
+from core import catalog, jobs, paging, store
+from core.metrics import callback
 
 
 dash.register_page(__name__, path='/stats', name="Stats", order=3)
 
-csv_files = glob.glob('datasets/stats/*.csv')
-
 # Label the dropdown options based on the CSV filenames
 def format_label(filepath):
     """Takes a full file path and returns a formatted label."""
@@ -20,7 +19,12 @@ def format_label(filepath):
     formatted_label = name_without_ext.replace('_', ' ').title()
     return formatted_label
 
-dropdown_options = [{'label': format_label(f), 'value': f} for f in csv_files]
+def stats_options(partition=None):
+    """Dropdown options for every stats file of a league/season partition."""
+    csv_files = sorted(glob.glob(os.path.join(catalog.stats_dir(partition), '*.csv')))
+    return [{'label': format_label(f), 'value': f} for f in csv_files]
+
+dropdown_options = stats_options()
 
 # Page Layout
 layout = html.Div(
@@ -56,53 +60,92 @@ layout = html.Div(
                 className="glass-card mb-4",
                 style={'zIndex': 10, 'position': 'relative'} # zIndex ensures dropdown menu is on top
             ),
-            html.Div(id='table-container'),
+            # Progress of the file being prepared, shown while its job runs
+            html.Div(id='stats-progress-row', className="mb-4", style={'display': 'none'}, children=[
+                dbc.Progress(id='stats-progress', value=0, striped=True, animated=True, className="flex-grow-1 me-3"),
+                dbc.Button("Cancel", id='stats-cancel-button', color="light", outline=True, size="sm"),
+            ]),
+            dcc.Store(id='stats-ready'),
+            html.Div(id='table-container', children=[
+                html.Div(id='table-message'),
+                paged_table('stats-table'),
+            ]),
         ])
     ]
 )
 
 
-# Callback to load and display the selected table
+# Callback to list the stats files of the selected league/season
 @callback(
-    Output('table-container', 'children'),
-    Input('csv-dropdown', 'value')
+    Output('csv-dropdown', 'options'),
+    Output('csv-dropdown', 'value'),
+    Input('stats-refresh', 'data'),
+    Input('partition-dropdown', 'value'),
+    State('csv-dropdown', 'value')
 )
-def update_table(selected_filename):
-    if not selected_filename:
-        return html.Div("Please select a file to view.", className="p-4 text-white")
+def update_file_options(refresh, partition, selected_filename):
+    options = stats_options(partition)
+    # Files added or removed while the page is open keep the current choice if it still exists
+    if ctx.triggered_id == 'stats-refresh' and selected_filename in [option['value'] for option in options]:
+        return options, no_update
+    return options, options[0]['value'] if options else None
 
+
+# Callback to parse the selected file into its columnar cache, as a background
+# job with progress and cancellation when LALIGA_BACKGROUND=1
+@jobs.background_callback(
+    Output('stats-ready', 'data'),
+    Input('csv-dropdown', 'value'),
+    progress=[Output('stats-progress', 'value'), Output('stats-progress', 'label')],
+    cancel=[Input('stats-cancel-button', 'n_clicks')],
+    running=[(Output('stats-progress-row', 'style'), {'display': 'flex', 'alignItems': 'center'}, {'display': 'none'})],
+)
+def prepare_stats_table(set_progress, selected_filename):
+    if not selected_filename:
+        return None
     try:
-        # Read the selected CSV file into a pandas DataFrame
-        df = pd.read_csv(selected_filename)
-        
-        # Create the DataTable
-        table = dash_table.DataTable(
-            data=df.to_dict("records"),
-            columns=[{"name": i, "id": i, "selectable": True} for i in df.columns],
-            
-            # Enables horizontal scrolling
-            style_table={'overflowX': 'auto'},
-            
-            # Removes grid lines for a cleaner look 
-            style_as_list_view=True,
-            
-            # Glassmorphism style
-            style_cell={
-                'padding': '10px',
-                'backgroundColor': 'transparent',
-                'color': 'white',
-                'fontFamily': 'Montserrat, sans-serif'
-            },
-            style_header={
-                'backgroundColor': 'rgba(255, 255, 255, 0.1)',
-                'fontWeight': 'bold',
-                'borderBottom': '1px solid rgba(255, 255, 255, 0.2)'
-            },
-            page_size=20,
-            selected_columns=[],
+        version = store.prepare_table(
+            selected_filename,
+            progress=lambda fraction: set_progress([round(100 * fraction), f"{fraction:.0%}"]),
         )
-        return table
-        
+    except Exception as e:
+        return {'path': selected_filename, 'error': str(e)}
+    return {'path': selected_filename, 'version': version}
+
+
+# Callback to load the prepared table and serve the visible page of it
+@callback(
+    Output('stats-table', 'columns'),
+    Output('stats-table', 'data'),
+    Output('stats-table', 'page_count'),
+    Output('stats-table', 'page_current'),
+    Output('stats-table', 'sort_by'),
+    Output('stats-table', 'filter_query'),
+    Output('table-message', 'children'),
+    Input('stats-ready', 'data'),
+    Input('stats-table', 'page_current'),
+    Input('stats-table', 'page_size'),
+    Input('stats-table', 'sort_by'),
+    Input('stats-table', 'filter_query'),
+    Input('stats-refresh', 'data'),
+)
+def update_table(ready, page_current, page_size, sort_by, filter_query, refresh):
+    if not ready:
+        return [], [], 1, 0, [], '', html.Div("Please select a file to view.", className="p-4 text-white")
+    if ready.get('error'):
+        return [], [], 1, 0, [], '', html.Div(f"Error loading file: {ready['error']}", className="p-4 text-danger")
+
+    # A new file starts again from the first page, unsorted and unfiltered
+    if ctx.triggered_id == 'stats-ready':
+        page_current, sort_by, filter_query = 0, [], ''
+
+    try:
+        # Served from the LRU cache; sorting and filtering run on the cached frame
+        df = store.load_stats_table(ready['path'])
+        data, page_count, page_current = paging.query_page(df, page_current, page_size, sort_by, filter_query)
+        columns = [{"name": i, "id": i, "selectable": True} for i in df.columns]
+        return columns, data, page_count, page_current, sort_by, filter_query, None
+
     except Exception as e:
         # Handle potential errors like a file not being found or unreadable
-        return html.Div(f"Error loading file: {e}", className="p-4 text-danger")
\ No newline at end of file
+        return [], [], 1, 0, [], '', html.Div(f"Error loading file: {e}", className="p-4 text-danger")
@@ -0,0 +1,217 @@
+import dash
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+from components.figures import px, style_figure
+from components.navbars import navbar
+from components.tables import paged_table
+from core import catalog, paging, startup, teams
+from core.metrics import callback
+
+# Register the page
+dash.register_page(__name__, path='/teams', name="Teams", order=6)
+
+# Header labels of the split and head-to-head tables
+column_labels = {
+    'venue': 'Matches', 'played': 'P', 'W': 'W', 'D': 'D', 'L': 'L', 'points': 'Pts/Game',
+    'goals_for': 'GF/Game', 'goals_against': 'GA/Game', 'shots_for': 'Shots/Game', 'shots_against': 'Shots Against/Game',
+}
+h2h_labels = {
+    'round': 'Round', 'utc_time': 'Date', 'venue': 'Venue', 'result': 'Result',
+    'goals_for': 'GF', 'goals_against': 'GA', 'shots_for': 'Shots', 'shots_against': 'Shots Against',
+}
+
+# Rolling averages drawn on the form chart
+FORM_METRICS = {'points': 'Points', 'goals_for': 'Goals For', 'goals_against': 'Goals Against'}
+
+
+def team_options(index):
+    return [{'label': team, 'value': team} for team in index.teams]
+
+
+# Page layout, built on first visit rather than at import
+def layout(**kwargs):
+    # Controls for the default partition; the callbacks below follow the navbar selection
+    index = teams.load_index()
+    options = team_options(index)
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Team Drill-Down", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "Home and away records, recent form and head-to-head results of any team.",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H5("Team:", className="text-white"),
+                                dcc.Dropdown(id='teams-team-dropdown', options=options,
+                                             value=index.teams[0] if index.teams else None, clearable=False),
+                            ], width=4),
+                            dbc.Col([
+                                html.H5("Form Over Last:", className="text-white"),
+                                dcc.Slider(id='teams-form-slider', min=3, max=10, step=1, value=5,
+                                           marks={n: f"{n} games" if n in (3, 10) else str(n) for n in range(3, 11)}),
+                            ], width=5),
+                            dbc.Col([
+                                html.H5("Matches:", className="text-white"),
+                                dbc.RadioItems(
+                                    id='teams-venue-radio',
+                                    options=[
+                                        {'label': 'All', 'value': 'all'},
+                                        {'label': 'Home', 'value': 'home'},
+                                        {'label': 'Away', 'value': 'away'},
+                                    ],
+                                    value='all',
+                                    inline=True,
+                                    className="text-white",
+                                ),
+                            ], width=3),
+                        ]),
+                        html.P(id='teams-form-summary', className="text-white-50 mt-3 mb-0"),
+                    ]),
+                    className="glass-card mb-4",
+                    style={'zIndex': 10, 'position': 'relative'},
+                ),
+                paged_table(
+                    'teams-split-table',
+                    columns=[{"name": column_labels[c], "id": c} for c in column_labels],
+                    page_size=len(teams.VENUES),
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        dcc.Graph(id='teams-form-graph', figure={}),
+                    ]),
+                    className="glass-card mt-4 mb-4",
+                ),
+                dbc.Card(
+                    dbc.CardBody([
+                        html.H5("Head-to-Head Against:", className="text-white"),
+                        dcc.Dropdown(id='teams-opponent-dropdown', options=options,
+                                     value=index.teams[1] if len(index.teams) > 1 else None, clearable=False),
+                        html.P(id='teams-h2h-summary', className="text-white-50 mt-3 mb-0"),
+                    ]),
+                    className="glass-card mb-4",
+                    style={'zIndex': 9, 'position': 'relative'},
+                ),
+                paged_table(
+                    'teams-h2h-table',
+                    columns=[{"name": h2h_labels[c], "id": c} for c in h2h_labels],
+                ),
+                html.Br(),
+            ])
+        ]
+    )
+
+
+# Callbacks
+
+# Team lists follow the selected partition
+@callback(
+    Output('teams-team-dropdown', 'options'),
+    Output('teams-team-dropdown', 'value'),
+    Output('teams-opponent-dropdown', 'options'),
+    Output('teams-opponent-dropdown', 'value'),
+    Input('partition-dropdown', 'value')
+)
+def update_team_controls(partition):
+    index = teams.load_index(catalog.parse(partition))
+    options = team_options(index)
+    team = index.teams[0] if index.teams else None
+    opponent = index.teams[1] if len(index.teams) > 1 else None
+    return options, team, options, opponent
+
+
+@callback(
+    Output('teams-split-table', 'data'),
+    Output('teams-split-table', 'page_count'),
+    Output('teams-split-table', 'page_current'),
+    Output('teams-form-summary', 'children'),
+    Input('teams-team-dropdown', 'value'),
+    Input('teams-form-slider', 'value'),
+    Input('teams-venue-radio', 'value'),
+    Input('teams-split-table', 'page_current'),
+    Input('teams-split-table', 'page_size'),
+    Input('teams-split-table', 'sort_by'),
+    Input('teams-split-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_team_split(team, n, venue, page_current, page_size, sort_by, filter_query, refresh, partition):
+    index = teams.load_index(catalog.parse(partition))
+    if team not in index.teams:
+        return [], 1, 0, ""
+    data, page_count, page_current = paging.query_page(index.split(team), page_current, page_size, sort_by, filter_query)
+    venue = venue or 'all'
+    where = "" if venue == 'all' else f" {venue}"
+    return data, page_count, page_current, f"Last {n}{where} games, oldest first: {index.form(team, n, venue) or '-'}"
+
+
+@callback(
+    Output('teams-form-graph', 'figure'),
+    Input('teams-team-dropdown', 'value'),
+    Input('teams-form-slider', 'value'),
+    Input('teams-venue-radio', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_team_form(team, n, venue, refresh, partition):
+    index = teams.load_index(catalog.parse(partition))
+    if team not in index.teams:
+        return {}
+    rolling = index.rolling(team, n, venue or 'all', list(FORM_METRICS))
+    fig = px.line(
+        rolling,
+        x='round',
+        y=list(FORM_METRICS),
+        title=f"{team}: Average over the Last {n} Games",
+        labels={'round': 'Round', 'value': 'Per Game', 'variable': 'Metric'},
+        hover_data=['opponent', 'venue', 'result'],
+        markers=True,
+    )
+    fig.for_each_trace(lambda trace: trace.update(name=FORM_METRICS[trace.name]))
+    return style_figure(fig)
+
+
+@callback(
+    Output('teams-h2h-table', 'data'),
+    Output('teams-h2h-table', 'page_count'),
+    Output('teams-h2h-table', 'page_current'),
+    Output('teams-h2h-summary', 'children'),
+    Input('teams-team-dropdown', 'value'),
+    Input('teams-opponent-dropdown', 'value'),
+    Input('teams-h2h-table', 'page_current'),
+    Input('teams-h2h-table', 'page_size'),
+    Input('teams-h2h-table', 'sort_by'),
+    Input('teams-h2h-table', 'filter_query'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_head_to_head(team, opponent, page_current, page_size, sort_by, filter_query, refresh, partition):
+    index = teams.load_index(catalog.parse(partition))
+    if team not in index.teams or opponent not in index.teams or team == opponent:
+        return [], 1, 0, "Select two different teams."
+    games, record = index.head_to_head(team, opponent)
+    games = games[list(h2h_labels)].astype({'venue': str, 'result': str})
+    data, page_count, page_current = paging.query_page(games, page_current, page_size, sort_by, filter_query)
+    summary = (f"{team} vs {opponent}: {record['W']} won, {record['D']} drawn, {record['L']} lost, "
+               f"goals {record['goals_for']}-{record['goals_against']}.")
+    return data, page_count, page_current, summary
+
+
+@startup.on_warmup("teams")
+def warm_teams():
+    """Builds the default partition's team index ahead of the first visit."""
+    teams.load_index()
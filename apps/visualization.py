@@ -1,326 +1,745 @@
+import itertools
+import os
 import dash
-from dash import dcc, html, callback, Input, Output
+from dash import dcc, html, clientside_callback, ctx, no_update, ClientsideFunction, Input, Output, State
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.express as px
+from components.figures import go, px, style_figure
 from components.navbars import navbar
+from core import catalog, columnar, correlation, cube, downsample, figcache, selection, settings, startup, store, trendlines, watcher
+from core.metrics import callback
 
 # Register the new page
 dash.register_page(__name__, path='/visualization', name="Visualization", order=4)
 
-# Load data
-df = pd.read_csv("datasets/matches/preprocessed_laliga2324_matches.csv", index_col=0)
+# Column types for dropdowns
+categorical_cols = selection.CATEGORY_COLUMNS
+group_by_cols = ['round', 'day_of_week', 'month_name']
 
-# Convert 'utc_time' to datetime format
-df['utc_time'] = pd.to_datetime(df['utc_time'])
+# Figures built by the callbacks below, keyed on their inputs and the version of the
+# selected partition's matches file (every callback takes the partition last)
+figures = figcache.FigureCache(
+    figcache.make_backend(settings.FIGURE_CACHE, settings.FIGURE_CACHE_DIR, settings.FIGURE_CACHE_BYTES),
+    version=lambda *args: store.matches_version(args[-1]),
+)
 
 
-# Create 'day_of_week' column and set a chronological order for plotting
-df['day_of_week'] = df['utc_time'].dt.day_name()
-day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-df['day_of_week'] = pd.Categorical(df['day_of_week'], categories=day_order, ordered=True)
+def numerical_columns(df):
+    """Identify numerical columns for dropdowns."""
+    return df.select_dtypes(include=['number']).columns.tolist()
 
-# Create 'month' column and set a chronological order for plotting
-df['month'] = df['utc_time'].dt.month
-month_map = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun', 
-            7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
-df['month_name'] = df['month'].map(month_map)
-month_order = ['Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar', 'Apr', 'May']
-df['month_name'] = pd.Categorical(df['month_name'], categories=month_order, ordered=True)
-df.drop(columns=['month'], axis=1, inplace=True)
-    
 
-# Identify column types for dropdowns
-numerical_cols = df.select_dtypes(include=['number']).columns.tolist()
-categorical_cols = ['full_time_result', 'half_time_result', 'home_team', 'away_team']
-
-
-# Helper function for graph styling
-def style_figure(fig):
-    """Applies the glassmorphism theme to a Plotly figure."""
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        title_font_color='white',
-        xaxis_title_font_color='white',
-        yaxis_title_font_color='white',
-        xaxis=dict(tickfont=dict(color='white'), gridcolor='rgba(255, 255, 255, 0.2)'),
-        yaxis=dict(tickfont=dict(color='white'), gridcolor='rgba(255, 255, 255, 0.2)'),
-        font=dict(family="Montserrat, sans-serif"),
-        legend_font_color='white',
-        title_x=0.5, 
-        title_font=dict(size=24, family="Arial")
+def round_marks(round_min, round_max):
+    return {r: str(r) for r in range(round_min, round_max + 1, 5)}
 
-    )
-    return fig
 
+def update_engines(built, version, partition):
+    """Folds the matches appended since `version` into the correlation moments, or returns None to rebuild."""
+    corr_engine, _ = built
+    rows = store.matches_since(partition, version)
+    df = store.load_matches(partition)
+    if rows is None or numerical_columns(df) != corr_engine.columns:
+        return None
+    corr_engine.add_frame(rows)
+    return corr_engine, trendlines.TrendlineEngine(df[corr_engine.columns], stats=corr_engine.pairwise_stats())
 
-corr_matrix = df[numerical_cols].corr()
-# Create the heatmap figure using Plotly Express
-fig_heatmap = px.imshow(
-    corr_matrix,
-    text_auto=True,  # Automatically display the correlation values on the cells
-    aspect="auto",   # Adjust aspect ratio to fit the container
-    title="Correlation Matrix of Numerical Metrics",
-    color_continuous_scale=px.colors.diverging.RdBu_r # Use a red-blue color scale
-)
-style_figure(fig_heatmap)
-
-# Page Layout
-layout = html.Div(
-    className="glassmorphism-container",
-    children=[
-        navbar,
-        html.Br(),
-        html.Br(),
-        dbc.Container([
-            dbc.Row(
-                dbc.Col(
-                    [
-                        html.H1("Dataset Plots", className="display-4 text-white text-center mt-4 mb-2"),
-                        html.P(
-                            "Generate dynamic charts to uncover patterns and trends within the season's data",
-                            className="lead text-white-50 text-center mb-5",
-                        ),
-                    ]
-                )
-            ),
-            dbc.Tabs(
-                id="visualization-tabs",
-                active_tab="tab-distribution",
-                children=[
-                    # Tab 1: Distribution Plot
-                    dbc.Tab(label="Distribution", tab_id="tab-distribution", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                html.H5("Select a numerical column to see its distribution:", className="text-white"),
+
+@startup.deferred("visualization engines", version=store.matches_version, update=update_engines)
+def engines(partition):
+    """Builds a partition's correlation and trendline engines on first use, and again when its data changes."""
+    df = store.load_matches(partition)
+    numerical_cols = numerical_columns(df)
+
+    # Running moments per round and team; filtered correlation matrices are sums of partitions
+    corr_engine = correlation.CorrelationEngine.from_frame(df, numerical_cols)
+
+    # The OLS trendlines are read off the same moments as the correlation heatmap
+    trendline_engine = trendlines.TrendlineEngine(df[numerical_cols], stats=corr_engine.pairwise_stats())
+    return corr_engine, trendline_engine
+
+
+def selected_rows(data, partition, key='mask'):
+    """Boolean row mask of the shared selection in `data`, or None when every row is selected.
+
+    `key` picks the full selection ('mask') or the one without the clicked category ('category_mask').
+    """
+    if not data or not data.get(key) or data.get('partition') != partition.key \
+            or data.get('version') != store.matches_version(partition):
+        return None
+    return selection.load_index(partition).mask(selection.from_base64(data[key]))
+
+
+def selected_frame(data, partition, key='mask'):
+    df = store.load_matches(partition)
+    rows = selected_rows(data, partition, key)
+    return df if rows is None else df[rows]
+
+
+def update_trend_cube(built, version, partition):
+    """Folds the matches appended since `version` into the cube's cells, or returns None to rebuild."""
+    rows = store.matches_since(partition, version)
+    if rows is None or numerical_columns(store.load_matches(partition)) != built.metrics:
+        return None
+    built.add_frame(rows)
+    return built
+
+
+@startup.deferred("trend cube", version=store.matches_version, update=update_trend_cube)
+def trend_cube(partition):
+    """Builds a partition's pre-aggregated trend cube on first use, and updates it when matches are appended."""
+    df = store.load_matches(partition)
+    return cube.TrendCube.from_frame(df, numerical_columns(df))
+
+
+@watcher.on_change('matches')
+def refresh_engines(partition):
+    """Brings the partition's engines and cube up to date as soon as its matches are ingested."""
+    engines.refresh(partition)
+    trend_cube.refresh(partition)
+
+
+# Page Layout, built on first visit rather than at import
+def layout(**kwargs):
+    # Options for the default partition; the callbacks below follow the navbar selection
+    df = store.load_matches()
+    numerical_cols = numerical_columns(df)
+    teams = sorted(df['home_team'].unique())
+    round_min, round_max = int(df['round'].min()), int(df['round'].max())
+
+    return html.Div(
+        className="glassmorphism-container",
+        children=[
+            navbar,
+            html.Br(),
+            html.Br(),
+            dbc.Container([
+                dbc.Row(
+                    dbc.Col(
+                        [
+                            html.H1("Dataset Plots", className="display-4 text-white text-center mt-4 mb-2"),
+                            html.P(
+                                "Generate dynamic charts to uncover patterns and trends within the season's data",
+                                className="lead text-white-50 text-center mb-5",
+                            ),
+                        ]
+                    )
+                ),
+                # Session copy of the matches for the clientside charts
+                *([dcc.Store(id='matches-store', storage_type='session')] if settings.CLIENTSIDE else []),
+                # Rows selected by the filters below, brushing the scatter plot or clicking a pie slice
+                dcc.Store(id='selection-store'),
+                dbc.Card(
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H5("Team:", className="text-white"),
                                 dcc.Dropdown(
-                                    id='dist-column-dropdown',
-                                    options=[{'label': col, 'value': col} for col in numerical_cols],
-                                    value=numerical_cols[0] if numerical_cols else None
+                                    id='selection-team-dropdown',
+                                    options=[{'label': team, 'value': team} for team in teams],
+                                    placeholder="All teams"
                                 ),
-                                dcc.Graph(id='distribution-graph', figure={})
-                            ]), className="glass-card mt-4"
-                        )
-                    ]),
-                    
-                    # Tab 2: Categorical Plot
-                    dbc.Tab(label="Categorical", tab_id="tab-categorical", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                html.H5("Select a categorical column to see its breakdown:", className="text-white"),
-                                dcc.Dropdown(
-                                    id='cat-column-dropdown',
-                                    options=[{'label': col, 'value': col} for col in categorical_cols],
-                                    value=categorical_cols[0] if categorical_cols else None
+                            ], width=4),
+                            dbc.Col([
+                                html.H5("Rounds:", className="text-white"),
+                                dcc.RangeSlider(
+                                    id='selection-round-slider',
+                                    min=round_min,
+                                    max=round_max,
+                                    step=1,
+                                    value=[round_min, round_max],
+                                    marks=round_marks(round_min, round_max),
                                 ),
-                                dcc.Graph(id='pie-chart-graph', figure={})
-                            ]), className="glass-card mt-4"
-                        )
+                            ], width=5),
+                            dbc.Col([
+                                dbc.Button("Clear selection", id='selection-clear-button', color="light", outline=True, className="mt-4"),
+                            ], width=3),
+                        ]),
+                        html.P(
+                            "Brush points on the scatter plot or click a pie slice to narrow every chart to those matches.",
+                            id='selection-summary',
+                            className="text-white-50 mt-3 mb-0",
+                        ),
                     ]),
+                    className="glass-card mb-4",
+                ),
+                dbc.Tabs(
+                    id="visualization-tabs",
+                    active_tab="tab-distribution",
+                    children=[
+                        # Tab 1: Distribution Plot
+                        dbc.Tab(label="Distribution", tab_id="tab-distribution", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    html.H5("Select a numerical column to see its distribution:", className="text-white"),
+                                    dcc.Dropdown(
+                                        id='dist-column-dropdown',
+                                        options=[{'label': col, 'value': col} for col in numerical_cols],
+                                        value=numerical_cols[0] if numerical_cols else None
+                                    ),
+                                    dcc.Graph(id='distribution-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
                     
-                    # Tab 3: Box Plot
-                    dbc.Tab(label="Comparison (Box Plot)", tab_id="tab-bivariate", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                dbc.Row([
-                                    dbc.Col([
-                                        html.H5("Select Numerical Column (Y-axis):", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='box-numerical-dropdown',
-                                            options=[{'label': col, 'value': col} for col in numerical_cols],
-                                            value=numerical_cols[0] if numerical_cols else None
-                                        ),
-                                    ], width=6),
-                                    dbc.Col([
-                                        html.H5("Select Categorical Column (X-axis):", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='box-categorical-dropdown',
-                                            options=[{'label': col, 'value': col} for col in categorical_cols],
-                                            value=categorical_cols[0] if categorical_cols else None
-                                        ),
-                                    ], width=6)
-                                ]),
-                                dcc.Graph(id='box-plot-graph', figure={})
-                            ]), className="glass-card mt-4"
-                        )
-                    ]),
+                        # Tab 2: Categorical Plot
+                        dbc.Tab(label="Categorical", tab_id="tab-categorical", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    html.H5("Select a categorical column to see its breakdown:", className="text-white"),
+                                    dcc.Dropdown(
+                                        id='cat-column-dropdown',
+                                        options=[{'label': col, 'value': col} for col in categorical_cols],
+                                        value=categorical_cols[0] if categorical_cols else None
+                                    ),
+                                    dcc.Graph(id='pie-chart-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
                     
-                    # Tab 4: Scatter Plot
-                    dbc.Tab(label="Correlation (Scatter Plot)", tab_id="tab-scatter", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                dbc.Row([
-                                    dbc.Col([
-                                        html.H5("Select X-Axis (Numerical):", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='scatter-x-dropdown',
-                                            options=[{'label': col, 'value': col} for col in numerical_cols],
-                                            value=numerical_cols[0] if numerical_cols else None
-                                        ),
-                                    ], width=6),
-                                    dbc.Col([
-                                        html.H5("Select Y-Axis (Numerical):", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='scatter-y-dropdown',
-                                            options=[{'label': col, 'value': col} for col in numerical_cols],
-                                            value=numerical_cols[1] if len(numerical_cols) > 1 else None
-                                        ),
-                                    ], width=6)
-                                ]),
-                                dcc.Graph(id='scatter-plot-graph', figure={})
-                            ]), className="glass-card mt-4"
-                        )
-                    ]),
+                        # Tab 3: Box Plot
+                        dbc.Tab(label="Comparison (Box Plot)", tab_id="tab-bivariate", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    dbc.Row([
+                                        dbc.Col([
+                                            html.H5("Select Numerical Column (Y-axis):", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='box-numerical-dropdown',
+                                                options=[{'label': col, 'value': col} for col in numerical_cols],
+                                                value=numerical_cols[0] if numerical_cols else None
+                                            ),
+                                        ], width=6),
+                                        dbc.Col([
+                                            html.H5("Select Categorical Column (X-axis):", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='box-categorical-dropdown',
+                                                options=[{'label': col, 'value': col} for col in categorical_cols],
+                                                value=categorical_cols[0] if categorical_cols else None
+                                            ),
+                                        ], width=6)
+                                    ]),
+                                    dcc.Graph(id='box-plot-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
                     
-                    # Tab 5: Correlation Heatmap
-                    dbc.Tab(label="Correlation Heatmap", tab_id="tab-heatmap", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                html.H5("Correlation Matrix of All Numerical Variables", className="text-white"),
-                                html.P("This heatmap shows the Pearson correlation coefficient between pairs of numerical columns. A value of 1 indicates a perfect positive correlation, -1 indicates a perfect negative correlation, and 0 indicates no linear correlation.", className="text-white-50"),
-                                dcc.Graph(
-                                    id='correlation-heatmap-graph',
-                                    figure=fig_heatmap # Pass the pre-generated figure here
-                                )
-                            ]), className="glass-card mt-4"
-                        )
-                    ]),
+                        # Tab 4: Scatter Plot
+                        dbc.Tab(label="Correlation (Scatter Plot)", tab_id="tab-scatter", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    dbc.Row([
+                                        dbc.Col([
+                                            html.H5("Select X-Axis (Numerical):", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='scatter-x-dropdown',
+                                                options=[{'label': col, 'value': col} for col in numerical_cols],
+                                                value=numerical_cols[0] if numerical_cols else None
+                                            ),
+                                        ], width=5),
+                                        dbc.Col([
+                                            html.H5("Select Y-Axis (Numerical):", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='scatter-y-dropdown',
+                                                options=[{'label': col, 'value': col} for col in numerical_cols],
+                                                value=numerical_cols[1] if len(numerical_cols) > 1 else None
+                                            ),
+                                        ], width=5),
+                                        dbc.Col([
+                                            html.H5("Trendline:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='scatter-trendline-dropdown',
+                                                options=[{'label': label, 'value': kind} for kind, label in trendlines.TRENDLINE_KINDS.items()],
+                                                value='ols',
+                                                clearable=False
+                                            ),
+                                        ], width=2)
+                                    ]),
+                                    dcc.Graph(id='scatter-plot-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
+                    
+                        # Tab 5: Correlation Heatmap
+                        dbc.Tab(label="Correlation Heatmap", tab_id="tab-heatmap", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    html.H5("Correlation Matrix of All Numerical Variables", className="text-white"),
+                                    html.P("This heatmap shows the correlation coefficient between pairs of numerical columns. A value of 1 indicates a perfect positive correlation, -1 indicates a perfect negative correlation, and 0 indicates no linear correlation.", className="text-white-50"),
+                                    dbc.Row([
+                                        dbc.Col([
+                                            html.H5("Team:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='heatmap-team-dropdown',
+                                                options=[{'label': team, 'value': team} for team in teams],
+                                                placeholder="All teams"
+                                            ),
+                                        ], width=4),
+                                        dbc.Col([
+                                            html.H5("Rounds:", className="text-white"),
+                                            dcc.RangeSlider(
+                                                id='heatmap-round-slider',
+                                                min=round_min,
+                                                max=round_max,
+                                                step=1,
+                                                value=[round_min, round_max],
+                                                marks=round_marks(round_min, round_max),
+                                            ),
+                                        ], width=5),
+                                        dbc.Col([
+                                            html.H5("Method:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='heatmap-method-dropdown',
+                                                options=[
+                                                    {'label': 'Pearson', 'value': 'pearson'},
+                                                    {'label': 'Spearman', 'value': 'spearman'},
+                                                ],
+                                                value='pearson',
+                                                clearable=False
+                                            ),
+                                        ], width=3)
+                                    ]),
+                                    dcc.Graph(id='correlation-heatmap-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
                 
-                    # Tab 6: Time Series Analysis
-                    dbc.Tab(label="Trend Analysis", tab_id="tab-advanced-trends", children=[
-                        dbc.Card(
-                            dbc.CardBody([
-                                dbc.Row([
-                                    dbc.Col([
-                                        html.H5("Select Metric to Analyze:", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='adv-metric-dropdown', 
-                                            options=[{'label': col, 'value': col} for col in numerical_cols if col != 'round'],
-                                            value='full_time_home_team_goals',  # Default value
-                                            clearable=False
-                                        ),
-                                    ], width=6),
-                                    dbc.Col([
-                                        html.H5("Group Trend By:", className="text-white"),
-                                        dcc.Dropdown(
-                                            id='adv-group-by-dropdown',
-                                            options=[
-                                                {'label': 'Match Round', 'value': 'round'},
-                                                {'label': 'Day of the Week', 'value': 'day_of_week'},
-                                                {'label': 'Month', 'value': 'month_name'},
-                                            ],
-                                            value='round',
-                                            clearable=False
-                                        ),
-                                    ], width=6)
-                                ]),
-                                dcc.Graph(id='advanced-trends-graph', figure={})
-                            ]), className="glass-card mt-4"
-                        )
-                    ]),
-                ]
-            )
-        ])
-    ]
-)
+                        # Tab 6: Time Series Analysis
+                        dbc.Tab(label="Trend Analysis", tab_id="tab-advanced-trends", children=[
+                            dbc.Card(
+                                dbc.CardBody([
+                                    dbc.Row([
+                                        dbc.Col([
+                                            html.H5("Select Metric to Analyze:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='adv-metric-dropdown', 
+                                                options=[{'label': col, 'value': col} for col in numerical_cols if col != 'round'],
+                                                value='full_time_home_team_goals',  # Default value
+                                                clearable=False
+                                            ),
+                                        ], width=4),
+                                        dbc.Col([
+                                            html.H5("Group Trend By:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='adv-group-by-dropdown',
+                                                options=[
+                                                    {'label': 'Match Round', 'value': 'round'},
+                                                    {'label': 'Day of the Week', 'value': 'day_of_week'},
+                                                    {'label': 'Month', 'value': 'month_name'},
+                                                ],
+                                                value='round',
+                                                clearable=False
+                                            ),
+                                        ], width=3),
+                                        dbc.Col([
+                                            html.H5("Team:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='adv-team-dropdown',
+                                                options=[{'label': team, 'value': team} for team in teams],
+                                                placeholder="All teams"
+                                            ),
+                                        ], width=3),
+                                        dbc.Col([
+                                            html.H5("Matches:", className="text-white"),
+                                            dcc.Dropdown(
+                                                id='adv-venue-dropdown',
+                                                options=[
+                                                    {'label': 'Home or Away', 'value': 'either'},
+                                                    {'label': 'Home', 'value': 'home'},
+                                                    {'label': 'Away', 'value': 'away'},
+                                                ],
+                                                value='either',
+                                                clearable=False
+                                            ),
+                                        ], width=2)
+                                    ]),
+                                    dcc.Graph(id='advanced-trends-graph', figure={})
+                                ]), className="glass-card mt-4"
+                            )
+                        ]),
+                    ]
+                )
+            ])
+        ]
+    )
 
 
 # Callbacks
 
-# Callback for Distribution Tab
+# Team filters and round ranges follow the selected partition
 @callback(
-    Output('distribution-graph', 'figure'),
-    Input('dist-column-dropdown', 'value')
+    Output('heatmap-team-dropdown', 'options'),
+    Output('heatmap-team-dropdown', 'value'),
+    Output('adv-team-dropdown', 'options'),
+    Output('adv-team-dropdown', 'value'),
+    Output('selection-team-dropdown', 'options'),
+    Output('heatmap-round-slider', 'min'),
+    Output('heatmap-round-slider', 'max'),
+    Output('heatmap-round-slider', 'value'),
+    Output('heatmap-round-slider', 'marks'),
+    Output('selection-round-slider', 'min'),
+    Output('selection-round-slider', 'max'),
+    Output('selection-round-slider', 'marks'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
 )
-def update_distribution(selected_col):
+def update_partition_filters(refresh, partition):
+    df = store.load_matches(catalog.parse(partition))
+    teams = sorted(df['home_team'].unique())
+    round_min, round_max = int(df['round'].min()), int(df['round'].max())
+    options = [{'label': team, 'value': team} for team in teams]
+    marks = round_marks(round_min, round_max)
+    # New matches of the same partition widen the ranges but keep the chosen filters
+    if ctx.triggered_id == 'matches-refresh':
+        return (options, no_update, options, no_update, options,
+                round_min, round_max, no_update, marks, round_min, round_max, marks)
+    return (options, None, options, None, options,
+            round_min, round_max, [round_min, round_max], marks, round_min, round_max, marks)
+
+
+# The shared selection: the filters, brushed scatter points and a clicked pie slice,
+# ANDed as precomputed bitmaps (see core/selection.py)
+@callback(
+    Output('selection-store', 'data'),
+    Output('selection-summary', 'children'),
+    Output('selection-team-dropdown', 'value'),
+    Output('selection-round-slider', 'value'),
+    Output('scatter-plot-graph', 'selectedData'),
+    Output('pie-chart-graph', 'clickData'),
+    Input('selection-team-dropdown', 'value'),
+    Input('selection-round-slider', 'value'),
+    Input('scatter-plot-graph', 'selectedData'),
+    Input('pie-chart-graph', 'clickData'),
+    Input('cat-column-dropdown', 'value'),
+    Input('selection-clear-button', 'n_clicks'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+def update_selection(team, rounds, selected_data, click_data, category_col, n_clicks, refresh, partition):
+    partition = catalog.parse(partition)
+    index = selection.load_index(partition)
+    triggered = {trigger.split('.')[0] for trigger in ctx.triggered_prop_ids}
+
+    # A new partition or the clear button start over; a new pie column drops its clicked slice
+    if triggered & {'partition-dropdown', 'selection-clear-button'}:
+        team, rounds, selected_data, click_data = None, None, None, None
+    elif 'cat-column-dropdown' in triggered:
+        click_data = None
+    if not rounds:
+        rounds = [int(index.rounds[0]), int(index.rounds[-1])] if len(index.rounds) else None
+
+    category = None
+    if click_data and category_col:
+        category = (category_col, click_data['points'][0]['label'])
+    points = None
+    if selected_data and selected_data.get('points') is not None:
+        # Only the marker trace (not the trendline) maps one point to one row
+        points = index.rows([p['pointIndex'] for p in selected_data['points'] if p['curveNumber'] == 0])
+
+    bitmap = index.select(team, rounds, category, points)
+    category_bitmap = index.select(team, rounds, None, points)
+    if bitmap is None:
+        summary = f"All {index.length} matches selected. Brush points on the scatter plot or click a pie slice to narrow every chart to those matches."
+    else:
+        summary = f"{index.count(bitmap)} of {index.length} matches selected."
+        if category:
+            summary += f" {category[0]} = {category[1]}."
+
+    data = {
+        'partition': partition.key,
+        'version': store.matches_version(partition),
+        'category': category,
+        'mask': None if bitmap is None else selection.to_base64(bitmap),
+        'category_mask': None if category_bitmap is None else selection.to_base64(category_bitmap),
+    }
+    return data, summary, team, rounds, selected_data, click_data
+
+# Callback for Distribution Tab
+@figures.cached('distribution')
+def update_distribution(selected_col, selection_data, partition):
     if not selected_col:
         return {}
-    fig = px.histogram(df, x=selected_col, title=f"Distribution of {selected_col}", nbins=38)
+    df = selected_frame(selection_data, catalog.parse(partition))
+    if len(df) > settings.LARGE_DATA_ROWS:
+        # Binned here, so only the edges and counts are sent
+        edges, counts = downsample.histogram(df[selected_col], 38)
+        fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, title=f"Distribution of {selected_col}",
+                     labels={'x': selected_col, 'y': 'count'})
+        fig.update_traces(width=edges[1:] - edges[:-1])
+        fig.update_layout(bargap=0)
+    else:
+        fig = px.histogram(df, x=selected_col, title=f"Distribution of {selected_col}", nbins=38)
     fig.update_layout(title_x=0.5, title_font=dict(size=24, family="Arial"))
     return style_figure(fig)
 
 # Callback for Categorical Tab
-@callback(
-    Output('pie-chart-graph', 'figure'),
-    Input('cat-column-dropdown', 'value')
-)
-def update_pie_chart(selected_col):
+@figures.cached('pie')
+def update_pie_chart(selected_col, selection_data, partition):
     if not selected_col:
         return {}
-    counts = df[selected_col].value_counts()
+    # Every other filter applies, but not the clicked slice itself, which is pulled out instead
+    df = selected_frame(selection_data, catalog.parse(partition), 'category_mask')
+    # Categories without rows in the selection get no slice, as in the browser-side pie
+    counts = df[selected_col].value_counts()[lambda c: c > 0]
     fig = px.pie(
         values=counts.values,
         names=counts.index,
         title=f"Breakdown of {selected_col}",
         hole=0.3
     )
+    category = (selection_data or {}).get('category')
+    if category and category[0] == selected_col:
+        fig.update_traces(pull=[0.1 if name == category[1] else 0 for name in counts.index])
     fig.update_layout(title_x=0.5, title_font=dict(size=24, family="Arial"))
     return style_figure(fig)
 
 # Callback for Box Plot Tab
-@callback(
-    Output('box-plot-graph', 'figure'),
-    Input('box-numerical-dropdown', 'value'),
-    Input('box-categorical-dropdown', 'value')
-)
-def update_box_plot(numerical_col, categorical_col):
+@figures.cached('box')
+def update_box_plot(numerical_col, categorical_col, selection_data, partition):
     if not numerical_col or not categorical_col:
         return {}
-    fig = px.box(df, x=categorical_col, y=numerical_col, title=f"{numerical_col} by {categorical_col}")
+    df = selected_frame(selection_data, catalog.parse(partition))
+    if len(df) > settings.LARGE_DATA_ROWS:
+        # Quartiles and whiskers computed here; outliers are not drawn
+        stats = downsample.box_stats(df[numerical_col], df[categorical_col])
+        fig = go.Figure(go.Box(
+            x=stats['group'], q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+            lowerfence=stats['lowerfence'], upperfence=stats['upperfence'], name=numerical_col,
+        ))
+        fig.update_layout(title=f"{numerical_col} by {categorical_col}", xaxis_title=categorical_col,
+                          yaxis_title=numerical_col)
+    else:
+        fig = px.box(df, x=categorical_col, y=numerical_col, title=f"{numerical_col} by {categorical_col}")
     fig.update_layout(title_x=0.5, title_font=dict(size=24, family="Arial"))
     return style_figure(fig)
 
+
+# The distribution, categorical and box plots either run in the browser on the session's
+# copy of the matches (LALIGA_CLIENTSIDE=1, see assets/clientside.js) or on the server
+if settings.CLIENTSIDE:
+    @callback(
+        Output('matches-store', 'data'),
+        Input('matches-refresh', 'data'),
+        Input('partition-dropdown', 'value'),
+        State('matches-store', 'data')
+    )
+    def update_matches_store(refresh, partition, data):
+        """Sends the selected partition's matches once per session, and again only when the file changes."""
+        partition = catalog.parse(partition)
+        version = store.matches_version(partition)
+        if data and data.get('partition') == partition.key and data.get('version') == version:
+            return no_update
+        df = store.load_matches(partition)
+        return {
+            'partition': partition.key,
+            'version': version,
+            # Layout and template of style_figure(), so clientside figures look the same
+            'layout': style_figure(px.scatter()).to_plotly_json()['layout'],
+            **columnar.encode_frame(df, numerical_columns(df) + categorical_cols),
+        }
+
+    clientside_callback(
+        ClientsideFunction(namespace='laliga', function_name='distribution'),
+        Output('distribution-graph', 'figure'),
+        Input('dist-column-dropdown', 'value'),
+        Input('matches-store', 'data'),
+        Input('selection-store', 'data')
+    )
+    clientside_callback(
+        ClientsideFunction(namespace='laliga', function_name='pie'),
+        Output('pie-chart-graph', 'figure'),
+        Input('cat-column-dropdown', 'value'),
+        Input('matches-store', 'data'),
+        Input('selection-store', 'data')
+    )
+    clientside_callback(
+        ClientsideFunction(namespace='laliga', function_name='box'),
+        Output('box-plot-graph', 'figure'),
+        Input('box-numerical-dropdown', 'value'),
+        Input('box-categorical-dropdown', 'value'),
+        Input('matches-store', 'data'),
+        Input('selection-store', 'data')
+    )
+else:
+    callback(
+        Output('distribution-graph', 'figure'),
+        Input('dist-column-dropdown', 'value'),
+        Input('selection-store', 'data'),
+        Input('partition-dropdown', 'value')
+    )(update_distribution)
+    callback(
+        Output('pie-chart-graph', 'figure'),
+        Input('cat-column-dropdown', 'value'),
+        Input('selection-store', 'data'),
+        Input('partition-dropdown', 'value')
+    )(update_pie_chart)
+    callback(
+        Output('box-plot-graph', 'figure'),
+        Input('box-numerical-dropdown', 'value'),
+        Input('box-categorical-dropdown', 'value'),
+        Input('selection-store', 'data'),
+        Input('partition-dropdown', 'value')
+    )(update_box_plot)
+
 # Callback for Scatter Plot Tab
 @callback(
     Output('scatter-plot-graph', 'figure'),
     Input('scatter-x-dropdown', 'value'),
-    Input('scatter-y-dropdown', 'value')
+    Input('scatter-y-dropdown', 'value'),
+    Input('scatter-trendline-dropdown', 'value'),
+    Input('selection-store', 'data'),
+    Input('partition-dropdown', 'value')
 )
-def update_scatter_plot(x_col, y_col):
+@figures.cached('scatter')
+def update_scatter_plot(x_col, y_col, trendline, selection_data, partition):
     if not x_col or not y_col:
         return {}
-    fig = px.scatter(
-        df,
-        x=x_col,
-        y=y_col,
-        title=f"Correlation between {x_col} and {y_col}",
-        trendline="ols",  # Adds an Ordinary Least Squares regression trendline
-        trendline_color_override="yellow"
-    )
-    fig.update_layout(title_x=0.5, title_font=dict(size=24, family="Arial"))
+    partition = catalog.parse(partition)
+    df = store.load_matches(partition)
+    _, trendline_engine = engines(partition)
+    rows = selected_rows(selection_data, partition)
+    title = f"Correlation between {x_col} and {y_col}"
 
+    if len(df) > settings.DENSITY_ROWS:
+        # Too many points to draw: counts on a fixed grid, of the selected matches if any
+        points = df if rows is None else df[rows]
+        grid_x, grid_y, counts = downsample.density_grid(points[x_col], points[y_col], settings.DENSITY_GRID)
+        fig = px.imshow(counts, x=grid_x, y=grid_y, origin='lower', aspect='auto', title=title,
+                        labels={'x': x_col, 'y': y_col, 'color': 'matches'})
+    else:
+        # WebGL keeps large scatters responsive; SVG is sharper for small ones
+        fig = px.scatter(
+            df,
+            x=x_col,
+            y=y_col,
+            title=title,
+            render_mode='webgl' if len(df) > settings.LARGE_DATA_ROWS else 'svg',
+        )
+        # Every match stays plotted so the brush keeps its context; unselected ones are dimmed
+        if rows is not None:
+            fig.data[0].selectedpoints = rows.nonzero()[0]
+        fig.update_layout(dragmode='select', uirevision=f"{partition.key}/{x_col}/{y_col}")
+
+    # Trendline coordinates come from the batched NumPy engine instead of a statsmodels fit,
+    # refitted on the selected matches when there is a selection
+    line_x, line_y, label = trendline_engine.line(x_col, y_col, trendline, rows)
+    fig.add_scatter(x=line_x, y=line_y, mode='lines', name=label, line=dict(color='yellow'))
+    fig.update_layout(title_x=0.5, title_font=dict(size=24, family="Arial"), legend=dict(orientation='h', y=-0.2))
+
+    return style_figure(fig)
+
+# Callback for Correlation Heatmap Tab
+@callback(
+    Output('correlation-heatmap-graph', 'figure'),
+    Input('heatmap-team-dropdown', 'value'),
+    Input('heatmap-round-slider', 'value'),
+    Input('heatmap-method-dropdown', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
+)
+@figures.cached('heatmap')
+def update_heatmap(team, round_range, method, refresh, partition):
+    partition = catalog.parse(partition)
+    df = store.load_matches(partition)
+    corr_engine, _ = engines(partition)
+    rounds = tuple(round_range) if round_range else None
+    if method == 'spearman':
+        corr_matrix = corr_engine.spearman(df, team, rounds)
+    else:
+        # Sums the precomputed partition moments; no pass over the rows
+        corr_matrix = corr_engine.pearson(team, rounds)
+
+    fig = px.imshow(
+        corr_matrix,
+        text_auto=True,  # Automatically display the correlation values on the cells
+        aspect="auto",   # Adjust aspect ratio to fit the container
+        title=f"{method.title()} Correlation Matrix of Numerical Metrics",
+        color_continuous_scale=px.colors.diverging.RdBu_r # Use a red-blue color scale
+    )
     return style_figure(fig)
 
 # Callback for Time Series Analysis Tab
 @callback(
     Output('advanced-trends-graph', 'figure'),
     Input('adv-metric-dropdown', 'value'), 
-    Input('adv-group-by-dropdown', 'value')
+    Input('adv-group-by-dropdown', 'value'),
+    Input('adv-team-dropdown', 'value'),
+    Input('adv-venue-dropdown', 'value'),
+    Input('matches-refresh', 'data'),
+    Input('partition-dropdown', 'value')
 )
-def update_advanced_trends(selected_metric, group_by_col):
+@figures.cached('trends')
+def update_advanced_trends(selected_metric, group_by_col, team, venue, refresh, partition):
     if not selected_metric or not group_by_col:
         return {}
 
-    # Group data by the selected dimension and calculate the average
-    dff_grouped = df.groupby(group_by_col, observed=True)[selected_metric].mean().reset_index()
-
-    # correct sorting for categorical time dimensions
-    if group_by_col in ['day_of_week', 'month_name']:
-        dff_grouped = dff_grouped.sort_values(group_by_col)
+    # Means and confidence bands per group are lookups into the pre-aggregated cube
+    trend = trend_cube(catalog.parse(partition)).trend(selected_metric, group_by_col, team, venue or 'either')
 
     # Create a dynamic title
     y_axis_label = f"Average {selected_metric.replace('_', ' ').title()}"
     x_axis_label = group_by_col.replace('_', ' ').title()
+    title = f"Trend of {y_axis_label} by {x_axis_label}"
+    if team:
+        title += f" ({team})"
 
     fig = px.line(
-        dff_grouped,
+        trend,
         x=group_by_col,
-        y=selected_metric,
-        title=f"Trend of {y_axis_label} by {x_axis_label}",
-        labels={group_by_col: x_axis_label, selected_metric: y_axis_label},
+        y='mean',
+        title=title,
+        labels={group_by_col: x_axis_label, 'mean': y_axis_label},
         markers=True
     )
+    # 95% confidence band around the mean
+    fig.add_scatter(
+        x=list(trend[group_by_col]) + list(trend[group_by_col])[::-1],
+        y=list(trend['ci_high']) + list(trend['ci_low'])[::-1],
+        fill='toself',
+        fillcolor='rgba(99, 110, 250, 0.2)',
+        line=dict(color='rgba(0, 0, 0, 0)'),
+        hoverinfo='skip',
+        name='95% CI',
+    )
     
     # Apply the standard glassmorphism styling
-    return style_figure(fig)
\ No newline at end of file
+    return style_figure(fig)
+
+
+@startup.on_warmup("visualization engines")
+def warm_engines():
+    """Builds the default partition's engines, and loads Plotly Express, ahead of the first visit."""
+    engines(catalog.parse(None))
+    trend_cube(catalog.parse(None))
+    selection.load_index()
+    px.scatter  # The first attribute access runs the deferred import
+
+
+def warm_figure_cache():
+    """Builds every dropdown combination of the figures above into the cache, for every partition."""
+    for partition in catalog.discover():
+        if os.path.isdir(os.path.join(partition.path, 'matches')):
+            warm_partition_figures(partition.key)
+
+
+def warm_partition_figures(partition):
+    df = store.load_matches(partition)
+    numerical_cols = numerical_columns(df)
+    round_range = [int(df['round'].min()), int(df['round'].max())]
+
+    for col in numerical_cols:
+        update_distribution(col, None, partition)
+    for col in categorical_cols:
+        update_pie_chart(col, None, partition)
+    for numerical_col, categorical_col in itertools.product(numerical_cols, categorical_cols):
+        update_box_plot(numerical_col, categorical_col, None, partition)
+    for metric, group_by_col in itertools.product(numerical_cols, group_by_cols):
+        if metric != 'round':
+            update_advanced_trends(metric, group_by_col, None, 'either', None, partition)
+    for method in ('pearson', 'spearman'):
+        update_heatmap(None, round_range, method, None, partition)
+    for x_col, y_col in itertools.permutations(numerical_cols, 2):
+        for trendline in trendlines.TRENDLINE_KINDS:
+            update_scatter_plot(x_col, y_col, trendline, None, partition)
+
+
+if settings.WARM_FIGURES and settings.FIGURE_CACHE != 'off':
+    startup.on_warmup("visualization figures")(warm_figure_cache)
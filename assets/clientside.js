@@ -0,0 +1,208 @@
+/* Clientside callbacks for the Visualization page (enabled with LALIGA_CLIENTSIDE=1).
+ *
+ * The matches frame arrives once per session in the 'matches-store' dcc.Store,
+ * encoded by core/columnar.py; histogram binning, category counts and box-plot
+ * statistics are computed here so these tabs never call the server. The shared
+ * selection ('selection-store', see core/selection.py) arrives as packed row
+ * bitmaps, one bit per match, and only the selected rows are counted.
+ */
+(function () {
+    var TYPES = {
+        int8: Int8Array, int16: Int16Array, int32: Int32Array,
+        uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array,
+        float32: Float32Array, float64: Float64Array
+    };
+    var decoded = {};  // "partition|version|column" -> decoded column
+
+    function decode(store, name) {
+        var key = store.partition + '|' + store.version + '|' + name;
+        if (!decoded[key]) {
+            var column = store.columns[name];
+            var binary = atob(column.data);
+            var bytes = new Uint8Array(binary.length);
+            for (var i = 0; i < binary.length; i++) {
+                bytes[i] = binary.charCodeAt(i);
+            }
+            decoded[key] = {values: new TYPES[column.dtype](bytes.buffer), categories: column.categories};
+        }
+        return decoded[key];
+    }
+
+    // Returns a row -> selected test for a bitmap of the selection, or null when every row counts
+    function selected(store, selection, key) {
+        if (!selection || !selection[key] || selection.partition !== store.partition
+                || selection.version !== store.version) {
+            return null;
+        }
+        var binary = atob(selection[key]);
+        return function (row) {
+            return (binary.charCodeAt(row >> 3) & (128 >> (row & 7))) !== 0;
+        };
+    }
+
+    // Same glassmorphism styling and template as style_figure() on the server
+    function styled(store, data, title, extra) {
+        var layout = Object.assign({}, store.layout, {title: Object.assign({}, store.layout.title, {text: title})}, extra || {});
+        return {data: data, layout: layout};
+    }
+
+    function axis(store, name, title, extra) {
+        var base = store.layout[name] || {};
+        return Object.assign({}, base, {title: Object.assign({}, base.title, {text: title})}, extra || {});
+    }
+
+    function niceSize(raw) {
+        var power = Math.pow(10, Math.floor(Math.log10(raw)));
+        var steps = [1, 2, 2.5, 5, 10];
+        for (var i = 0; i < steps.length; i++) {
+            if (steps[i] * power >= raw) {
+                return steps[i] * power;
+            }
+        }
+        return 10 * power;
+    }
+
+    function isInteger(values) {
+        for (var i = 0; i < values.length; i++) {
+            if (values[i] !== Math.floor(values[i])) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    function quantile(sorted, q) {
+        var position = (sorted.length - 1) * q;
+        var lower = Math.floor(position);
+        var upper = Math.ceil(position);
+        return sorted[lower] + (sorted[upper] - sorted[lower]) * (position - lower);
+    }
+
+    function histogram(store, column, nbins, keep) {
+        var values = decode(store, column).values;
+        if (keep) {
+            values = values.filter(function (_, row) { return keep(row); });
+        }
+        if (!values.length) {
+            return {centers: [], counts: [], size: 1};
+        }
+        var min = Infinity, max = -Infinity;
+        for (var i = 0; i < values.length; i++) {
+            if (values[i] < min) { min = values[i]; }
+            if (values[i] > max) { max = values[i]; }
+        }
+        var size = niceSize(Math.max(max - min, 1) / nbins);
+        var start = Math.floor(min / size) * size;
+        // Whole-number data gets whole-number bins centred on the values
+        if (isInteger(values)) {
+            size = Math.max(1, Math.ceil(size));
+            start = min - 0.5;
+        }
+        var count = Math.floor((max - start) / size) + 1;
+        var counts = new Array(count).fill(0);
+        for (var j = 0; j < values.length; j++) {
+            if (!isNaN(values[j])) {
+                counts[Math.floor((values[j] - start) / size)] += 1;
+            }
+        }
+        var centers = counts.map(function (_, k) { return start + (k + 0.5) * size; });
+        return {centers: centers, counts: counts, size: size};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        laliga: {
+            distribution: function (column, store, selection) {
+                if (!column || !store || !store.columns[column]) {
+                    return {};
+                }
+                var bins = histogram(store, column, 38, selected(store, selection, 'mask'));
+                var trace = {type: 'bar', x: bins.centers, y: bins.counts, width: bins.size, name: column};
+                return styled(store, [trace], 'Distribution of ' + column, {
+                    bargap: 0,
+                    xaxis: axis(store, 'xaxis', column),
+                    yaxis: axis(store, 'yaxis', 'count')
+                });
+            },
+
+            pie: function (column, store, selection) {
+                if (!column || !store || !store.columns[column]) {
+                    return {};
+                }
+                var encoded = decode(store, column);
+                // Every other filter applies, but not the clicked slice itself, which is pulled out instead
+                var keep = selected(store, selection, 'category_mask');
+                var counts = new Array(encoded.categories.length).fill(0);
+                for (var i = 0; i < encoded.values.length; i++) {
+                    if (!keep || keep(i)) {
+                        counts[encoded.values[i]] += 1;
+                    }
+                }
+                // Largest share first, as value_counts() orders it; empty slices are dropped
+                var order = counts.map(function (_, k) { return k; })
+                    .filter(function (k) { return counts[k] > 0; })
+                    .sort(function (a, b) { return counts[b] - counts[a]; });
+                var labels = order.map(function (k) { return encoded.categories[k]; });
+                var trace = {
+                    type: 'pie',
+                    labels: labels,
+                    values: order.map(function (k) { return counts[k]; }),
+                    hole: 0.3
+                };
+                var category = selection && selection.category;
+                if (category && category[0] === column) {
+                    trace.pull = labels.map(function (label) { return label === category[1] ? 0.1 : 0; });
+                }
+                return styled(store, [trace], 'Breakdown of ' + column);
+            },
+
+            box: function (numericalColumn, categoricalColumn, store, selection) {
+                if (!numericalColumn || !categoricalColumn || !store
+                        || !store.columns[numericalColumn] || !store.columns[categoricalColumn]) {
+                    return {};
+                }
+                var values = decode(store, numericalColumn).values;
+                var groups = decode(store, categoricalColumn);
+                var grouped = groups.categories.map(function () { return []; });
+                var keep = selected(store, selection, 'mask');
+                for (var i = 0; i < values.length; i++) {
+                    if (!isNaN(values[i]) && (!keep || keep(i))) {
+                        grouped[groups.values[i]].push(values[i]);
+                    }
+                }
+
+                var stats = {x: [], q1: [], median: [], q3: [], lowerfence: [], upperfence: []};
+                var outliers = {x: [], y: []};
+                grouped.forEach(function (group, k) {
+                    if (!group.length) {
+                        return;
+                    }
+                    group.sort(function (a, b) { return a - b; });
+                    var q1 = quantile(group, 0.25), q3 = quantile(group, 0.75), iqr = q3 - q1;
+                    var low = q1 - 1.5 * iqr, high = q3 + 1.5 * iqr;
+                    var inside = group.filter(function (v) { return v >= low && v <= high; });
+                    stats.x.push(groups.categories[k]);
+                    stats.q1.push(q1);
+                    stats.median.push(quantile(group, 0.5));
+                    stats.q3.push(q3);
+                    stats.lowerfence.push(inside[0]);
+                    stats.upperfence.push(inside[inside.length - 1]);
+                    group.forEach(function (v) {
+                        if (v < low || v > high) {
+                            outliers.x.push(groups.categories[k]);
+                            outliers.y.push(v);
+                        }
+                    });
+                });
+
+                var box = Object.assign({type: 'box', name: numericalColumn, boxpoints: false}, stats);
+                var points = {type: 'scatter', mode: 'markers', x: outliers.x, y: outliers.y,
+                              name: 'outliers', showlegend: false, marker: {color: '#636efa'}};
+                return styled(store, [box, points], numericalColumn + ' by ' + categoricalColumn, {
+                    showlegend: false,
+                    xaxis: axis(store, 'xaxis', categoricalColumn, {type: 'category'}),
+                    yaxis: axis(store, 'yaxis', numericalColumn)
+                });
+            }
+        }
+    });
+})();
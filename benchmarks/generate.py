@@ -0,0 +1,198 @@
+"""Synthetic seasons for scaling benchmarks.
+
+Writes a partition with the same layout and schemas as the real data::
+
+    <root>/<league>/<season>/matches/matches.csv
+    <root>/<league>/<season>/stats/<same file names as the template>.csv
+    <root>/<league>/<season>/events/events-<chunk>.csv   (with --passes-per-match)
+
+Column names, team names and value distributions are taken from a template
+partition (the configured default one), so any row count from 10^3 to 10^7
+exercises the same code paths as the real season. Large files are written
+in chunks to keep memory flat.
+
+Run ``python -m benchmarks.generate --rows 100000 --root /tmp/synthetic``.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import catalog, schema
+
+
+CHUNK_ROWS = 1_000_000
+ROUNDS = 38
+SEASON_START = pd.Timestamp('2023-08-11 17:30:00', tz='UTC')
+SEASON_DAYS = 290
+
+# Integer columns bounded by another column of the same row
+BOUNDED_BY = {
+    'half_time_home_team_goals': ('full_time_home_team_goals', 0.45),
+    'half_time_away_team_goals': ('full_time_away_team_goals', 0.45),
+    'home_team_shots_on_target': ('home_team_shots', 0.35),
+    'away_team_shots_on_target': ('away_team_shots', 0.35),
+}
+
+
+def _result(home_goals, away_goals):
+    return np.where(home_goals > away_goals, 'H', np.where(home_goals < away_goals, 'A', 'D'))
+
+
+def _match_chunk(rng, start, count, total, template, teams):
+    positions = np.arange(start, start + count)
+    home = rng.integers(len(teams), size=count)
+    away = (home + rng.integers(1, len(teams), size=count)) % len(teams)
+    offsets = pd.to_timedelta(positions * (SEASON_DAYS * 86400 // max(total, 1)), unit='s')
+
+    chunk = {
+        'round': 1 + positions * ROUNDS // max(total, 1),
+        'home_team': teams[home],
+        'away_team': teams[away],
+        'utc_time': (SEASON_START + offsets).astype(str),
+    }
+    for column, data_type in schema.MATCH_COLUMN_TYPES.items():
+        if data_type == 'integer' and column not in chunk and column not in BOUNDED_BY:
+            chunk[column] = rng.poisson(template[column].mean(), size=count)
+    for column, (bound, share) in BOUNDED_BY.items():
+        chunk[column] = rng.binomial(chunk[bound], share)
+    chunk['full_time_result'] = _result(chunk['full_time_home_team_goals'], chunk['full_time_away_team_goals'])
+    chunk['half_time_result'] = _result(chunk['half_time_home_team_goals'], chunk['half_time_away_team_goals'])
+
+    frame = pd.DataFrame(chunk, index=positions)
+    return frame[[c for c in template.columns if c in frame.columns]]
+
+
+def generate_matches(path, rows, template, seed=0):
+    """Writes `rows` synthetic matches with the template's columns and value ranges."""
+    rng = np.random.default_rng(seed)
+    teams = np.array(sorted(template['home_team'].astype(str).unique()))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = _match_chunk(rng, start, min(CHUNK_ROWS, rows - start), rows, template, teams)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0)
+
+
+def generate_stats_file(path, rows, template, seed=0):
+    """Writes `rows` synthetic rows of one stats file, resampling each template column."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for start in range(0, rows, CHUNK_ROWS):
+        count = min(CHUNK_ROWS, rows - start)
+        chunk = {}
+        for column in template.columns:
+            if column == 'Rank':
+                chunk[column] = np.arange(start + 1, start + count + 1)
+            elif column == 'Player':
+                chunk[column] = [f"Player {i}" for i in range(start, start + count)]
+            else:
+                values = template[column].dropna().to_numpy()
+                chunk[column] = rng.choice(values, size=count)
+        pd.DataFrame(chunk).to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def generate_events(path, matches, passes_per_match, seed=0):
+    """Writes an event feed whose counts reproduce the metric columns of `matches` (indexed by match id), plus passes.
+
+    Matches are written a chunk at a time, so memory stays flat at any feed size.
+    """
+    from core import ingest
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    matches_per_chunk = max(1, CHUNK_ROWS // max(passes_per_match, 1))
+    for start in range(0, len(matches), matches_per_chunk):
+        block = matches.iloc[start:start + matches_per_chunk]
+        events = []
+        for side in ('home', 'away'):
+            team = block[f"{side}_team"].to_numpy()
+            counts = {
+                'shot': (block[f"{side}_team_shots"] - block[f"{side}_team_shots_on_target"], 0),
+                'shot_on_target': (block[f"{side}_team_shots_on_target"], 1),
+                'foul': (block[f"{side}_team_fouls_committed"], 0),
+                'corner': (block[f"{side}_team_corners"], 0),
+                'yellow_card': (block[f"{side}_team_yellow_cards"], 0),
+                'red_card': (block[f"{side}_team_red_cards"], 0),
+                'pass': (rng.poisson(passes_per_match / 2, size=len(block)), 0),
+            }
+            for event, (count, on_target) in counts.items():
+                rows = np.repeat(np.arange(len(block)), np.clip(np.asarray(count), 0, None))
+                events.append(pd.DataFrame({
+                    'match_id': block.index.to_numpy()[rows],
+                    'team': team[rows],
+                    'event': 'shot' if event == 'shot_on_target' else event,
+                    'minute': rng.integers(1, 91, size=len(rows)),
+                    'on_target': on_target,
+                }))
+        chunk = pd.concat(events, ignore_index=True)
+        chunk = chunk.iloc[rng.permutation(len(chunk))][list(ingest.EVENT_DTYPES)]
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def generate_partition(root, rows, stats_rows=None, stats_files=None, league='synthetic', season=None,
+                       template=None, seed=0, passes_per_match=None):
+    """Writes a synthetic partition under `root` and returns it.
+
+    `stats_files` limits which template stats files are generated (all by default);
+    they get `stats_rows` rows each, `rows` by default. With `passes_per_match`,
+    an event feed matching the generated matches is written too.
+    """
+    from core import store
+
+    template = catalog.parse(template)
+    partition = catalog.Partition(league, season or str(rows))
+    partition_dir = os.path.join(root, league, partition.season)
+
+    matches_file = os.path.join(partition_dir, 'matches', 'matches.csv')
+    generate_matches(
+        matches_file,
+        rows,
+        store.load_matches(template).drop(columns=store.DERIVED_COLUMNS),
+        seed=seed,
+    )
+    if passes_per_match is not None:
+        for start, matches in enumerate(pd.read_csv(matches_file, index_col=0, chunksize=CHUNK_ROWS)):
+            generate_events(
+                os.path.join(partition_dir, 'events', f"events-{start:04d}.csv"),
+                matches,
+                passes_per_match,
+                seed=seed + start,
+            )
+    files = sorted(glob.glob(os.path.join(catalog.stats_dir(template), '*.csv')))
+    if stats_files is not None:
+        files = [f for f in files if os.path.basename(f) in stats_files]
+    for i, template_file in enumerate(files):
+        generate_stats_file(
+            os.path.join(partition_dir, 'stats', os.path.basename(template_file)),
+            stats_rows or rows,
+            pd.read_csv(template_file),
+            seed=seed + i + 1,
+        )
+    return partition
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic league/season partition.")
+    parser.add_argument('--rows', type=float, required=True, help="match rows, e.g. 1e5")
+    parser.add_argument('--stats-rows', type=float, help="rows per stats file (default: --rows)")
+    parser.add_argument('--stats-files', nargs='*', help="stats file names to generate (default: all)")
+    parser.add_argument('--root', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--passes-per-match', type=int, help="also write an event feed with this many passes per match")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    partition = generate_partition(
+        args.root,
+        int(args.rows),
+        stats_rows=int(args.stats_rows) if args.stats_rows else None,
+        stats_files=args.stats_files,
+        seed=args.seed,
+        passes_per_match=args.passes_per_match,
+    )
+    print(f"Wrote {partition.key} under {args.root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""Scaling benchmarks over synthetic seasons.
+
+For each size, a synthetic partition is generated (see `benchmarks.generate`)
+and the following are timed:
+
+* ``load.*``: parsing the matches CSV, reading its Parquet copy and the
+  in-process memo,
+* ``corr.*``: the heatmap's correlation matrix with ``DataFrame.corr()``
+  and from the partitioned running moments,
+* ``callback.*``: every Visualization callback and the Stats page's
+  ``update_table``, dispatched through Dash like a browser request, so JSON
+  serialization is included and the response size is recorded.
+
+Results are written as JSON (one record per size and benchmark) so that runs
+from different commits can be compared::
+
+    python -m benchmarks.run --sizes 1e3 1e4 1e5
+    python -m benchmarks.run --compare old.json new.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Figures must be rebuilt on every call and nothing warmed up behind the timings
+os.environ['LALIGA_FIGURE_CACHE'] = 'off'
+os.environ['LALIGA_WARMUP'] = 'off'
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import generate
+from core import settings
+
+
+DEFAULT_SIZES = [1e3, 1e4, 1e5]
+
+# Stats files generated for the update_table benchmark: one player and one team leaderboard
+STATS_FILES = ['player_expected_assists.csv', 'accurate_pass_team.csv']
+
+
+def measure(func, repeat):
+    """Runs `func` `repeat` times; returns (timings in seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def dispatch(client, outputs, inputs, changed=None):
+    """Posts one callback request the way the Dash renderer does; returns the response body.
+
+    `inputs` are (id, property, value) in the callback's argument order; `changed`
+    names the input that triggered it, the first one by default.
+    """
+    body = {
+        'output': ("..%s.." % "...".join(f"{i}.{p}" for i, p in outputs)) if len(outputs) > 1
+        else f"{outputs[0][0]}.{outputs[0][1]}",
+        'outputs': [{'id': i, 'property': p} for i, p in outputs] if len(outputs) > 1
+        else {'id': outputs[0][0], 'property': outputs[0][1]},
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'state': [],
+        'changedPropIds': [changed or f"{inputs[0][0]}.{inputs[0][1]}"],
+    }
+    response = client.post('/_dash-update-component', json=body)
+    if response.status_code != 200:
+        raise RuntimeError(f"{body['output']} returned {response.status_code}: {response.data[:200]!r}")
+    return response.data
+
+
+def callback_requests(partition, stats_file):
+    """(name, outputs, inputs, changed) of the callback requests to time for a partition."""
+    key = partition.key
+    requests = [
+        ('callback.distribution', [('distribution-graph', 'figure')],
+         [('dist-column-dropdown', 'value', 'home_team_shots'), ('selection-store', 'data', None),
+          ('partition-dropdown', 'value', key)]),
+        ('callback.pie', [('pie-chart-graph', 'figure')],
+         [('cat-column-dropdown', 'value', 'home_team'), ('selection-store', 'data', None),
+          ('partition-dropdown', 'value', key)]),
+        ('callback.box', [('box-plot-graph', 'figure')],
+         [('box-numerical-dropdown', 'value', 'home_team_shots'),
+          ('box-categorical-dropdown', 'value', 'full_time_result'), ('selection-store', 'data', None),
+          ('partition-dropdown', 'value', key)]),
+        *[
+            (f'callback.scatter.{kind}', [('scatter-plot-graph', 'figure')],
+             [('scatter-x-dropdown', 'value', 'home_team_shots'), ('scatter-y-dropdown', 'value', 'home_team_corners'),
+              ('scatter-trendline-dropdown', 'value', kind), ('selection-store', 'data', None),
+              ('partition-dropdown', 'value', key)])
+            for kind in ('ols', 'lowess', 'rolling')
+        ],
+        *[
+            (f'callback.heatmap.{method}', [('correlation-heatmap-graph', 'figure')],
+             [('heatmap-team-dropdown', 'value', None), ('heatmap-round-slider', 'value', [1, 38]),
+              ('heatmap-method-dropdown', 'value', method), ('matches-refresh', 'data', None),
+              ('partition-dropdown', 'value', key)])
+            for method in ('pearson', 'spearman')
+        ],
+        ('callback.trends', [('advanced-trends-graph', 'figure')],
+         [('adv-metric-dropdown', 'value', 'home_team_shots'), ('adv-group-by-dropdown', 'value', 'round'),
+          ('adv-team-dropdown', 'value', None), ('adv-venue-dropdown', 'value', 'either'),
+          ('matches-refresh', 'data', None), ('partition-dropdown', 'value', key)]),
+    ]
+    requests = [(name, outputs, inputs, None) for name, outputs, inputs in requests]
+    # A sorted and filtered page, as when the user edits the table rather than picking a file
+    requests.append(('callback.update_table', [
+        ('stats-table', 'columns'), ('stats-table', 'data'), ('stats-table', 'page_count'),
+        ('stats-table', 'page_current'), ('stats-table', 'sort_by'), ('stats-table', 'filter_query'),
+        ('table-message', 'children'),
+    ], [
+        ('stats-ready', 'data', {'path': stats_file}), ('stats-table', 'page_current', 0), ('stats-table', 'page_size', 20),
+        ('stats-table', 'sort_by', [{'column_id': 'Minutes', 'direction': 'desc'}]),
+        ('stats-table', 'filter_query', '{Matches} ge 10'), ('stats-refresh', 'data', None),
+    ], 'stats-table.filter_query'))
+    return requests
+
+
+def run_size(client, root, rows, repeat, template_dir):
+    """Generates a partition of `rows` matches under `root` and times every benchmark on it."""
+    from core import correlation, store
+    from apps import visualization
+
+    # The template partition is read from the real data folder, the synthetic one from `root`
+    settings.DATA_DIR, settings.CACHE_DIR = template_dir
+    start = time.perf_counter()
+    partition = generate.generate_partition(root, rows, stats_files=STATS_FILES)
+    generated = time.perf_counter() - start
+    settings.DATA_DIR, settings.CACHE_DIR = root, os.path.join(root, '.cache')
+
+    records = [{'benchmark': 'generate', 'timings': [generated]}]
+
+    def parse_csv():
+        # A fresh cache file every time, so each repeat parses the CSV
+        store._frames.clear()
+        for cached in os.listdir(settings.CACHE_DIR) if os.path.isdir(settings.CACHE_DIR) else []:
+            os.remove(os.path.join(settings.CACHE_DIR, cached))
+        return store.load_matches(partition)
+
+    def read_parquet():
+        store._frames.clear()
+        return store.load_matches(partition)
+
+    for name, func in (('load.csv', parse_csv), ('load.parquet', read_parquet),
+                       ('load.memo', lambda: store.load_matches(partition))):
+        timings, _ = measure(func, repeat)
+        records.append({'benchmark': name, 'timings': timings})
+
+    df = store.load_matches(partition)
+    numerical_cols = visualization.numerical_columns(df)
+    timings, _ = measure(lambda: df[numerical_cols].corr(), repeat)
+    records.append({'benchmark': 'corr.dataframe', 'timings': timings})
+    timings, engine = measure(lambda: correlation.CorrelationEngine.from_frame(df, numerical_cols), repeat)
+    records.append({'benchmark': 'corr.engine_build', 'timings': timings})
+    timings, _ = measure(lambda: engine.pearson(), repeat)
+    records.append({'benchmark': 'corr.engine_pearson', 'timings': timings})
+
+    stats_file = os.path.join(partition.path, 'stats', STATS_FILES[0])
+    for name, outputs, inputs, changed in callback_requests(partition, stats_file):
+        # One untimed call first, so lazy imports and engine builds are not in the timings
+        dispatch(client, outputs, inputs, changed)
+        timings, body = measure(lambda: dispatch(client, outputs, inputs, changed), repeat)
+        records.append({'benchmark': name, 'timings': timings, 'bytes': len(body)})
+
+    for record in records:
+        timings = record.pop('timings')
+        record.update({
+            'rows': rows,
+            'min_s': min(timings),
+            'median_s': statistics.median(timings),
+            'repeat': len(timings),
+        })
+    return records
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, root=None):
+    """Runs every benchmark at every size and returns the results document."""
+    sys.path.insert(0, os.getcwd())
+    import start
+
+    template_dir = (settings.DATA_DIR, settings.CACHE_DIR)
+    client = start.app.server.test_client()
+    client.get('/')  # Moves the page callbacks into the app, as on the first browser visit
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            rows = int(size)
+            print(f"{rows} rows...", flush=True)
+            results += run_size(client, os.path.join(root or tmp, 'data'), rows, repeat, template_dir)
+
+    return {
+        'commit': git_commit(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(old_path, new_path):
+    """Formats the median time ratio new/old of every benchmark and size present in both files."""
+    with open(old_path) as f:
+        old = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = json.load(f)['results']
+
+    lines = [f"{'benchmark':<28} {'rows':>10} {'old ms':>10} {'new ms':>10} {'ratio':>7}"]
+    for record in new:
+        previous = old.get((record['benchmark'], record['rows']))
+        if previous is None:
+            continue
+        ratio = record['median_s'] / previous['median_s'] if previous['median_s'] else float('nan')
+        lines.append(f"{record['benchmark']:<28} {record['rows']:>10} {previous['median_s'] * 1000:>10.1f} "
+                     f"{record['median_s'] * 1000:>10.1f} {ratio:>7.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time data loading and callbacks on synthetic seasons.")
+    parser.add_argument('--sizes', nargs='+', type=float, default=DEFAULT_SIZES, help="match rows, e.g. 1e3 1e6")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--root', help="keep the generated data in this folder instead of a temporary one")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print(compare(*args.compare))
+        return
+
+    document = run(args.sizes, args.repeat, args.root)
+    output = args.output or os.path.join('benchmarks', 'results', f"{document['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+
+    for record in document['results']:
+        size = f" {record['bytes'] / 1000:8.1f} kB" if 'bytes' in record else ""
+        print(f"{record['benchmark']:<28} {record['rows']:>10} {record['median_s'] * 1000:10.1f} ms{size}")
+    print(f"Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
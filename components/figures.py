@@ -0,0 +1,31 @@
+from core import metrics, settings, startup
+
+
+# Plotly Express is only loaded when the first figure is built
+px = startup.lazy_import("plotly.express")
+go = startup.lazy_import("plotly.graph_objects")
+
+# With callback metrics on, time spent in Plotly Express counts as the 'plotly' phase
+if settings.METRICS:
+    px = metrics.TimedModule(px)
+
+
+# Helper function for graph styling
+@metrics.timed_plotly
+def style_figure(fig):
+    """Applies the glassmorphism theme to a Plotly figure."""
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        title_font_color='white',
+        xaxis_title_font_color='white',
+        yaxis_title_font_color='white',
+        xaxis=dict(tickfont=dict(color='white'), gridcolor='rgba(255, 255, 255, 0.2)'),
+        yaxis=dict(tickfont=dict(color='white'), gridcolor='rgba(255, 255, 255, 0.2)'),
+        font=dict(family="Montserrat, sans-serif"),
+        legend_font_color='white',
+        title_x=0.5, 
+        title_font=dict(size=24, family="Arial")
+
+    )
+    return fig
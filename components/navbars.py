@@ -1,5 +1,7 @@
 import dash_bootstrap_components as dbc
-from dash import dcc, html
+from dash import dcc, html, no_update, Input, Output, State
+from core import catalog, settings, watcher
+from core.metrics import callback
 
 
 navbar = dbc.NavbarSimple(
@@ -8,6 +10,27 @@ navbar = dbc.NavbarSimple(
         dbc.NavItem(dcc.Link("Dataset", href="/dataset", className="nav-link text-dark fw-bold")),
         dbc.NavItem(dcc.Link("Stats", href="/stats", className="nav-link text-dark fw-bold")),
         dbc.NavItem(dcc.Link("Visualization", href="/visualization", className="nav-link text-dark fw-bold")),
+        dbc.NavItem(dcc.Link("Standings", href="/standings", className="nav-link text-dark fw-bold")),
+        dbc.NavItem(dcc.Link("Teams", href="/teams", className="nav-link text-dark fw-bold")),
+        dbc.NavItem(dcc.Link("Simulation", href="/simulation", className="nav-link text-dark fw-bold")),
+        dbc.NavItem(dcc.Link("Similarity", href="/similarity", className="nav-link text-dark fw-bold")),
+        # League/season selector; persisted for the session so it survives page changes
+        dbc.NavItem(dcc.Dropdown(
+            id='partition-dropdown',
+            options=catalog.dropdown_options(),
+            value=settings.DEFAULT_PARTITION,
+            clearable=False,
+            persistence=True,
+            persistence_type='session',
+            style={'minWidth': '200px'},
+        ), className="ms-3 align-self-center"),
+        # Polls for data files ingested by the watcher; the refresh stores change only when
+        # the selected partition's matches (resp. Stats files) did, and are inputs of the
+        # callbacks showing them
+        dcc.Interval(id='data-watch-interval', interval=settings.WATCH_INTERVAL * 1000, disabled=not settings.WATCH),
+        dcc.Store(id='data-versions'),
+        dcc.Store(id='matches-refresh'),
+        dcc.Store(id='stats-refresh'),
     ],
     brand=html.Div([
         dcc.Link(
@@ -20,4 +43,27 @@ navbar = dbc.NavbarSimple(
         )
     ]),
     dark=False,
-)
\ No newline at end of file
+)
+
+# The first call records the versions the page was built with; later ticks pass on changes
+@callback(
+    Output('data-versions', 'data'),
+    Output('matches-refresh', 'data'),
+    Output('stats-refresh', 'data'),
+    Input('data-watch-interval', 'n_intervals'),
+    Input('partition-dropdown', 'value'),
+    State('data-versions', 'data')
+)
+def poll_data_versions(n_intervals, partition, seen):
+    if not settings.WATCH:
+        return no_update, no_update, no_update
+    partition = catalog.parse(partition)
+    versions = {'partition': partition.key, **watcher.versions(partition)}
+    if not seen or seen.get('partition') != partition.key:
+        return versions, no_update, no_update
+    if versions == seen:
+        return no_update, no_update, no_update
+    return tuple([versions] + [
+        versions.get(kind) if versions.get(kind) != seen.get(kind) else no_update
+        for kind in watcher.KINDS
+    ])
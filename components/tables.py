@@ -0,0 +1,44 @@
+from dash import dash_table
+
+
+def paged_table(table_id, columns=None, page_size=20):
+    """Builds a glassmorphism DataTable that pages, sorts and filters on the server."""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=columns or [],
+        data=[],
+
+        # Only the visible page is sent; sorting and filtering run in the callback
+        page_current=0,
+        page_size=page_size,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+
+        # Enables horizontal scrolling
+        style_table={'overflowX': 'auto'},
+
+        # Removes grid lines for a cleaner look
+        style_as_list_view=True,
+
+        # Glassmorphism style
+        style_cell={
+            'padding': '10px',
+            'backgroundColor': 'transparent',
+            'color': 'white',
+            'fontFamily': 'Montserrat, sans-serif',
+        },
+        style_header={
+            'backgroundColor': 'rgba(255, 255, 255, 0.1)',
+            'fontWeight': 'bold',
+            'borderBottom': '1px solid rgba(255, 255, 255, 0.2)'
+        },
+        style_filter={
+            'backgroundColor': 'rgba(255, 255, 255, 0.05)',
+            'color': 'white',
+        },
+        selected_columns=[],
+    )
@@ -0,0 +1,84 @@
+"""Bounded in-memory caches for parsed tables."""
+import os
+import threading
+from collections import OrderedDict
+
+
+class TableCache:
+    """LRU cache of parsed tables, keyed by path and mtime and bounded by memory size.
+
+    `loader(path)` is called on a miss. Entries are sized with
+    `memory_usage(deep=True)` and the least recently used ones are evicted once
+    the total goes over `max_bytes`; a table larger than the whole budget is
+    returned without being cached.
+    """
+
+    def __init__(self, loader, max_bytes):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, nbytes, table)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            if entry is not None:
+                # The file changed on disk since it was cached
+                self._drop(path)
+                self.invalidations += 1
+
+        table = self.loader(path)
+        nbytes = int(table.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return table
+
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            self._entries[path] = (mtime_ns, nbytes, table)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return table
+
+    def __contains__(self, path):
+        with self._lock:
+            return path in self._entries
+
+    def _drop(self, path):
+        _, nbytes, _ = self._entries.pop(path)
+        self._bytes -= nbytes
+
+    def invalidate(self, path=None):
+        """Forgets one path, or every entry when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif path in self._entries:
+                self._drop(path)
+
+    def stats(self):
+        """Returns the hit/miss counters and current memory use."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,95 @@
+"""Catalog of the partitioned datasets.
+
+Data is laid out by league and season::
+
+    <DATA_DIR>/<league>/<season>/matches/<matches>.csv
+    <DATA_DIR>/<league>/<season>/stats/*.csv
+    <DATA_DIR>/<league>/<season>/events/*.csv   (optional event feeds, see core.ingest)
+
+Partitions are discovered from folder names alone, so listing or pruning
+them never reads a data file; a view only loads the partitions it selects.
+"""
+import glob
+import os
+from collections import namedtuple
+
+from core import settings
+
+
+LEAGUE_NAMES = {
+    'laliga': 'LaLiga',
+    'premier-league': 'Premier League',
+    'serie-a': 'Serie A',
+    'bundesliga': 'Bundesliga',
+    'ligue-1': 'Ligue 1',
+}
+
+
+class Partition(namedtuple('Partition', ['league', 'season'])):
+    """One league season, e.g. Partition('laliga', '2023-24')."""
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        return f"{self.league}/{self.season}"
+
+    @property
+    def label(self):
+        league = LEAGUE_NAMES.get(self.league, self.league.replace('-', ' ').title())
+        return f"{league} {self.season.replace('-', '/')}"
+
+    @property
+    def path(self):
+        return os.path.join(settings.DATA_DIR, self.league, self.season)
+
+
+def discover():
+    """Lists every partition that has a matches or stats folder, by league then season."""
+    partitions = []
+    for league_dir in sorted(glob.glob(os.path.join(settings.DATA_DIR, '*', ''))):
+        league = os.path.basename(os.path.dirname(league_dir))
+        if league.startswith('.'):
+            continue
+        for season_dir in sorted(glob.glob(os.path.join(league_dir, '*', ''))):
+            season = os.path.basename(os.path.dirname(season_dir))
+            if os.path.isdir(os.path.join(season_dir, 'matches')) or os.path.isdir(os.path.join(season_dir, 'stats')):
+                partitions.append(Partition(league, season))
+    return partitions
+
+
+def parse(key):
+    """Turns a '<league>/<season>' key into a Partition; None gives the default partition."""
+    if isinstance(key, Partition):
+        return key
+    league, _, season = (key or settings.DEFAULT_PARTITION).partition('/')
+    return Partition(league, season)
+
+
+def prune(league=None, seasons=None):
+    """Returns the partitions matching a league and/or a collection of seasons."""
+    return [
+        p for p in discover()
+        if (league is None or p.league == league) and (seasons is None or p.season in seasons)
+    ]
+
+
+def matches_path(partition=None):
+    """Returns the matches CSV of a partition (one file per partition)."""
+    partition = parse(partition)
+    files = sorted(glob.glob(os.path.join(partition.path, 'matches', '*.csv')))
+    if not files:
+        raise FileNotFoundError(f"No matches file for {partition.key}")
+    return files[0]
+
+
+def stats_dir(partition=None):
+    return os.path.join(parse(partition).path, 'stats')
+
+
+def events_dir(partition=None):
+    return os.path.join(parse(partition).path, 'events')
+
+
+def dropdown_options():
+    return [{'label': p.label, 'value': p.key} for p in discover()]
@@ -0,0 +1,48 @@
+"""Compact columnar encoding of frames for the browser.
+
+Each column is sent as one base64 string of a little-endian typed array,
+narrowed to the smallest integer type that holds it; text and categorical
+columns are dictionary-encoded as integer codes plus the list of categories
+(in order of first appearance). ``assets/clientside.js`` decodes the columns
+back into JavaScript typed arrays.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+
+INTEGER_TYPES = [np.int8, np.int16, np.int32]
+CODE_TYPES = [np.uint8, np.uint16, np.uint32]
+
+
+def _narrowest(values, candidates):
+    for candidate in candidates:
+        info = np.iinfo(candidate)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return values.astype(candidate)
+    return values.astype(np.float64)
+
+
+def _pack(values):
+    array = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))
+    return {'dtype': array.dtype.name, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def encode_column(series):
+    """Encodes one column as {'dtype', 'data'} plus 'categories' for dictionary-encoded text."""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+            return _pack(_narrowest(series.to_numpy(dtype=np.int64), INTEGER_TYPES))
+        return _pack(series.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    codes, categories = pd.factorize(series.astype(str), sort=False)
+    encoded = _pack(_narrowest(codes, CODE_TYPES))
+    encoded['categories'] = categories.tolist()
+    return encoded
+
+
+def encode_frame(df, columns=None):
+    """Encodes the selected columns of `df` (all by default)."""
+    columns = list(df.columns) if columns is None else columns
+    return {'length': len(df), 'columns': {col: encode_column(df[col]) for col in columns}}
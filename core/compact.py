@@ -0,0 +1,179 @@
+"""Compact in-memory dtypes for the loaded tables.
+
+`compact_frame` runs on every table the store parses, before its columnar
+cache is written, so every later load (and every memory-mapped worker) gets
+the compact copy directly:
+
+* columns the schema types as categorical (teams, result codes,
+  countries) become pandas categoricals: one small integer code per row
+  instead of a pointer to a Python string;
+* integer columns, and float columns holding only whole numbers (e.g. 21.0
+  clean sheets), become the narrowest integer type that holds their range;
+  whole-number floats with gaps become float32, which is exact up to 2**24;
+* other float columns stay float64: narrowing 0.33 to float32 would show as
+  0.33000001 in tables and hover labels.
+
+Columns the schema does not cover are inferred: text with mostly repeated
+values becomes categorical, while columns typed 'text' (player names, which
+rarely repeat within a file) are left alone. Already compact columns are
+returned as they are, so compacting a frame read from an up-to-date cache
+copies nothing.
+
+Run ``python -m core.compact [--partition laliga/2023-24] [--stats]`` for the
+memory report (bytes per column before and after).
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import catalog, schema
+
+
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+# Text columns outside the schema become categorical when they have at most this share of distinct values
+CATEGORY_RATIO = 0.5
+# Largest whole number float32 represents exactly
+FLOAT32_EXACT = 2 ** 24
+
+COLUMN_TYPES = {**schema.MATCH_COLUMN_TYPES, **schema.STATS_COLUMN_TYPES}
+
+
+def _narrowest_int(values):
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for candidate in INTEGER_TYPES:
+        info = np.iinfo(candidate)
+        if low >= info.min and high <= info.max:
+            return candidate
+    return np.int64
+
+
+def compact_column(series, data_type=None):
+    """Returns `series` with its most compact lossless dtype, or `series` itself when it already has it."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype) \
+            or pd.api.types.is_datetime64_any_dtype(dtype):
+        return series
+
+    if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+        target = _narrowest_int(series.to_numpy())
+        return series if target == dtype else series.astype(target)
+
+    if pd.api.types.is_float_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        if not len(finite) or not np.array_equal(finite, np.round(finite)):
+            return series
+        if len(finite) == len(values):
+            return series.astype(_narrowest_int(finite))
+        if dtype != np.float32 and np.abs(finite).max() <= FLOAT32_EXACT:
+            return series.astype(np.float32)
+        return series
+
+    if data_type == 'text':
+        return series
+    if data_type == 'categorical' or series.nunique() <= CATEGORY_RATIO * len(series):
+        return series.astype('category')
+    return series
+
+
+def compact_frame(df, column_types=None):
+    """Compacts every column of `df`; `column_types` maps columns to schema types (default: COLUMN_TYPES).
+
+    Returns `df` itself when nothing changes.
+    """
+    column_types = COLUMN_TYPES if column_types is None else column_types
+    changed = {}
+    for col in df.columns:
+        series = df[col]
+        compacted = compact_column(series, column_types.get(col))
+        if compacted is not series:
+            changed[col] = compacted
+    return df.assign(**changed) if changed else df
+
+
+def memory_report(before, after=None):
+    """Bytes per column of `before` and of its compacted copy `after`, largest saving first, with a total row."""
+    after = compact_frame(before) if after is None else after
+    bytes_before = before.memory_usage(deep=True, index=False)
+    bytes_after = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': before.columns,
+        'dtype_before': [str(before[c].dtype) for c in before.columns],
+        'dtype_after': [str(after[c].dtype) for c in before.columns],
+        'bytes_before': bytes_before[before.columns].to_numpy(),
+        'bytes_after': bytes_after[before.columns].to_numpy(),
+    })
+    report = report.sort_values('bytes_before', ascending=False, key=lambda b: b - report['bytes_after'],
+                                kind='stable', ignore_index=True)
+    total = pd.DataFrame([{
+        'column': 'Total', 'dtype_before': '', 'dtype_after': '',
+        'bytes_before': int(report['bytes_before'].sum()), 'bytes_after': int(report['bytes_after'].sum()),
+    }])
+    report = pd.concat([report, total], ignore_index=True)
+    saved = 1 - report['bytes_after'] / report['bytes_before'].where(report['bytes_before'] > 0)
+    return report.assign(saved=(100 * saved.fillna(0)).round(1))
+
+
+def raw_matches(partition=None):
+    """A partition's matches as parsed without compaction, with the derived columns."""
+    from core import store
+
+    partition = catalog.parse(partition)
+    df = pd.read_csv(catalog.matches_path(partition), index_col=0)
+    return store.derive_match_columns(df, partition)
+
+
+def matches_report(partition=None):
+    """Memory report of a partition's matches frame."""
+    return memory_report(raw_matches(partition))
+
+
+def stats_reports(partition=None):
+    """Memory report of every Stats file of a partition, by file name."""
+    paths = sorted(glob.glob(os.path.join(catalog.stats_dir(partition), '*.csv')))
+    return {os.path.basename(path): memory_report(pd.read_csv(path)) for path in paths}
+
+
+def format_report(report):
+    lines = [f"  {'column':<34} {'before':>10} {'after':>10} {'saved':>7}  dtype"]
+    for row in report.itertuples(index=False):
+        dtypes = f"{row.dtype_before} -> {row.dtype_after}" if row.dtype_before else ""
+        lines.append(f"  {row.column:<34} {row.bytes_before:>10,} {row.bytes_after:>10,} {row.saved:>6.1f}%  {dtypes}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the memory saved by compacting the loaded tables.")
+    parser.add_argument('--partition', help="'<league>/<season>' (default: the configured partition)")
+    parser.add_argument('--stats', action='store_true', help="also report every Stats file, as one total per file")
+    args = parser.parse_args(argv)
+
+    partition = catalog.parse(args.partition)
+    print(f"Matches of {partition.key}:")
+    report = matches_report(partition)
+    print(format_report(report))
+    before, after = report.iloc[-1][['bytes_before', 'bytes_after']]
+
+    if args.stats:
+        print(f"\nStats files of {partition.key}:")
+        totals = pd.DataFrame([
+            dict(report.iloc[-1], column=name, dtype_before='')
+            for name, report in stats_reports(partition).items()
+        ])
+        totals = pd.concat([totals, pd.DataFrame([{
+            'column': 'Total', 'dtype_before': '', 'dtype_after': '',
+            'bytes_before': totals['bytes_before'].sum(), 'bytes_after': totals['bytes_after'].sum(),
+        }])], ignore_index=True)
+        totals['saved'] = (100 * (1 - totals['bytes_after'] / totals['bytes_before'])).round(1)
+        print(format_report(totals))
+        before += totals.iloc[-1]['bytes_before']
+        after += totals.iloc[-1]['bytes_after']
+
+    print(f"\nTotal: {before:,} -> {after:,} bytes ({100 * (1 - after / before):.1f}% saved)")
+
+
+if __name__ == '__main__':
+    main()
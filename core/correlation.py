@@ -0,0 +1,142 @@
+"""Streaming correlation engine for the heatmap.
+
+Keeps running sums, sums of squares and cross-products per partition
+(season and round, and additionally per team), counted per column pair over
+the rows where both values are present, so that:
+
+* a new match row is folded in at O(k²) for k numerical columns,
+* a correlation matrix filtered by team, round range or season is the sum of
+  the matching partitions' moments, without rescanning the rows,
+* missing values leave out only the pairs they occur in, as in `DataFrame.corr()`.
+
+Spearman correlation needs ranks and is computed on demand from the rows.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.trendlines import PairwiseStats, pairwise_sums
+
+
+class RunningMoments:
+    """Pairwise-complete count, sums, sums of squares and cross-products of k columns.
+
+    Entry [i, j] of each k x k array only counts the rows where columns i and
+    j are both finite (see `trendlines.pairwise_sums`), so a missing value
+    drops that row from its column's pairs only, like `DataFrame.corr()`.
+    Moments are additive: `a + b` describes the union of both row sets.
+    """
+
+    def __init__(self, k):
+        self.n = np.zeros((k, k))
+        self.sum = np.zeros((k, k))
+        self.sumsq = np.zeros((k, k))
+        self.cross = np.zeros((k, k))
+
+    def add_row(self, row):
+        self.add_rows([row])
+
+    def add_rows(self, values):
+        n, sums, sumsq, cross = pairwise_sums(values)
+        self.n += n
+        self.sum += sums
+        self.sumsq += sumsq
+        self.cross += cross
+
+    def __add__(self, other):
+        total = RunningMoments(len(self.sum))
+        total.n = self.n + other.n
+        total.sum = self.sum + other.sum
+        total.sumsq = self.sumsq + other.sumsq
+        total.cross = self.cross + other.cross
+        return total
+
+    def stats(self, columns):
+        return PairwiseStats.from_sums(columns, self.n, self.sum, self.sumsq, self.cross)
+
+
+class CorrelationEngine:
+    """Partitioned running moments of the numerical columns of the matches frame."""
+
+    def __init__(self, columns, team_cols=('home_team', 'away_team')):
+        self.columns = list(columns)
+        self.team_cols = list(team_cols)
+        self._rounds = {}  # (season, round) -> RunningMoments
+        self._teams = {}   # (team, season, round) -> RunningMoments
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, columns, team_cols=('home_team', 'away_team')):
+        engine = cls(columns, team_cols)
+        engine.add_frame(df)
+        return engine
+
+    def _partition(self, partitions, key):
+        moments = partitions.get(key)
+        if moments is None:
+            moments = partitions[key] = RunningMoments(len(self.columns))
+        return moments
+
+    @staticmethod
+    def _season_of(df):
+        # Frames without a season column are treated as one unnamed season
+        return df['season'].to_numpy() if 'season' in df.columns else np.full(len(df), '', dtype=object)
+
+    def add_frame(self, df):
+        """Folds a frame of new rows into the partitions, one matrix product per partition."""
+        values = df[self.columns].to_numpy(dtype=float)
+        seasons = self._season_of(df)
+        rounds = df['round'].to_numpy()
+        positions = pd.Series(np.arange(len(df)))
+        with self._lock:
+            for key, rows in positions.groupby([seasons, rounds]).groups.items():
+                self._partition(self._rounds, key).add_rows(values[rows])
+            for team_col in self.team_cols:
+                teams = df[team_col].to_numpy()
+                for key, rows in positions.groupby([teams, seasons, rounds]).groups.items():
+                    self._partition(self._teams, key).add_rows(values[rows])
+
+    def add_row(self, row):
+        """Folds a single match (a mapping or Series) into its partitions in O(k²)."""
+        values = [row[col] for col in self.columns]
+        season = row.get('season', '')
+        with self._lock:
+            self._partition(self._rounds, (season, row['round'])).add_row(values)
+            for team_col in self.team_cols:
+                self._partition(self._teams, (row[team_col], season, row['round'])).add_row(values)
+
+    def moments(self, team=None, rounds=None, seasons=None):
+        """Sums the moments of the partitions matching the filters."""
+        total = RunningMoments(len(self.columns))
+        with self._lock:
+            if team is None:
+                items = ((season, rnd, m) for (season, rnd), m in self._rounds.items())
+            else:
+                items = ((season, rnd, m) for (t, season, rnd), m in self._teams.items() if t == team)
+            for season, rnd, moments in items:
+                if rounds is not None and not rounds[0] <= rnd <= rounds[1]:
+                    continue
+                if seasons is not None and season not in seasons:
+                    continue
+                total = total + moments
+        return total
+
+    def pearson(self, team=None, rounds=None, seasons=None):
+        """Returns the Pearson correlation matrix for the filtered partitions."""
+        return self.pairwise_stats(team, rounds, seasons).corr_frame()
+
+    def pairwise_stats(self, team=None, rounds=None, seasons=None):
+        """Returns the filtered moments as `PairwiseStats`, for trendline fits."""
+        return self.moments(team, rounds, seasons).stats(self.columns)
+
+    def spearman(self, df, team=None, rounds=None, seasons=None):
+        """Computes the Spearman correlation of the matching rows of `df` on demand."""
+        mask = np.ones(len(df), dtype=bool)
+        if team is not None:
+            mask &= np.logical_or.reduce([(df[col] == team).to_numpy() for col in self.team_cols])
+        if rounds is not None:
+            mask &= df['round'].between(rounds[0], rounds[1]).to_numpy()
+        if seasons is not None and 'season' in df.columns:
+            mask &= df['season'].isin(seasons).to_numpy()
+        return df.loc[mask, self.columns].rank().corr()
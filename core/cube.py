@@ -0,0 +1,157 @@
+"""Pre-aggregated cube of the match metrics for the Trend Analysis tab.
+
+The cube keeps count, sum, sum of squares, min and max of every numerical
+metric per cell of a few grouped views (cuboids): each trend dimension
+(round, day of week, month) alone and crossed with the home and the away
+team. Means, variances, confidence bands and team-filtered trends are then
+read off the cells instead of regrouping the matches, and new matches are
+folded into the cells in place (`add_frame`) instead of rebuilding the cube.
+"""
+import statistics
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+TREND_DIMENSIONS = ['round', 'day_of_week', 'month_name']
+TEAM_DIMENSIONS = ['home_team', 'away_team']
+VENUES = ('either', 'home', 'away')
+
+
+class Dimension:
+    """Values of one grouping column and their cell positions; grows as new values arrive."""
+
+    def __init__(self):
+        self.values = []
+        self.index = pd.Index([])
+        self.categories = None  # Display order for categorical columns
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, series):
+        """Returns the cell position of every value, adding unseen values at the end."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            self.categories = list(series.cat.categories)
+        values = series.to_numpy(dtype=object)
+        positions = self.index.get_indexer(values)
+        unseen = positions < 0
+        if unseen.any():
+            self.values += list(pd.unique(values[unseen]))
+            self.index = pd.Index(self.values)
+            positions = self.index.get_indexer(values)
+        return positions
+
+    def order(self):
+        """Cell positions in display order: category order, else sorted values."""
+        if self.categories is not None:
+            rank = {value: i for i, value in enumerate(self.categories)}
+            return sorted(range(len(self.values)), key=lambda i: rank.get(self.values[i], len(rank)))
+        return sorted(range(len(self.values)), key=lambda i: self.values[i])
+
+
+class Cuboid:
+    """Dense arrays of the five running statistics over some dimensions, with the metrics last."""
+
+    def __init__(self, dimensions, k):
+        self.dimensions = dimensions
+        shape = (0,) * len(dimensions) + (k,)
+        self.count = np.zeros(shape)
+        self.sum = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def resize(self, sizes):
+        pad = [(0, size - current) for size, current in zip(sizes, self.count.shape)] + [(0, 0)]
+        if any(after for _, after in pad):
+            self.count = np.pad(self.count, pad)
+            self.sum = np.pad(self.sum, pad)
+            self.sumsq = np.pad(self.sumsq, pad)
+            self.min = np.pad(self.min, pad, constant_values=np.inf)
+            self.max = np.pad(self.max, pad, constant_values=-np.inf)
+
+    def add(self, cells, values, valid):
+        np.add.at(self.count, cells, valid)
+        np.add.at(self.sum, cells, np.where(valid, values, 0.0))
+        np.add.at(self.sumsq, cells, np.where(valid, values * values, 0.0))
+        np.minimum.at(self.min, cells, np.where(valid, values, np.inf))
+        np.maximum.at(self.max, cells, np.where(valid, values, -np.inf))
+
+
+class TrendCube:
+    """Cuboids of every trend dimension, alone and by home and away team."""
+
+    def __init__(self, metrics):
+        self.metrics = list(metrics)
+        self.rows = 0
+        self.dimensions = {name: Dimension() for name in TREND_DIMENSIONS + TEAM_DIMENSIONS}
+        self.cuboids = {}
+        for by in TREND_DIMENSIONS:
+            self.cuboids[(by,)] = Cuboid((by,), len(self.metrics))
+            for team in TEAM_DIMENSIONS:
+                self.cuboids[(team, by)] = Cuboid((team, by), len(self.metrics))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, metrics):
+        cube = cls(metrics)
+        cube.add_frame(df)
+        return cube
+
+    def add_frame(self, df):
+        """Folds new match rows into every cell they belong to, in O(rows x metrics) per cuboid."""
+        values = df[self.metrics].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        with self._lock:
+            positions = {name: dim.encode(df[name]) for name, dim in self.dimensions.items()}
+            for dimensions, cuboid in self.cuboids.items():
+                cuboid.resize([len(self.dimensions[name]) for name in dimensions])
+                cuboid.add(tuple(positions[name] for name in dimensions), values, valid)
+            self.rows += len(df)
+
+    def _cells(self, metric, by, team, venue):
+        # Returns (count, sum, sumsq, min, max) along `by` for one metric, summed over the venues
+        m = self.metrics.index(metric)
+        if team is None:
+            cuboid = self.cuboids[(by,)]
+            return [a[..., m] for a in (cuboid.count, cuboid.sum, cuboid.sumsq, cuboid.min, cuboid.max)]
+
+        size = len(self.dimensions[by])
+        total = [np.zeros(size), np.zeros(size), np.zeros(size), np.full(size, np.inf), np.full(size, -np.inf)]
+        for team_dim in TEAM_DIMENSIONS:
+            if venue != 'either' and not team_dim.startswith(venue):
+                continue
+            position = self.dimensions[team_dim].index.get_indexer([team])[0]
+            if position < 0:
+                continue
+            cuboid = self.cuboids[(team_dim, by)]
+            total[0] = total[0] + cuboid.count[position, :, m]
+            total[1] = total[1] + cuboid.sum[position, :, m]
+            total[2] = total[2] + cuboid.sumsq[position, :, m]
+            total[3] = np.minimum(total[3], cuboid.min[position, :, m])
+            total[4] = np.maximum(total[4], cuboid.max[position, :, m])
+        return total
+
+    def trend(self, metric, by, team=None, venue='either', level=0.95):
+        """Returns count, mean, variance, std, min, max and a normal confidence band of `metric` per `by` value.
+
+        With `team`, only that team's matches count: at home, away, or 'either'.
+        """
+        with self._lock:
+            count, total, sumsq, low, high = self._cells(metric, by, team, venue)
+            order = self.dimensions[by].order()
+            values = [self.dimensions[by].values[i] for i in order]
+
+        count, total, sumsq, low, high = (a[order] for a in (count, total, sumsq, low, high))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            variance = np.clip(sumsq - count * mean ** 2, 0, None) / (count - 1)
+        std = np.sqrt(variance)
+        margin = statistics.NormalDist().inv_cdf((1 + level) / 2) * std / np.sqrt(count)
+        trend = pd.DataFrame({
+            by: values, 'count': count, 'mean': mean, 'variance': variance, 'std': std,
+            'min': low, 'max': high, 'ci_low': mean - margin, 'ci_high': mean + margin,
+        })
+        return trend[trend['count'] > 0].reset_index(drop=True)
@@ -0,0 +1,68 @@
+"""Bounded-size figure data for large frames.
+
+Above ``settings.LARGE_DATA_ROWS`` rows the visualization callbacks stop
+handing raw columns to Plotly Express: histograms and box plots are computed
+here and only bin edges, counts and quartiles are sent, and scatter plots
+switch to WebGL. Above ``settings.DENSITY_ROWS`` points a scatter becomes a
+fixed-size grid of counts. The figure payload then depends on the number of
+bins, groups and grid cells, not on the number of rows.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=float)
+    return values[np.isfinite(values)]
+
+
+def histogram(values, nbins):
+    """Returns (edges, counts) of the finite `values` in about `nbins` equal-width bins.
+
+    Whole-number data with a short range gets one bin per value, centred on it.
+    """
+    values = _finite(values)
+    if not len(values):
+        return np.array([0.0, 1.0]), np.array([0])
+    low, high = values.min(), values.max()
+    if np.all(values == np.round(values)) and high - low < nbins:
+        edges = np.arange(low - 0.5, high + 1.5)
+    else:
+        edges = np.histogram_bin_edges(values, bins=nbins, range=(low, high) if high > low else (low - 0.5, high + 0.5))
+    counts, _ = np.histogram(values, bins=edges)
+    return edges, counts
+
+
+def box_stats(values, groups):
+    """Returns quartiles and whisker ends (the furthest values within 1.5 IQR) of `values` per group."""
+    frame = pd.DataFrame({'group': np.asarray(groups), 'value': np.asarray(values, dtype=float)}).dropna()
+    grouped = frame.groupby('group', sort=True)['value']
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+
+    iqr = stats['q3'] - stats['q1']
+    low = (stats['q1'] - 1.5 * iqr).reindex(frame['group']).to_numpy()
+    high = (stats['q3'] + 1.5 * iqr).reindex(frame['group']).to_numpy()
+    inside = frame[(frame['value'] >= low) & (frame['value'] <= high)].groupby('group')['value']
+    stats['lowerfence'] = inside.min()
+    stats['upperfence'] = inside.max()
+    stats['count'] = grouped.size()
+    return stats.reset_index()
+
+
+def density_grid(x, y, size):
+    """Counts the (x, y) points in a `size` x `size` grid.
+
+    Returns the x and y cell centres and the counts (rows are y), with empty
+    cells as NaN so they render transparent.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    if not len(x):
+        return np.array([]), np.array([]), np.empty((0, 0))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=size)
+    counts = counts.astype(np.float32)
+    counts[counts == 0] = np.nan
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts.T
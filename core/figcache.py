@@ -0,0 +1,187 @@
+"""Cache of serialized Plotly figures for deterministic callbacks.
+
+A callback wrapped with `FigureCache.cached(name)` builds its figure once per
+combination of arguments and data version; repeat calls return the stored
+figure instead of running Plotly Express and `style_figure` again.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+
+class MemoryBackend:
+    """LRU store of decoded figures, bounded by the size of their JSON."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (nbytes, figure dict)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, figure_json):
+        nbytes = len(figure_json)
+        if nbytes > self.max_bytes:
+            return
+        figure = json.loads(figure_json)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[0]
+            self._entries[key] = (nbytes, figure)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def size(self):
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
+class DiskBackend:
+    """Directory of figure JSON files, trimmed oldest-first to stay under `max_bytes`."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                figure = json.load(f)
+        except (OSError, ValueError):
+            # Missing, trimmed by another worker or caught mid-write
+            figure = None
+        with self._lock:
+            if figure is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return figure
+
+    def set(self, key, figure_json):
+        if len(figure_json) > self.max_bytes:
+            return
+        tmp_file = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(figure_json)
+        os.replace(tmp_file, self._path(key))
+        self._trim()
+
+    def _files(self):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Trimmed or cleared by another worker since the scan started
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _trim(self):
+        with self._lock:
+            files = sorted(self._files())
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._files():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def size(self):
+        files = self._files()
+        return len(files), sum(size for _, size, _ in files)
+
+
+class FigureCache:
+    """Memoizes figure-returning callbacks on their arguments and a data version.
+
+    `version` is called with the callback's arguments on every lookup and
+    should change whenever the data behind the figures does, e.g. the source
+    file's mtime.
+    """
+
+    def __init__(self, backend=None, version=None):
+        self.backend = backend
+        self.version = version or (lambda *args: None)
+
+    def key(self, name, args):
+        raw = json.dumps([name, self.version(*args), list(args)], default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def cached(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                # Always the figure's JSON-decoded dict, whether it comes from the cache or not
+                if self.backend is None:
+                    return json.loads(pio.to_json(func(*args), validate=False))
+
+                key = self.key(name, args)
+                figure = self.backend.get(key)
+                if figure is not None:
+                    return figure
+
+                figure_json = pio.to_json(func(*args), validate=False)
+                self.backend.set(key, figure_json)
+                return json.loads(figure_json)
+
+            return wrapper
+        return decorator
+
+    def stats(self):
+        if self.backend is None:
+            return {'hits': 0, 'misses': 0, 'entries': 0, 'bytes': 0}
+        entries, nbytes = self.backend.size()
+        return {'hits': self.backend.hits, 'misses': self.backend.misses, 'entries': entries, 'bytes': nbytes}
+
+
+def make_backend(kind, directory, max_bytes):
+    """Builds the backend named by the FIGURE_CACHE setting ('memory', 'disk' or 'off')."""
+    if kind == 'memory':
+        return MemoryBackend(max_bytes)
+    if kind == 'disk':
+        return DiskBackend(directory, max_bytes)
+    return None
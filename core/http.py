@@ -0,0 +1,33 @@
+"""Compression and HTTP caching for the Flask server behind Dash.
+
+Responses are compressed with Brotli or gzip by Flask-Compress (``Dash(compress=...)``,
+on unless LALIGA_COMPRESS=0), which covers the callback JSON, the page shell
+and the assets.
+
+On top of that, `install(app)` gives GET responses (page shells,
+``/_dash-layout``, ``/_dash-dependencies``) a content-hash ETag and
+``Cache-Control: no-cache``, so a repeat visit is answered with an empty 304
+when nothing changed. Callback responses answer POST requests, which browsers
+neither cache nor revalidate, so they are left alone.
+"""
+import hashlib
+
+
+def content_etag(response):
+    return hashlib.sha1(response.get_data()).hexdigest()
+
+
+def install(app):
+    """Adds ETags and Cache-Control headers to the GET responses of `app`."""
+    from flask import request
+
+    @app.server.after_request
+    def add_cache_headers(response):
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+
+        if request.method in ('GET', 'HEAD') and response.mimetype in ('text/html', 'application/json'):
+            response.set_etag(content_etag(response))
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return response
@@ -0,0 +1,172 @@
+"""Chunked ingest of event-level feeds into the per-match columns.
+
+Event feeds (one row per shot, pass, foul, corner or card, keyed by the
+match's index in the matches file; see `schema.EVENT_SCHEMA`) sit next to a
+partition's matches file::
+
+    <DATA_DIR>/<league>/<season>/events/*.csv
+
+They are far larger than memory, so each feed is streamed in chunks of
+``settings.INGEST_CHUNK_ROWS`` rows: a chunk is parsed (categoricals for
+names and event types, 64-bit integers for numbers so nothing wraps around),
+validated including the value ranges, narrowed to int8/int16/int32 and
+reduced to per-match counts, which are summed across chunks. Peak memory is
+one chunk plus one row per match, whatever the size of the feed.
+
+The counts are written as Parquet into the same partition::
+
+    <DATA_DIR>/<league>/<season>/events/match_metrics.parquet
+
+and `merge_metrics` overlays them on the matches frame. Run
+``python -m core.ingest --partition laliga/2023-24 [--update-matches]``.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import catalog, schema, settings
+
+
+# Read dtypes of the event feed columns: wide enough that out-of-range values reach validation intact
+EVENT_DTYPES = {
+    'match_id': 'int64',
+    'team': 'category',
+    'event': 'category',
+    'minute': 'int64',
+    'on_target': 'int64',
+}
+
+# Dtypes the validated chunks are narrowed to
+EVENT_COMPACT_DTYPES = {
+    'match_id': 'int32',
+    'minute': 'int16',
+    'on_target': 'int8',
+}
+
+# Per-match metric (without the home_team_/away_team_ prefix) -> events it counts
+EVENT_METRICS = {
+    'shots': lambda chunk: chunk['event'] == 'shot',
+    'shots_on_target': lambda chunk: (chunk['event'] == 'shot') & (chunk['on_target'] == 1),
+    'fouls_committed': lambda chunk: chunk['event'] == 'foul',
+    'corners': lambda chunk: chunk['event'] == 'corner',
+    'yellow_cards': lambda chunk: chunk['event'] == 'yellow_card',
+    'red_cards': lambda chunk: chunk['event'] == 'red_card',
+}
+
+METRIC_COLUMNS = [f"{side}_team_{metric}" for metric in EVENT_METRICS for side in ('home', 'away')]
+
+OUTPUT_FILE = 'match_metrics.parquet'
+
+
+def read_events(path, fixtures, chunk_size=None):
+    """Yields the validated chunks of an event feed; `fixtures` as for `schema.validate_events`."""
+    chunk_size = chunk_size or settings.INGEST_CHUNK_ROWS
+    start = 0
+    try:
+        for chunk in pd.read_csv(path, usecols=list(EVENT_DTYPES), dtype=EVENT_DTYPES, chunksize=chunk_size):
+            schema.validate_events(chunk, fixtures, source=f"{path} rows {start}-{start + len(chunk) - 1}")
+            start += len(chunk)
+            yield chunk.astype(EVENT_COMPACT_DTYPES)
+    except schema.SchemaError:
+        raise
+    except ValueError as exc:
+        # Missing columns and values that do not fit the read dtypes
+        raise schema.SchemaError(f"{path} does not match the schema: {exc}") from exc
+
+
+class MetricCounter:
+    """Running per-match counts of every metric column, one dense row per match."""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.home_teams = fixtures['home_team'].astype(str).to_numpy()
+        self.counts = np.zeros((len(fixtures), len(METRIC_COLUMNS)), dtype=np.int64)
+        self.seen = np.zeros(len(fixtures), dtype=bool)
+
+    def add(self, chunk):
+        positions = self.fixtures.index.get_indexer(chunk['match_id'])
+        home = schema.as_strings(chunk['team']) == self.home_teams[positions]
+        n = len(self.fixtures)
+        for i, column in enumerate(METRIC_COLUMNS):
+            side, metric = column.split('_team_', 1)
+            selected = EVENT_METRICS[metric](chunk).to_numpy() & (home if side == 'home' else ~home)
+            self.counts[:, i] += np.bincount(positions[selected], minlength=n)
+        self.seen[positions] = True
+
+    def frame(self):
+        """Counts of the matches that had at least one event, indexed by match id."""
+        metrics = pd.DataFrame(self.counts, index=self.fixtures.index, columns=METRIC_COLUMNS)
+        metrics.index.name = 'match_id'
+        return metrics[self.seen]
+
+
+def aggregate_events(paths, fixtures, chunk_size=None):
+    """Streams the feeds and returns the METRIC_COLUMNS of every match they cover."""
+    counter = MetricCounter(fixtures)
+    for path in paths:
+        for chunk in read_events(path, fixtures, chunk_size):
+            counter.add(chunk)
+    return counter.frame()
+
+
+def merge_metrics(matches, metrics):
+    """Returns `matches` with the metric columns of the matches in `metrics` replaced by their event counts."""
+    merged = matches.copy()
+    for column in METRIC_COLUMNS:
+        merged.loc[metrics.index, column] = metrics[column].astype(matches[column].dtype)
+    return merged
+
+
+def output_path(partition=None):
+    return os.path.join(catalog.events_dir(partition), OUTPUT_FILE)
+
+
+def load_fixtures(partition=None):
+    """Home and away team of every match of a partition, indexed by match id."""
+    fixtures = pd.read_csv(catalog.matches_path(partition), index_col=0, dtype={'home_team': 'category', 'away_team': 'category'},
+                           usecols=lambda column: column in ('Unnamed: 0', 'home_team', 'away_team'))
+    return fixtures
+
+
+def ingest(partition=None, chunk_size=None):
+    """Aggregates every event feed of a partition and writes the per-match counts; returns them."""
+    paths = sorted(glob.glob(os.path.join(catalog.events_dir(partition), '*.csv')))
+    metrics = aggregate_events(paths, load_fixtures(partition), chunk_size)
+    path = output_path(partition)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    metrics.to_parquet(tmp_file)
+    os.replace(tmp_file, path)
+    return metrics
+
+
+def update_matches(partition=None, metrics=None):
+    """Rewrites the partition's matches file with the event counts overlaid."""
+    path = catalog.matches_path(partition)
+    metrics = metrics if metrics is not None else pd.read_parquet(output_path(partition))
+    matches = pd.read_csv(path, index_col=0)
+    merge_metrics(matches, metrics).to_csv(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate a partition's event feeds into per-match columns.")
+    parser.add_argument('--partition', help="'<league>/<season>' (default: the configured partition)")
+    parser.add_argument('--chunk-size', type=int, help="rows read at a time (default: LALIGA_INGEST_CHUNK_ROWS)")
+    parser.add_argument('--update-matches', action='store_true',
+                        help="also write the counts into the partition's matches file")
+    args = parser.parse_args(argv)
+
+    partition = catalog.parse(args.partition)
+    metrics = ingest(partition, args.chunk_size)
+    print(f"Wrote {len(metrics)} matches to {output_path(partition)}")
+    if args.update_matches:
+        update_matches(partition, metrics)
+        print(f"Updated {catalog.matches_path(partition)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Background execution of slow callbacks.
+
+With LALIGA_BACKGROUND=1, callbacks registered with `background_callback`
+run as Dash background callbacks: each job runs in its own local process
+(Dash's DiskcacheManager), and progress and results pass through a diskcache
+store under ``settings.BACKGROUND_DIR``, so no broker is needed and every
+worker of a preforking server sees the same jobs. On top of Dash's manager:
+
+* requests with the same inputs share one in-flight job instead of starting
+  another one, and its result is kept for ``settings.BACKGROUND_EXPIRE``
+  seconds and served to later requests without a new job;
+* a job is only cancelled (when its user changes the triggering input or
+  presses a cancel control) once no other request is waiting for it.
+
+Without it, the same functions run as ordinary callbacks and reporting
+progress does nothing.
+"""
+import functools
+
+import dash
+
+from core import metrics, settings
+
+
+class SharedJobManager(dash.DiskcacheManager):
+    """DiskcacheManager that runs one job per cache key and counts the requests waiting for it."""
+
+    def call_job_fn(self, key, job_fn, args, context):
+        with self.handle.transact():
+            # No job id: the renderer then polls the stored result directly
+            if self.result_ready(key):
+                return 0
+            job = self.handle.get(f"{key}-job")
+            if job is not None and self.job_running(job):
+                self.handle.incr(f"{key}-waiters")
+                return job
+            job = super().call_job_fn(key, job_fn, args, context)
+            self.handle.set(f"{key}-job", job, expire=self.expire)
+            self.handle.set(f"{key}-waiters", 1, expire=self.expire)
+            self.handle.set(f"job-{job}", key, expire=self.expire)
+        return job
+
+    def terminate_job(self, job):
+        if job is None:
+            return
+        with self.handle.transact():
+            key = self.handle.get(f"job-{job}")
+            # Dash also terminates finished jobs; only cancellations of running ones are counted
+            if key is not None and not self.result_ready(key):
+                if self.handle.decr(f"{key}-waiters", default=1) > 0:
+                    return
+                self.handle.delete(f"{key}-job")
+        super().terminate_job(job)
+
+
+@functools.lru_cache(maxsize=None)
+def manager():
+    """Returns the process-wide job manager."""
+    import diskcache
+
+    return SharedJobManager(
+        diskcache.Cache(settings.BACKGROUND_DIR),
+        # Keeps results after the first request reads them, for the requests sharing the job
+        cache_by=[lambda: settings.BACKGROUND_DIR],
+        expire=settings.BACKGROUND_EXPIRE,
+    )
+
+
+def background_callback(*dependencies, progress=None, cancel=None, running=None, interval=500):
+    """Registers a callback that runs as a background job when LALIGA_BACKGROUND=1.
+
+    The decorated function takes a `set_progress` function first, then the
+    callback arguments; `set_progress` takes a list of values for the
+    `progress` outputs.
+    """
+    def decorator(func):
+        if settings.BACKGROUND:
+            return dash.callback(
+                *dependencies,
+                background=True,
+                manager=manager(),
+                progress=progress,
+                cancel=cancel,
+                running=running,
+                interval=interval,
+            )(func)
+
+        @functools.wraps(func)
+        def run(*args):
+            return func(lambda values: None, *args)
+
+        return metrics.callback(*dependencies, running=running)(run)
+
+    return decorator
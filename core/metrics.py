@@ -0,0 +1,298 @@
+"""Opt-in latency and payload instrumentation of the Dash callbacks.
+
+Enable with LALIGA_METRICS=1. Pages register their callbacks with
+`metrics.callback` (`dash.callback` timing the function body) and build
+figures through `components.figures`, whose Plotly Express functions and
+`style_figure` are timed; `install(app)` times the callback requests with
+Flask hooks. For each call it records:
+
+* wall time of the whole callback request,
+* 'plotly': time spent in Plotly Express functions and `style_figure`,
+* 'pandas': the rest of the callback body, i.e. loading and reshaping data,
+* 'serialization': Dash's validation and JSON encoding of the return value,
+* the size of the JSON response.
+
+Durations and sizes go into fixed-bucket histograms (exposed in the Prometheus
+text format at ``/metrics/prometheus``) and a window of recent samples used
+for the percentiles on the ``/metrics`` page.
+"""
+import bisect
+import functools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from core import settings
+
+
+# Upper bounds of the histogram buckets, Prometheus-style (an implicit +Inf bucket follows)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+
+PHASES = ('pandas', 'plotly', 'serialization')
+
+CALLBACK_PATH = '/_dash-update-component'
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a running sum."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns (upper bound, count of observations <= bound) pairs, ending with '+Inf'."""
+        bounds = [str(b) for b in self.buckets] + ['+Inf']
+        return list(zip(bounds, np.cumsum(self.counts).tolist()))
+
+
+class CallbackMetrics:
+    """Counters, histograms and recent samples of one callback."""
+
+    def __init__(self, samples):
+        self.calls = 0
+        self.errors = 0
+        self.prevented = 0
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.recent = deque(maxlen=samples)  # (wall seconds, response bytes)
+
+
+class Registry:
+    """Thread-safe store of the metrics of every callback, keyed by its output id."""
+
+    def __init__(self, samples=1024):
+        self.samples = samples
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        metrics = self._callbacks.get(name)
+        if metrics is None:
+            metrics = self._callbacks[name] = CallbackMetrics(self.samples)
+        return metrics
+
+    def record(self, name, wall, phases, response_bytes):
+        with self._lock:
+            metrics = self._get(name)
+            metrics.calls += 1
+            metrics.duration.observe(wall)
+            metrics.response_bytes.observe(response_bytes)
+            for phase, seconds in phases.items():
+                metrics.phase_seconds[phase] += seconds
+            metrics.recent.append((wall, response_bytes))
+
+    def record_failure(self, name, prevented=False):
+        with self._lock:
+            metrics = self._get(name)
+            if prevented:
+                metrics.prevented += 1
+            else:
+                metrics.errors += 1
+
+    def summary(self):
+        """Returns one dict per callback with call counts, percentiles and mean phase times."""
+        rows = []
+        with self._lock:
+            items = [(name, m, list(m.recent), dict(m.phase_seconds)) for name, m in self._callbacks.items()]
+        for name, metrics, recent, phase_seconds in sorted(items):
+            walls = np.array([wall for wall, _ in recent]) * 1000
+            sizes = np.array([size for _, size in recent])
+            p50, p90, p99 = np.percentile(walls, [50, 90, 99]) if len(walls) else (np.nan,) * 3
+            calls = max(metrics.calls, 1)
+            rows.append({
+                'callback': name,
+                'calls': metrics.calls,
+                'errors': metrics.errors,
+                'prevented': metrics.prevented,
+                'p50_ms': round(float(p50), 1),
+                'p90_ms': round(float(p90), 1),
+                'p99_ms': round(float(p99), 1),
+                **{f'{phase}_ms': round(phase_seconds[phase] / calls * 1000, 1) for phase in PHASES},
+                'mean_kb': round(float(sizes.mean()) / 1000, 1) if len(sizes) else np.nan,
+                'max_kb': round(float(sizes.max()) / 1000, 1) if len(sizes) else np.nan,
+            })
+        return rows
+
+    def recent(self, name):
+        """Returns the recent wall times (ms) and response sizes (bytes) of a callback."""
+        with self._lock:
+            metrics = self._callbacks.get(name)
+            samples = list(metrics.recent) if metrics is not None else []
+        return [wall * 1000 for wall, _ in samples], [size for _, size in samples]
+
+    def prometheus(self):
+        """Formats every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP laliga_callback_duration_seconds Wall time of Dash callback requests.",
+            "# TYPE laliga_callback_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._callbacks.items())
+            for name, metrics in items:
+                lines += _histogram_lines('laliga_callback_duration_seconds', name, metrics.duration, metrics.calls)
+            lines += [
+                "# HELP laliga_callback_response_bytes Size of Dash callback JSON responses.",
+                "# TYPE laliga_callback_response_bytes histogram",
+            ]
+            for name, metrics in items:
+                lines += _histogram_lines('laliga_callback_response_bytes', name, metrics.response_bytes, metrics.calls)
+            lines += [
+                "# HELP laliga_callback_phase_seconds_total Time spent per phase of Dash callbacks.",
+                "# TYPE laliga_callback_phase_seconds_total counter",
+            ]
+            for name, metrics in items:
+                for phase, seconds in metrics.phase_seconds.items():
+                    lines.append(f'laliga_callback_phase_seconds_total{{callback="{name}",phase="{phase}"}} {seconds}')
+            lines += [
+                "# HELP laliga_callback_errors_total Dash callbacks that raised an exception.",
+                "# TYPE laliga_callback_errors_total counter",
+            ]
+            for name, metrics in items:
+                lines.append(f'laliga_callback_errors_total{{callback="{name}"}} {metrics.errors}')
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric, name, histogram, count):
+    labels = f'callback="{name}"'
+    lines = [f'{metric}_bucket{{{labels},le="{bound}"}} {total}' for bound, total in histogram.cumulative()]
+    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum}')
+    lines.append(f'{metric}_count{{{labels}}} {count}')
+    return lines
+
+
+registry = Registry(settings.METRICS_SAMPLES)
+
+_local = threading.local()
+
+
+def _phase_clock():
+    # Per-thread accumulators for the callback request running on this thread
+    clock = _local.__dict__.get('clock')
+    if clock is None:
+        clock = _local.clock = {'callback': 0.0, 'plotly': 0.0, 'depth': 0}
+    return clock
+
+
+def _timed_plotly(func):
+    """Counts the time spent in `func` towards the 'plotly' phase, once for nested calls."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        clock = _phase_clock()
+        clock['depth'] += 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            clock['depth'] -= 1
+            if clock['depth'] == 0:
+                clock['plotly'] += time.perf_counter() - start
+    return wrapper
+
+
+class TimedModule:
+    """Proxy of a module (e.g. plotly.express) whose functions count towards the 'plotly' phase.
+
+    Attributes are resolved and wrapped on every first access through the
+    proxy, so it works with `startup.lazy_import` modules that are not loaded yet.
+    """
+
+    def __init__(self, module):
+        self._module = module
+        self._wrapped = {}
+
+    def __getattr__(self, attr):
+        wrapped = self._wrapped.get(attr)
+        if wrapped is None:
+            value = getattr(self._module, attr)
+            wrapped = _timed_plotly(value) if callable(value) and not isinstance(value, type) else value
+            self._wrapped[attr] = wrapped
+        return wrapped
+
+
+def timed_plotly(func):
+    """Counts a figure helper (e.g. `style_figure`) towards the 'plotly' phase when metrics are on."""
+    return _timed_plotly(func) if settings.METRICS else func
+
+
+def _timed_body(func):
+    # Time in the callback function itself; the rest of the request is Dash's validation and JSON encoding
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _phase_clock()['callback'] += time.perf_counter() - start
+    return wrapper
+
+
+def callback(*args, **kwargs):
+    """`dash.callback`, timing the body of the decorated function when metrics are on."""
+    import dash
+
+    register = dash.callback(*args, **kwargs)
+    if not settings.METRICS:
+        return register
+    return lambda func: register(_timed_body(func))
+
+
+def _callback_name(request):
+    body = request.get_json(silent=True) or {}
+    return body.get('output', 'unknown')
+
+
+def install(app):
+    """Records every callback request of `app` and serves the Prometheus endpoint.
+
+    Requests are timed by Flask hooks around Dash's callback route; the body
+    and Plotly phases come from `callback` and `TimedModule`. A response of
+    204 means the callback raised PreventUpdate, and 5xx that it failed.
+    The Prometheus endpoint only answers local requests unless
+    LALIGA_METRICS_PUBLIC=1, as it lists every callback of the app.
+    """
+    import flask
+
+    @app.server.before_request
+    def start_callback_clock():
+        if flask.request.path.endswith(CALLBACK_PATH):
+            clock = _phase_clock()
+            clock['callback'] = clock['plotly'] = 0.0
+            flask.g.metrics_start = time.perf_counter()
+
+    @app.server.after_request
+    def record_callback(response):
+        start = flask.g.pop('metrics_start', None)
+        if start is None:
+            return response
+        name = _callback_name(flask.request)
+        if response.status_code == 204:
+            registry.record_failure(name, prevented=True)
+        elif response.status_code >= 400:
+            registry.record_failure(name)
+        else:
+            clock = _phase_clock()
+            wall = time.perf_counter() - start
+            phases = {
+                'pandas': max(clock['callback'] - clock['plotly'], 0.0),
+                'plotly': clock['plotly'],
+                'serialization': max(wall - clock['callback'], 0.0),
+            }
+            registry.record(name, wall, phases, response.calculate_content_length() or 0)
+        return response
+
+    @app.server.route('/metrics/prometheus')
+    def prometheus_metrics():
+        if not settings.METRICS_PUBLIC and flask.request.remote_addr not in LOOPBACK_ADDRESSES:
+            flask.abort(404)
+        return flask.Response(registry.prometheus(), mimetype='text/plain; version=0.0.4')
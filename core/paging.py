@@ -0,0 +1,119 @@
+"""Server-side paging, sorting and filtering for DataTables.
+
+Implements the backend half of `page_action`, `sort_action` and
+`filter_action` set to 'custom': the table sends its page, sort and filter
+state, and only the rows of the visible page are serialized back.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Filter operators as emitted by the DataTable, with their symbolic aliases
+OPERATORS = [
+    ['ge ', '>='],
+    ['le ', '<='],
+    ['lt ', '<'],
+    ['gt ', '>'],
+    ['ne ', '!='],
+    ['eq ', '='],
+    ['contains '],
+    ['datestartswith '],
+]
+
+
+def split_filter_part(filter_part):
+    """Splits one '{column} op value' clause into (column, operator, value)."""
+    for operator_type in OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+
+                value_part = value_part.strip()
+                v0 = value_part[:1]
+                if len(value_part) > 1 and v0 == value_part[-1] and v0 in ("'", '"', '`'):
+                    value = value_part[1: -1].replace('\\' + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                # Word operators carry a trailing space; return the bare keyword
+                return name, operator_type[0].strip(), value
+
+    return None, None, None
+
+
+def _clause_mask(series, operator, value):
+    if pd.api.types.is_numeric_dtype(series) and operator not in ('contains', 'datestartswith'):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return np.zeros(len(series), dtype=bool)
+    else:
+        series = series.astype(str)
+        value = str(value)
+
+    if operator == 'eq':
+        return (series == value).to_numpy()
+    if operator == 'ne':
+        return (series != value).to_numpy()
+    if operator == 'lt':
+        return (series < value).to_numpy()
+    if operator == 'le':
+        return (series <= value).to_numpy()
+    if operator == 'gt':
+        return (series > value).to_numpy()
+    if operator == 'ge':
+        return (series >= value).to_numpy()
+    if operator == 'contains':
+        return series.str.contains(value, case=False, regex=False, na=False).to_numpy()
+    # 'datestartswith'
+    return series.str.startswith(value, na=False).to_numpy()
+
+
+def filter_frame(df, filter_query):
+    """Applies a DataTable filter query as one combined boolean mask."""
+    if not filter_query:
+        return df
+
+    mask = np.ones(len(df), dtype=bool)
+    for filter_part in filter_query.split(' && '):
+        col_name, operator, value = split_filter_part(filter_part)
+        if col_name not in df.columns:
+            continue
+        mask &= _clause_mask(df[col_name], operator, value)
+    return df[mask]
+
+
+def sort_frame(df, sort_by):
+    """Sorts by the DataTable `sort_by` list, keeping the original order for ties."""
+    sort_by = [s for s in sort_by or [] if s['column_id'] in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [s['column_id'] for s in sort_by],
+        ascending=[s['direction'] == 'asc' for s in sort_by],
+        kind='stable',
+    )
+
+
+def query_page(df, page_current, page_size, sort_by=None, filter_query=None):
+    """Returns the records of the page shown, the resulting page count and the page shown.
+
+    The page shown is `page_current`, clamped to the last page; callbacks write it back to the table.
+    """
+    dff = sort_frame(filter_frame(df, filter_query), sort_by)
+
+    page_count = max(1, math.ceil(len(dff) / page_size))
+    # A filter or sort that leaves fewer pages shows the last one rather than an empty table
+    page_current = min(page_current or 0, page_count - 1)
+    page = dff.iloc[page_current * page_size: (page_current + 1) * page_size]
+
+    # Only the visible slice is converted, so datetimes are rendered as text here
+    for col in page.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        page = page.assign(**{col: page[col].astype(str)})
+    return page.to_dict('records'), page_count, page_current
@@ -0,0 +1,168 @@
+"""Schema of the matches dataset, shared by ingest validation and the Dataset page.
+
+Every season partition must provide these columns; `validate_matches` is run
+when a matches CSV is parsed, before anything is cached. Event feeds (one row
+per shot, pass, foul, ...) follow EVENT_SCHEMA and are checked chunk by chunk
+by `validate_events` as `core.ingest` streams them.
+"""
+import numpy as np
+import pandas as pd
+
+
+class SchemaError(ValueError):
+    """Raised when a matches file or event feed does not match its schema."""
+
+
+# (group title, [(column, description, type)]) as shown on the Dataset page
+MATCH_SCHEMA = [
+    ("Identifiers", [
+        ("round", "Match round number (1 to 38)", "integer"),
+        ("home_team", "Name of the home team (e.g., 'Real Madrid', 'Barcelona')", "categorical"),
+        ("away_team", "Name of the away team", "categorical"),
+        ("utc_time", "Date and time of the match in UTC (e.g., '2023-08-11 17:30:00+00:00')", "datetime"),
+    ]),
+    ("Match Outcomes", [
+        ("full_time_home_team_goals", "Goals scored by the home team at full time", "integer"),
+        ("full_time_away_team_goals", "Goals scored by the away team at full time", "integer"),
+        ("full_time_result", "Match result at full time ('H' for home win, 'A' for away win, 'D' for draw)", "categorical"),
+        ("half_time_home_team_goals", "Goals scored by the home team at half time", "integer"),
+        ("half_time_away_team_goals", "Goals scored by the away team at half time", "integer"),
+        ("half_time_result", "Match result at half time ('H' for home win, 'A' for away win, 'D' for draw)", "categorical"),
+    ]),
+    ("Performance Metrics", [
+        ("home_team_shots", "Total shots by the home team", "integer"),
+        ("away_team_shots", "Total shots by the away team", "integer"),
+        ("home_team_shots_on_target", "Shots on target by the home team", "integer"),
+        ("away_team_shots_on_target", "Shots on target by the away team", "integer"),
+        ("home_team_fouls_committed", "Fouls committed by the home team", "integer"),
+        ("away_team_fouls_committed", "Fouls committed by the away team", "integer"),
+        ("home_team_corners", "Corners won by the home team", "integer"),
+        ("away_team_corners", "Corners won by the away team", "integer"),
+    ]),
+    ("Disciplinary Stats", [
+        ("home_team_yellow_cards", "Yellow cards received by the home team", "integer"),
+        ("away_team_yellow_cards", "Yellow cards received by the away team", "integer"),
+        ("home_team_red_cards", "Red cards received by the home team", "integer"),
+        ("away_team_red_cards", "Red cards received by the away team", "integer"),
+    ]),
+]
+
+MATCH_COLUMN_TYPES = {column: data_type for _, columns in MATCH_SCHEMA for column, _, data_type in columns}
+
+# Columns shared by the Stats files; their other columns are numeric metrics.
+# Player names are nearly all distinct within a file, so they stay plain text
+STATS_COLUMN_TYPES = {
+    'Rank': 'integer',
+    'Player': 'text',
+    'Team': 'categorical',
+    'Minutes': 'integer',
+    'Matches': 'integer',
+    'Country': 'categorical',
+}
+
+# Allowed values of the result columns
+RESULT_CODES = {'H', 'A', 'D'}
+
+
+def validate_matches(df, source="matches file"):
+    """Checks column presence, types and result codes; raises SchemaError listing every problem."""
+    problems = []
+    missing = [column for column in MATCH_COLUMN_TYPES if column not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+
+    for column, data_type in MATCH_COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if data_type == 'integer':
+            if not pd.api.types.is_integer_dtype(series):
+                problems.append(f"'{column}' should be integer, found {series.dtype}")
+            elif (series < 0).any():
+                problems.append(f"'{column}' has negative values")
+        elif data_type == 'datetime':
+            if pd.to_datetime(series, errors='coerce').isna().any():
+                problems.append(f"'{column}' has values that are not dates")
+        elif data_type == 'categorical' and series.isna().any():
+            problems.append(f"'{column}' has missing values")
+
+    for column in ('full_time_result', 'half_time_result'):
+        if column in df.columns:
+            unknown = set(df[column].dropna().unique()) - RESULT_CODES
+            if unknown:
+                problems.append(f"'{column}' has unknown result codes: {', '.join(sorted(map(str, unknown)))}")
+
+    if problems:
+        raise SchemaError(f"{source} does not match the schema: " + "; ".join(problems))
+
+
+# Event types of the event feeds
+EVENT_TYPES = ['shot', 'pass', 'foul', 'corner', 'yellow_card', 'red_card']
+
+# Event feed columns: (column, description, type); 'on_target' only counts for shots
+EVENT_SCHEMA = [
+    ("match_id", "Index of the match in the partition's matches file", "integer"),
+    ("team", "Team credited with the event (the home or the away team)", "categorical"),
+    ("event", "Event type: " + ", ".join(EVENT_TYPES), "categorical"),
+    ("minute", "Match minute of the event", "integer"),
+    ("on_target", "1 when a shot was on target, else 0", "integer"),
+]
+
+EVENT_COLUMN_TYPES = {column: data_type for column, _, data_type in EVENT_SCHEMA}
+
+# Inclusive bounds of the integer event columns; match ids are checked against the fixtures
+EVENT_RANGES = {
+    'minute': (0, 130),
+    'on_target': (0, 1),
+}
+
+
+def as_strings(series):
+    """Returns the values of `series` as a NumPy string array; categoricals are decoded through their categories."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series.cat.categories, dtype=str)[series.cat.codes.to_numpy()]
+    return series.astype(str).to_numpy()
+
+
+def validate_events(df, fixtures, source="event feed"):
+    """Checks one chunk of an event feed against the matches it refers to.
+
+    `fixtures` holds the 'home_team' and 'away_team' of every match, indexed
+    by match id. Raises SchemaError listing every problem.
+    """
+    problems = []
+    missing = [column for column in EVENT_COLUMN_TYPES if column not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+
+    for column, data_type in EVENT_COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if data_type == 'integer':
+            if not pd.api.types.is_integer_dtype(series):
+                problems.append(f"'{column}' should be integer, found {series.dtype}")
+            elif (series < 0).any():
+                problems.append(f"'{column}' has negative values")
+            elif column in EVENT_RANGES and not series.between(*EVENT_RANGES[column]).all():
+                low, high = EVENT_RANGES[column]
+                problems.append(f"'{column}' has values outside {low} to {high}")
+        elif series.isna().any():
+            problems.append(f"'{column}' has missing values")
+
+    if 'event' in df.columns:
+        unknown = set(df['event'].dropna().unique()) - set(EVENT_TYPES)
+        if unknown:
+            problems.append(f"'event' has unknown types: {', '.join(sorted(map(str, unknown)))}")
+    if 'match_id' in df.columns and 'team' in df.columns:
+        known = df['match_id'].isin(fixtures.index)
+        if not known.all():
+            problems.append(f"{int((~known).sum())} events refer to matches not in the matches file")
+        positions = fixtures.index.get_indexer(df['match_id'][known])
+        team = as_strings(df['team'][known])
+        stray = (team != as_strings(fixtures['home_team'])[positions]) & (team != as_strings(fixtures['away_team'])[positions])
+        if stray.any():
+            problems.append(f"{int(stray.sum())} events credit a team that did not play the match")
+
+    if problems:
+        raise SchemaError(f"{source} does not match the schema: " + "; ".join(problems))
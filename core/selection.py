@@ -0,0 +1,113 @@
+"""Shared row selection of a partition's matches, as packed bitmaps.
+
+Every team, round and categorical value gets a precomputed bitmap of the
+rows it covers (one bit per match, eight matches per byte), so a selection
+combining team, round range, a clicked category and brushed points is a
+bitwise AND of a few byte arrays rather than a pandas query per callback.
+Bitmaps travel between callbacks as base64 strings.
+"""
+import base64
+
+import numpy as np
+
+from core import catalog, startup, store, watcher
+
+
+# Columns whose values can be clicked into the selection
+CATEGORY_COLUMNS = ['full_time_result', 'half_time_result', 'home_team', 'away_team']
+
+
+def pack(mask):
+    """Packs a boolean row mask into a bitmap."""
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def to_base64(bitmap):
+    return base64.b64encode(bitmap.tobytes()).decode('ascii')
+
+
+def from_base64(data):
+    return np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+
+
+class SelectionIndex:
+    """Bitmaps of every value of the categorical columns, and of every 'round <= r' prefix."""
+
+    def __init__(self, df, columns=CATEGORY_COLUMNS):
+        self.length = len(df)
+        self.full = pack(np.ones(self.length, dtype=bool))
+        self.empty = np.zeros_like(self.full)
+
+        self.bitmaps = {}  # column -> {value: bitmap}
+        for col in columns:
+            self.bitmaps[col] = {
+                value: self.rows(positions)
+                for value, positions in df.groupby(col, observed=True).indices.items()
+            }
+
+        # Cumulative bitmaps make any round range two lookups and one AND
+        rounds = df['round'].to_numpy()
+        self.rounds = np.unique(rounds)
+        self.through = np.stack([pack(rounds <= r) for r in self.rounds]) if len(self.rounds) else None
+
+    def rows(self, positions):
+        """Returns the bitmap of the given row positions."""
+        mask = np.zeros(self.length, dtype=bool)
+        mask[np.asarray(positions, dtype=np.intp)] = True
+        return pack(mask)
+
+    def category(self, col, value):
+        return self.bitmaps[col].get(value, self.empty)
+
+    def team(self, team):
+        """Matches `team` played, at home or away."""
+        return self.category('home_team', team) | self.category('away_team', team)
+
+    def round_range(self, low, high):
+        if self.through is None:
+            return self.empty
+        upper = np.searchsorted(self.rounds, high, side='right') - 1
+        lower = np.searchsorted(self.rounds, low, side='left') - 1
+        bitmap = self.through[upper] if upper >= 0 else self.empty
+        if lower >= 0:
+            bitmap = bitmap & ~self.through[lower]
+        return bitmap
+
+    def select(self, team=None, rounds=None, category=None, points=None):
+        """ANDs the bitmaps of the active filters; returns None when nothing is filtered.
+
+        `category` is a (column, value) pair and `points` a bitmap of brushed rows.
+        """
+        parts = []
+        if team:
+            parts.append(self.team(team))
+        if rounds and len(self.rounds) and (rounds[0] > self.rounds[0] or rounds[1] < self.rounds[-1]):
+            parts.append(self.round_range(*rounds))
+        if category:
+            parts.append(self.category(*category))
+        if points is not None:
+            parts.append(points)
+        if not parts:
+            return None
+        return np.bitwise_and.reduce(parts) & self.full
+
+    def mask(self, bitmap):
+        """Unpacks a bitmap into a boolean row mask."""
+        return np.unpackbits(bitmap, count=self.length).astype(bool)
+
+    def count(self, bitmap):
+        return int(np.unpackbits(bitmap, count=self.length).sum())
+
+
+@startup.deferred("selection index", version=store.matches_version)
+def _build(partition):
+    return SelectionIndex(store.load_matches(partition))
+
+
+# New matches shift the row bitmaps, so the index is rebuilt rather than updated
+watcher.on_change('matches')(_build.refresh)
+
+
+def load_index(partition=None):
+    """Returns the shared selection index of a partition, rebuilt when its matches file changes."""
+    return _build(catalog.parse(partition))
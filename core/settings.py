@@ -0,0 +1,75 @@
+import os
+
+
+# Root folder holding the raw CSV datasets
+DATA_DIR = os.environ.get("LALIGA_DATA_DIR", "datasets")
+
+# Folder for the columnar (Parquet) copies of the raw CSV files
+CACHE_DIR = os.environ.get("LALIGA_CACHE_DIR", os.path.join(DATA_DIR, ".cache"))
+
+# Memory budget for parsed Stats page tables kept in the LRU cache
+STATS_CACHE_BYTES = int(os.environ.get("LALIGA_STATS_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Figure cache for the visualization callbacks: 'memory', 'disk' or 'off'
+FIGURE_CACHE = os.environ.get("LALIGA_FIGURE_CACHE", "memory")
+FIGURE_CACHE_BYTES = int(os.environ.get("LALIGA_FIGURE_CACHE_BYTES", 128 * 1024 * 1024))
+FIGURE_CACHE_DIR = os.environ.get("LALIGA_FIGURE_CACHE_DIR", os.path.join(CACHE_DIR, "figures"))
+
+# Also build every dropdown combination of the visualization figures during warm-up
+WARM_FIGURES = os.environ.get("LALIGA_WARM_FIGURES", "0") == "1"
+
+# When page data, engines and figures are built: 'off' on first visit, 'background'
+# in a warm-up thread right after boot, 'eager' before the server starts
+WARMUP = os.environ.get("LALIGA_WARMUP", "background")
+
+# Print per-package import and per-step initialisation costs at startup
+STARTUP_REPORT = os.environ.get("LALIGA_STARTUP_REPORT", "0") == "1"
+
+# Partition shown when no league/season has been selected, as '<league>/<season>'
+DEFAULT_PARTITION = os.environ.get("LALIGA_DEFAULT_PARTITION", "laliga/2023-24")
+
+# Per-callback latency and payload instrumentation, shown on /metrics and /metrics/prometheus
+METRICS = os.environ.get("LALIGA_METRICS", "0") == "1"
+METRICS_SAMPLES = int(os.environ.get("LALIGA_METRICS_SAMPLES", 1024))
+# Serve /metrics/prometheus to any client, not just local ones
+METRICS_PUBLIC = os.environ.get("LALIGA_METRICS_PUBLIC", "0") == "1"
+
+# Format of the columnar cache: 'parquet', or 'arrow' for uncompressed Arrow IPC files that
+# are memory-mapped on read, so preforked workers share the data pages (set by wsgi.py)
+CACHE_FORMAT = os.environ.get("LALIGA_CACHE_FORMAT", "parquet")
+
+# Ship the matches to the browser once per session and draw the distribution, categorical
+# and box plots there (clientside callbacks) instead of on the server
+CLIENTSIDE = os.environ.get("LALIGA_CLIENTSIDE", "0") == "1"
+
+# Rows above which the visualization callbacks bin histograms and box plots on the server and
+# draw scatter plots with WebGL, and points above which a scatter becomes a grid of counts
+LARGE_DATA_ROWS = int(os.environ.get("LALIGA_LARGE_DATA_ROWS", 10000))
+DENSITY_ROWS = int(os.environ.get("LALIGA_DENSITY_ROWS", 200000))
+DENSITY_GRID = int(os.environ.get("LALIGA_DENSITY_GRID", 200))
+
+# Rows of an event feed read at a time by core.ingest; bounds its peak memory
+INGEST_CHUNK_ROWS = int(os.environ.get("LALIGA_INGEST_CHUNK_ROWS", 500000))
+
+# Brotli/gzip compression of responses (needs Flask-Compress)
+COMPRESS = os.environ.get("LALIGA_COMPRESS", "1") == "1"
+
+# Run slow callbacks (e.g. preparing a Stats page table) as background jobs in local
+# processes, with their progress and results kept on disk (needs dash[diskcache])
+BACKGROUND = os.environ.get("LALIGA_BACKGROUND", "0") == "1"
+BACKGROUND_DIR = os.environ.get("LALIGA_BACKGROUND_DIR", os.path.join(CACHE_DIR, "jobs"))
+BACKGROUND_EXPIRE = int(os.environ.get("LALIGA_BACKGROUND_EXPIRE", 300))
+
+# Players below this many minutes are left out of the player similarity index
+SIMILARITY_MIN_MINUTES = int(os.environ.get("LALIGA_SIMILARITY_MIN_MINUTES", 450))
+
+# Season simulator: trials per (season, round), processes sharing them and the random seed.
+# Each serving process gets its own pool, so keep workers low when there are many of them
+SIMULATION_TRIALS = int(os.environ.get("LALIGA_SIMULATION_TRIALS", 100000))
+SIMULATION_WORKERS = int(os.environ.get("LALIGA_SIMULATION_WORKERS", min(os.cpu_count() or 1, 4)))
+SIMULATION_SEED = int(os.environ.get("LALIGA_SIMULATION_SEED", 2024))
+
+# Watch the data folder for changed and appended files and ingest them while the app runs;
+# open pages check for new data every WATCH_INTERVAL seconds
+WATCH = os.environ.get("LALIGA_WATCH", "0") == "1"
+WATCH_INTERVAL = float(os.environ.get("LALIGA_WATCH_INTERVAL", 5))
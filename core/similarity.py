@@ -0,0 +1,188 @@
+"""Player similarity over the player statistics of every partition.
+
+Every ``player_*.csv`` Stats file contributes its metric columns (the ones
+between Team and Minutes), merged per partition by `core.warehouse`. Rates,
+percentages and ratings are kept as they are and totals are turned into
+per-90 rates, so players with different playing time compare on the same
+scale. A player is one row per partition and team, so the same player in two
+seasons is two rows.
+
+The files are leaderboards: a player missing from one ranks below everyone
+listed, so a missing value is filled with the lowest listed value. Each
+metric is then z-scored over the players above the minutes threshold and
+every row is scaled to unit length, which makes the cosine similarity of a
+batch of players against all others one matrix product; `np.argpartition`
+picks the top k of each row without sorting the rest.
+"""
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import catalog, settings, startup, warehouse, watcher
+
+
+KEY_COLUMNS = ['Player', 'Team']
+# Columns of the Stats files that are not metrics of the player
+IGNORED_COLUMNS = {'Rank', 'Minutes', 'Matches', 'Country', 'Total Matches'}
+# Metric names containing one of these are already independent of playing time
+RATE_MARKERS = ('per 90', '(%)', 'Rate', 'Rating')
+
+
+def player_files(partition):
+    return sorted(glob.glob(os.path.join(catalog.stats_dir(partition), 'player_*.csv')))
+
+
+def per_90_columns(df):
+    """Returns the metric columns of a player Stats table, totals turned into per-90 rates."""
+    minutes = df['Minutes'].where(df['Minutes'] > 0)
+    metrics = {}
+    for col in df.columns:
+        if col in IGNORED_COLUMNS or col in KEY_COLUMNS or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if any(marker in col for marker in RATE_MARKERS):
+            metrics[col] = df[col]
+        else:
+            metrics[f"{col} per 90"] = df[col] / minutes * 90
+    return pd.DataFrame(metrics)
+
+
+def player_table(partitions):
+    """Builds the player x metric table of the partitions, NaN where a player is not listed.
+
+    Rows come from the warehouse's merged player table, so team names are
+    spelled as in the matches files. Returns (players, values): players has
+    partition, Player, Team, Country and Minutes columns, and values the
+    metrics, both on the same row order.
+    """
+    players, values = [], []
+    for partition in partitions:
+        if not warehouse.stats_files('players', partition):
+            continue
+        wide = warehouse.load_players(partition).reset_index()
+        players.append(pd.DataFrame({
+            'partition': partition.key,
+            'Player': wide['Player'].astype(str),
+            'Team': wide['Team'].astype(str),
+            'Country': wide['Country'].astype(str),
+            'Minutes': wide['Minutes'].fillna(0).astype(np.int64),
+        }))
+        values.append(per_90_columns(wide.assign(Minutes=wide['Minutes'].astype(float))).astype(float))
+    if not players:
+        empty = pd.DataFrame(columns=['partition', *KEY_COLUMNS, 'Country', 'Minutes'])
+        return empty, pd.DataFrame(index=empty.index)
+    # Partitions with different Stats files leave each other's metrics missing
+    return pd.concat(players, ignore_index=True), pd.concat(values, ignore_index=True)
+
+
+class SimilarityIndex:
+    """Unit-length standardized metric vectors of every player above a minutes threshold."""
+
+    def __init__(self, players, values, min_minutes=0):
+        qualified = (players['Minutes'] >= min_minutes).to_numpy()
+        self.players = players[qualified].reset_index(drop=True)
+        values = values[qualified].reset_index(drop=True)
+        self.metrics = list(values.columns)
+        self.keys = pd.Index(player_key(p, n, t) for p, n, t in
+                             zip(self.players['partition'], self.players['Player'], self.players['Team']))
+
+        filled = values.fillna(values.min())
+        std = filled.std(ddof=0).replace(0, 1)
+        self.zscores = ((filled - filled.mean()) / std).fillna(0).to_numpy(dtype=np.float32)
+        norms = np.linalg.norm(self.zscores, axis=1, keepdims=True)
+        self.vectors = self.zscores / np.where(norms > 0, norms, 1)
+
+    def __len__(self):
+        return len(self.players)
+
+    def position(self, key):
+        """Row of a player key, or -1 when the player is not in the index."""
+        return self.keys.get_indexer([key])[0]
+
+    def most_similar(self, rows, k=20, candidates=None):
+        """Finds the k most similar players of each row in `rows` (a batch is one matrix product).
+
+        `candidates` is an optional boolean mask of the players that may be
+        returned. Returns (positions, scores), each of shape (len(rows), k),
+        best first; when fewer than k players qualify the rest are -1 / -inf.
+        """
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        scores = self.vectors[rows] @ self.vectors.T
+        scores[np.arange(len(rows)), rows] = -np.inf
+        if candidates is not None:
+            scores[:, ~np.asarray(candidates, dtype=bool)] = -np.inf
+
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return np.empty((len(rows), 0), dtype=np.intp), np.empty((len(rows), 0), dtype=np.float32)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top[np.isneginf(top_scores)] = -1
+        return top, top_scores
+
+    def candidates(self, partitions=None, min_minutes=None):
+        """Mask of the players in the given partition keys with at least `min_minutes`."""
+        mask = np.ones(len(self), dtype=bool)
+        if partitions:
+            mask &= self.players['partition'].isin(partitions).to_numpy()
+        if min_minutes:
+            mask &= (self.players['Minutes'] >= min_minutes).to_numpy()
+        return mask
+
+    def neighbours(self, key, k=20, partitions=None, min_minutes=None):
+        """Returns the k players most similar to `key` as a frame, best first."""
+        row = self.position(key)
+        if row < 0:
+            return self.players.iloc[0:0].assign(similarity=[])
+        positions, scores = self.most_similar([row], k, self.candidates(partitions, min_minutes))
+        found = positions[0] >= 0
+        result = self.players.iloc[positions[0][found]].reset_index(drop=True)
+        return result.assign(similarity=scores[0][found].astype(float).round(3))
+
+    def profile(self, keys):
+        """Returns the z-scores of the given player keys (metrics x players)."""
+        positions = self.keys.get_indexer(keys)
+        return pd.DataFrame(self.zscores[positions].T, index=self.metrics, columns=keys)
+
+
+def player_key(partition, player, team):
+    return f"{partition}|{player}|{team}"
+
+
+_files_snapshot = None  # (time.monotonic() when taken, mtimes of the player files)
+
+
+def stats_version():
+    """Returns a token that changes whenever a player Stats file of any partition does.
+
+    It is checked on every similarity request, so it avoids the file system:
+    with the watcher running it is the watcher's Stats tokens, otherwise the
+    player files are stat'ed at most once every ``settings.WATCH_INTERVAL`` seconds.
+    """
+    global _files_snapshot
+    tokens = watcher.snapshot()
+    if tokens is not None:
+        return tuple(sorted((key, kinds.get('stats')) for key, kinds in tokens.items()))
+    now = time.monotonic()
+    if _files_snapshot is None or now - _files_snapshot[0] >= settings.WATCH_INTERVAL:
+        mtimes = tuple((path, os.stat(path).st_mtime_ns) for p in catalog.discover() for path in player_files(p))
+        _files_snapshot = (now, mtimes)
+    return _files_snapshot[1]
+
+
+@startup.deferred("similarity index", version=stats_version)
+def load_index():
+    """Returns the shared similarity index over every partition, rebuilt when a player Stats file changes."""
+    players, values = player_table(catalog.discover())
+    return SimilarityIndex(players, values, settings.SIMILARITY_MIN_MINUTES)
+
+
+@watcher.on_change('stats')
+def refresh_index(partition):
+    """Rebuilds the index once it has been built and a Stats file changed; unchanged files are read from their caches."""
+    load_index.refresh()
@@ -0,0 +1,247 @@
+"""Monte Carlo simulation of the rest of a season.
+
+Team strengths are fitted on the matches played up to a round with a
+Poisson model (Maher): the home side of a fixture scores
+``mu * home * attack[home] * defence[away]`` goals on average and the away
+side ``mu * attack[away] * defence[home]``. The fit starts every team from a
+few pseudo-games at league average, so strengths stay sensible after the
+first rounds.
+
+The remaining fixtures are then played out ``settings.SIMULATION_TRIALS``
+times. Trials run in fixed-size batches: a batch draws every score at once
+by inverse transform (16-bit uniform draws compared against each fixture's
+Poisson CDF, several times faster than `Generator.poisson`), adds up points
+and goals per team with a matrix product over the fixture/team incidence
+matrix and ranks all of its trials at once. The batches are spread over a
+local process pool of ``settings.SIMULATION_WORKERS`` processes, started
+with forkserver (or spawn) rather than forked from a process that runs
+threads, and each batch draws from its own child of one
+`np.random.SeedSequence`, so the result only depends on the seed, not on
+the number of workers. Results are cached per (season, round) until the
+matches file changes.
+"""
+import concurrent.futures
+import functools
+import multiprocessing
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import catalog, settings, startup, store
+
+
+# Finishing places counted for each outcome (top of the table / bottom of the table)
+TITLE_PLACES = 1
+EUROPE_PLACES = 6
+RELEGATION_PLACES = 3
+
+# Pseudo-games at league average added to every team's record by the fit
+PRIOR_GAMES = 2
+# League average goals per team per game and home factor used before any match is played
+DEFAULT_GOALS = 1.35
+DEFAULT_HOME = 1.2
+
+BATCH_TRIALS = 5000
+# Goals per side at which the Poisson CDF tables stop
+MAX_GOALS = 20
+# Resolution of the uniform draws and CDF tables
+CDF_SCALE = 2 ** 16
+
+
+def fit_strengths(home, away, home_goals, away_goals, n_teams, iterations=50):
+    """Fits the Poisson model to played matches given as team codes and goals.
+
+    Returns (mu, home_factor, attack, defence), attack and defence averaging 1.
+    """
+    home, away = np.asarray(home), np.asarray(away)
+    home_goals, away_goals = np.asarray(home_goals, dtype=float), np.asarray(away_goals, dtype=float)
+    attack, defence = np.ones(n_teams), np.ones(n_teams)
+    if not len(home):
+        return DEFAULT_GOALS, DEFAULT_HOME, attack, defence
+
+    mu = (home_goals.sum() + away_goals.sum()) / (2 * len(home))
+    home_factor = max(home_goals.mean(), 0.1) / max(away_goals.mean(), 0.1)
+    scored = np.bincount(home, home_goals, n_teams) + np.bincount(away, away_goals, n_teams)
+    conceded = np.bincount(home, away_goals, n_teams) + np.bincount(away, home_goals, n_teams)
+    prior = PRIOR_GAMES * mu
+    for _ in range(iterations):
+        # Expected goals at unit attack (resp. defence) against the current opponents
+        home_rate = mu * home_factor
+        exposure = np.bincount(home, home_rate * defence[away], n_teams) + np.bincount(away, mu * defence[home], n_teams)
+        attack = (scored + prior) / (exposure + prior)
+        attack /= attack.mean()
+        exposure = np.bincount(away, home_rate * attack[home], n_teams) + np.bincount(home, mu * attack[away], n_teams)
+        defence = (conceded + prior) / (exposure + prior)
+        defence /= defence.mean()
+
+        expected_home = attack[home] * defence[away]
+        expected_away = attack[away] * defence[home]
+        mu = (home_goals.sum() + away_goals.sum()) / (home_factor * expected_home.sum() + expected_away.sum())
+        home_factor = home_goals.sum() / (mu * expected_home.sum())
+    return mu, home_factor, attack, defence
+
+
+def table_totals(home, away, home_goals, away_goals, n_teams):
+    """Points, goal difference and goals scored of every team over the given matches."""
+    home_goals, away_goals = np.asarray(home_goals), np.asarray(away_goals)
+    home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    away_points = np.where(away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    points = np.bincount(home, home_points, n_teams) + np.bincount(away, away_points, n_teams)
+    goals_for = np.bincount(home, home_goals, n_teams) + np.bincount(away, away_goals, n_teams)
+    goals_against = np.bincount(home, away_goals, n_teams) + np.bincount(away, home_goals, n_teams)
+    return points.astype(np.int64), (goals_for - goals_against).astype(np.int64), goals_for.astype(np.int64)
+
+
+def poisson_cdf(rates):
+    """Poisson CDF of every rate at 0 to MAX_GOALS - 1 goals (rates x goals), as uint16 thresholds.
+
+    A uniform 16-bit draw above the threshold of k goals scores more than k.
+    """
+    rates = np.asarray(rates, dtype=float)
+    pmf = np.empty((len(rates), MAX_GOALS))
+    pmf[:, 0] = np.exp(-rates)
+    for k in range(1, MAX_GOALS):
+        pmf[:, k] = pmf[:, k - 1] * rates / k
+    cdf = np.round(np.cumsum(pmf, axis=1) * CDF_SCALE)
+    return np.clip(cdf - 1, 0, CDF_SCALE - 1).astype(np.uint16)
+
+
+def draw_goals(rng, cdf, trials):
+    """Draws the goals of every fixture in `trials` trials from its CDF row (trials x fixtures)."""
+    uniform = rng.integers(0, CDF_SCALE, size=(trials, len(cdf)), dtype=np.uint16)
+    goals = np.zeros(uniform.shape, dtype=np.uint8)
+    above = np.empty(uniform.shape, dtype=bool)
+    for column in cdf.T:
+        # Past this count no draw can exceed the CDF any more
+        if (column == CDF_SCALE - 1).all():
+            break
+        np.greater(uniform, column, out=above)
+        goals += above
+    return goals
+
+
+def simulate_batch(seed, trials, home, away, home_cdf, away_cdf, base):
+    """Plays the fixtures `trials` times; returns the finishing-position counts (teams x positions) and points sum.
+
+    `home_cdf` and `away_cdf` are the `poisson_cdf` of each side's expected
+    goals and `base` the (points, goal difference, goals for) of every team so far.
+    """
+    n_teams = len(base[0])
+    rng = np.random.default_rng(seed)
+    home_goals = draw_goals(rng, home_cdf, trials)
+    away_goals = draw_goals(rng, away_cdf, trials)
+
+    # Fixture/team incidence matrices turn per-fixture values into per-team totals
+    home_of = np.zeros((len(home), n_teams), dtype=np.float32)
+    home_of[np.arange(len(home)), home] = 1
+    away_of = np.zeros((len(away), n_teams), dtype=np.float32)
+    away_of[np.arange(len(away)), away] = 1
+
+    draws = home_goals == away_goals
+    home_points = np.float32(3) * (home_goals > away_goals) + draws
+    away_points = np.float32(3) * (away_goals > home_goals) + draws
+    home_goals, away_goals = home_goals.astype(np.float32), away_goals.astype(np.float32)
+    points = base[0] + (home_points @ home_of + away_points @ away_of).astype(np.int64)
+    difference = base[1] + ((home_goals - away_goals) @ home_of + (away_goals - home_goals) @ away_of).astype(np.int64)
+    goals_for = base[2] + (home_goals @ home_of + away_goals @ away_of).astype(np.int64)
+
+    # Ranked on points, then goal difference, then goals scored, then a coin toss
+    noise = rng.random((trials, n_teams))
+    key = -(points * 2 ** 22 + (difference + 2 ** 10) * 2 ** 11 + goals_for + noise)
+    order = np.argsort(key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[None, :], axis=1)
+
+    counts = np.bincount((np.arange(n_teams) * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+    return counts.reshape(n_teams, n_teams), points.sum(axis=0)
+
+
+def batch_sizes(trials):
+    """Splits `trials` into batches of BATCH_TRIALS, the last one holding the remainder."""
+    return [BATCH_TRIALS] * (trials // BATCH_TRIALS) + ([trials % BATCH_TRIALS] if trials % BATCH_TRIALS else [])
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    """Returns the process pool shared by every simulation, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking would copy the watcher's and the server's threads' locks in whatever state they are
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS,
+                                                           mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+class SeasonSimulation:
+    """Finishing-position probabilities of every team after simulating the fixtures left after a round."""
+
+    def __init__(self, df, after_round, trials, seed=0):
+        teams = sorted(set(df['home_team'].astype(str)) | set(df['away_team'].astype(str)))
+        self.teams = teams
+        self.after_round = after_round
+        self.trials = trials
+        codes = pd.Index(teams)
+        home = codes.get_indexer(df['home_team'].astype(str))
+        away = codes.get_indexer(df['away_team'].astype(str))
+        home_goals = df['full_time_home_team_goals'].to_numpy()
+        away_goals = df['full_time_away_team_goals'].to_numpy()
+        played = df['round'].to_numpy() <= after_round
+
+        n_teams = len(teams)
+        self.mu, self.home_factor, self.attack, self.defence = fit_strengths(
+            home[played], away[played], home_goals[played], away_goals[played], n_teams)
+        base = table_totals(home[played], away[played], home_goals[played], away_goals[played], n_teams)
+        self.points = base[0]
+
+        left = ~played
+        home_rate = self.mu * self.home_factor * self.attack[home[left]] * self.defence[away[left]]
+        away_rate = self.mu * self.attack[away[left]] * self.defence[home[left]]
+        self.remaining = int(left.sum())
+
+        batches = batch_sizes(trials)
+        seeds = np.random.SeedSequence(seed).spawn(len(batches))
+        run = functools.partial(simulate_batch, home=home[left], away=away[left],
+                                home_cdf=poisson_cdf(home_rate), away_cdf=poisson_cdf(away_rate), base=base)
+        if settings.SIMULATION_WORKERS > 1 and len(batches) > 1:
+            results = list(pool().map(run, seeds, batches))
+        else:
+            results = [run(s, n) for s, n in zip(seeds, batches)]
+
+        self.counts = sum(counts for counts, _ in results)
+        self.expected_points = sum(points for _, points in results) / trials
+
+    def position_probabilities(self):
+        """Probability of every team finishing in every position (teams x positions)."""
+        return pd.DataFrame(self.counts / self.trials, index=self.teams, columns=np.arange(1, len(self.teams) + 1))
+
+    def summary(self):
+        """One row per team: current and expected points, title, European-place and relegation chances."""
+        probabilities = self.counts / self.trials
+        n_teams = len(self.teams)
+        table = pd.DataFrame({
+            'team': self.teams,
+            'points': self.points,
+            'expected_points': self.expected_points.round(1),
+            'attack': self.attack.round(2),
+            'defence': self.defence.round(2),
+            'title': probabilities[:, :TITLE_PLACES].sum(axis=1).round(4),
+            'europe': probabilities[:, :EUROPE_PLACES].sum(axis=1).round(4),
+            'relegation': probabilities[:, n_teams - RELEGATION_PLACES:].sum(axis=1).round(4),
+        })
+        return table.sort_values(['expected_points', 'team'], ascending=[False, True], ignore_index=True)
+
+
+@startup.deferred("season simulation", version=lambda partition, after_round: store.matches_version(partition))
+def _simulate(partition, after_round):
+    return SeasonSimulation(store.load_matches(partition), after_round, settings.SIMULATION_TRIALS, settings.SIMULATION_SEED)
+
+
+def load_simulation(partition=None, after_round=0):
+    """Returns the cached simulation of a partition from after `after_round`, run on first request."""
+    return _simulate(catalog.parse(partition), int(after_round))
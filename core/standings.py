@@ -0,0 +1,162 @@
+"""League tables derived from the match results.
+
+`team_matches` reshapes the matches frame into one row per team per match.
+`Standings` adds those rows up with cumulative sums over the sorted rounds,
+once, for all, home and away matches; the table after any round and the
+position-over-time chart are then slices of the precomputed arrays instead
+of a regroup of the matches.
+"""
+import numpy as np
+import pandas as pd
+
+from core import catalog, startup, store, watcher
+
+
+VENUES = ('all', 'home', 'away')
+
+# Accumulated per team, in this order, along the last axis of the totals arrays
+STAT_COLUMNS = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points']
+
+# Columns of the frame returned by `Standings.table`
+TABLE_COLUMNS = ['position', 'team', 'played', 'won', 'drawn', 'lost',
+                 'goals_for', 'goals_against', 'goal_difference', 'points', 'form']
+
+FORM_LENGTH = 5
+
+
+def team_matches(df):
+    """Returns one row per team per match: round, time, team, opponent, venue, goals and result.
+
+    Results ('W', 'D', 'L') are read from 'full_time_result' from each team's point of view.
+    """
+    home_result = df['full_time_result'].map({'H': 'W', 'D': 'D', 'A': 'L'})
+    away_result = df['full_time_result'].map({'H': 'L', 'D': 'D', 'A': 'W'})
+    sides = [
+        ('home', 'home_team', 'away_team', 'full_time_home_team_goals', 'full_time_away_team_goals', home_result),
+        ('away', 'away_team', 'home_team', 'full_time_away_team_goals', 'full_time_home_team_goals', away_result),
+    ]
+    frames = [
+        pd.DataFrame({
+            'round': df['round'].to_numpy(),
+            'utc_time': df['utc_time'].to_numpy(),
+            'team': df[team].astype(str).to_numpy(),
+            'opponent': df[opponent].astype(str).to_numpy(),
+            'venue': venue,
+            'goals_for': df[goals_for].to_numpy(),
+            'goals_against': df[goals_against].to_numpy(),
+            'result': result.to_numpy(),
+        })
+        for venue, team, opponent, goals_for, goals_against, result in sides
+    ]
+    long = pd.concat(frames, ignore_index=True)
+    return long.sort_values(['round', 'utc_time', 'venue'], kind='stable', ignore_index=True)
+
+
+class Standings:
+    """Materialized league tables after every round, overall and split by venue.
+
+    Teams are ranked on points, then goal difference, then goals scored, then name.
+    """
+
+    def __init__(self, matches):
+        long = team_matches(matches)
+        self.teams = np.array(sorted(long['team'].unique()))
+        self.rounds = np.sort(long['round'].unique())
+
+        team_idx = np.searchsorted(self.teams, long['team'].to_numpy())
+        round_idx = np.searchsorted(self.rounds, long['round'].to_numpy())
+        result = long['result'].to_numpy()
+        goals_for = long['goals_for'].to_numpy(dtype=np.int64)
+        goals_against = long['goals_against'].to_numpy(dtype=np.int64)
+        values = np.column_stack([
+            np.ones(len(long), dtype=np.int64),
+            result == 'W',
+            result == 'D',
+            result == 'L',
+            goals_for,
+            goals_against,
+            3 * (result == 'W') + (result == 'D'),
+        ]).astype(np.int64)
+
+        venue = long['venue'].to_numpy()
+        self._totals = {}     # venue -> (rounds, teams, stats) cumulative totals
+        self._positions = {}  # venue -> (rounds, teams) table positions
+        self._results = {}    # venue -> per-team string of results in round order
+        for name in VENUES:
+            mask = np.ones(len(long), dtype=bool) if name == 'all' else venue == name
+            per_round = np.zeros((len(self.rounds), len(self.teams), len(STAT_COLUMNS)), dtype=np.int64)
+            np.add.at(per_round, (round_idx[mask], team_idx[mask]), values[mask])
+            totals = per_round.cumsum(axis=0)
+            self._totals[name] = totals
+            self._positions[name] = self._rank(totals)
+            results = long.loc[mask].groupby('team', sort=True)['result'].agg(''.join)
+            self._results[name] = results.reindex(self.teams, fill_value='').to_numpy()
+
+    def _rank(self, totals):
+        # Sorts every round at once; lexsort uses the last key as the primary one
+        points = totals[..., STAT_COLUMNS.index('points')]
+        goals_for = totals[..., STAT_COLUMNS.index('goals_for')]
+        goal_difference = goals_for - totals[..., STAT_COLUMNS.index('goals_against')]
+        names = np.broadcast_to(np.arange(len(self.teams)), points.shape)
+        order = np.lexsort((names, -goals_for, -goal_difference, -points), axis=-1)
+        positions = np.empty_like(order)
+        ranks = np.broadcast_to(np.arange(1, len(self.teams) + 1), order.shape)
+        np.put_along_axis(positions, order, ranks, axis=-1)
+        return positions
+
+    def round_index(self, round=None):
+        """Index of the last materialized round played by `round`; None means the final round."""
+        if round is None:
+            return len(self.rounds) - 1
+        return int(np.searchsorted(self.rounds, round, side='right')) - 1
+
+    def table(self, round=None, venue='all'):
+        """Returns the league table after `round` (the final table by default)."""
+        index = self.round_index(round)
+        if index < 0:
+            totals = np.zeros((len(self.teams), len(STAT_COLUMNS)), dtype=np.int64)
+            positions = np.arange(1, len(self.teams) + 1)
+        else:
+            totals = self._totals[venue][index]
+            positions = self._positions[venue][index]
+
+        table = pd.DataFrame(totals, columns=STAT_COLUMNS)
+        table.insert(0, 'position', positions)
+        table.insert(1, 'team', self.teams)
+        table.insert(8, 'goal_difference', table['goals_for'] - table['goals_against'])
+        table['form'] = self.form(round, venue)
+        return table.sort_values('position', ignore_index=True)[TABLE_COLUMNS]
+
+    def form(self, round=None, venue='all', length=FORM_LENGTH):
+        """Returns each team's last `length` results up to `round`, oldest first, e.g. 'WWDLW'."""
+        index = self.round_index(round)
+        if index < 0:
+            return [''] * len(self.teams)
+        played = self._totals[venue][index][:, STAT_COLUMNS.index('played')]
+        return [results[max(0, n - length):n] for results, n in zip(self._results[venue], played)]
+
+    def positions(self, venue='all'):
+        """Returns the table position of every team after every round (rounds x teams)."""
+        return pd.DataFrame(self._positions[venue], index=pd.Index(self.rounds, name='round'), columns=self.teams)
+
+    def points(self, venue='all'):
+        """Returns the accumulated points of every team after every round (rounds x teams)."""
+        return pd.DataFrame(
+            self._totals[venue][..., STAT_COLUMNS.index('points')],
+            index=pd.Index(self.rounds, name='round'),
+            columns=self.teams,
+        )
+
+
+@startup.deferred("standings", version=store.matches_version)
+def _build(partition):
+    return Standings(store.load_matches(partition))
+
+
+# Materialized again once the watcher has ingested new matches, ahead of the next request
+watcher.on_change('matches')(_build.refresh)
+
+
+def load_standings(partition=None):
+    """Returns the shared standings of a partition, rebuilt when its matches file changes."""
+    return _build(catalog.parse(partition))
@@ -0,0 +1,209 @@
+"""Startup cost accounting and deferred initialisation.
+
+* `import_timer` wraps `__import__` to measure the self time of every module
+  imported while it is installed, grouped by top-level package.
+* `timed(label)` records the cost of an initialisation step.
+* `deferred(label)` turns a builder into an accessor that runs it on first
+  use (and again, or an in-place update, when its data version changes)
+  instead of at import.
+* `on_warmup` / `run_warmup` let pages register builders that a background
+  thread or the boot sequence can run ahead of the first visit.
+
+Run ``python -m core.startup`` to boot the app and print the report.
+"""
+import builtins
+import contextlib
+import functools
+import importlib
+import sys
+import threading
+import time
+import types
+from collections import defaultdict
+
+from core import settings
+
+
+class ImportTimer:
+    """Accumulates import self time per top-level package."""
+
+    def __init__(self):
+        self.self_times = defaultdict(float)
+        self._local = threading.local()
+        self._original = None
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Already-loaded and relative imports cost nothing worth reporting
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            self.self_times[name.partition('.')[0]] += elapsed - children
+            if stack:
+                stack[-1] += elapsed
+
+
+import_timer = ImportTimer()
+
+_steps = []  # (label, seconds, thread name)
+_steps_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def timed(label):
+    """Records how long the enclosed initialisation step takes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _steps_lock:
+            _steps.append((label, time.perf_counter() - start, threading.current_thread().name))
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module and imports it on first attribute access.
+
+    Unlike `importlib.util.LazyLoader`, this is safe when the first access
+    happens on several threads at once (e.g. a request during the warm-up):
+    the import system's per-module lock makes late threads wait for the import.
+    """
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        value = getattr(module, attr)
+        setattr(self, attr, value)
+        return value
+
+
+def lazy_import(name):
+    """Returns a module whose code only runs on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def deferred(label, version=None, update=None):
+    """Decorates a builder so it runs on first call for each set of arguments.
+
+    The result is rebuilt whenever `version(*args)` returns a new token, unless
+    `update(value, token, *args)` brings the value built at the old `token` up
+    to date (returning it) instead; it returns None to have it rebuilt.
+    `get.refresh(*args)` does the same ahead of the next call, for arguments
+    that have been built already.
+    """
+    def decorator(builder):
+        states = {}  # args -> (token, value)
+        lock = threading.Lock()
+
+        @functools.wraps(builder)
+        def get(*args):
+            token = version(*args) if version is not None else None
+            state = states.get(args)
+            if state is None or state[0] != token:
+                with lock:
+                    state = states.get(args)
+                    if state is None or state[0] != token:
+                        value = None
+                        if state is not None and update is not None:
+                            with timed(f"{label} (update)"):
+                                value = update(state[1], state[0], *args)
+                        if value is None:
+                            with timed(label):
+                                value = builder(*args)
+                        state = (token, value)
+                        states[args] = state
+            return state[1]
+
+        def refresh(*args):
+            if args in states:
+                get(*args)
+
+        get.refresh = refresh
+        return get
+    return decorator
+
+
+_warmups = []  # (label, func)
+
+
+def on_warmup(label):
+    """Registers `func` to run during warm-up; returns it unchanged."""
+    def decorator(func):
+        _warmups.append((label, func))
+        return func
+    return decorator
+
+
+def _run_warmups(print_report=False):
+    for label, func in _warmups:
+        with timed(f"warm-up: {label}"):
+            func()
+    if print_report:
+        print(report(), flush=True)
+
+
+def run_warmup(mode, print_report=False):
+    """Runs the registered warm-ups: 'eager' blocks, 'background' uses a daemon thread, 'off' skips.
+
+    With `print_report`, the startup report is printed once the warm-ups finish
+    (or right away when they are skipped).
+    """
+    if mode == 'eager':
+        _run_warmups(print_report)
+    elif mode == 'background':
+        threading.Thread(target=_run_warmups, args=(print_report,), name="warm-up", daemon=True).start()
+    elif print_report:
+        print(report(), flush=True)
+
+
+def report(limit=12):
+    """Formats the import and initialisation costs recorded so far."""
+    lines = ["Startup report", "  Imports (self time by package):"]
+    imports = sorted(import_timer.self_times.items(), key=lambda item: item[1], reverse=True)
+    for package, seconds in imports[:limit]:
+        lines.append(f"    {package:<40} {seconds * 1000:8.1f} ms")
+    if len(imports) > limit:
+        rest = sum(seconds for _, seconds in imports[limit:])
+        lines.append(f"    {f'({len(imports) - limit} more)':<40} {rest * 1000:8.1f} ms")
+    lines.append(f"    {'total':<40} {sum(import_timer.self_times.values()) * 1000:8.1f} ms")
+
+    lines.append("  Initialisation:")
+    with _steps_lock:
+        steps = list(_steps)
+    for label, seconds, thread in steps:
+        where = "" if thread == "MainThread" else f" [{thread}]"
+        lines.append(f"    {label + where:<40} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def main():
+    """Boots the app the way start.py does, runs every warm-up and prints the report."""
+    import_timer.install()
+    with timed("import start"):
+        import start  # noqa: F401
+    if settings.WARMUP != 'eager':
+        _run_warmups()
+    print(report(limit=25))
+
+
+if __name__ == '__main__':
+    # Run through the imported module, not this __main__ copy, so the pages' warm-ups are visible
+    from core import startup
+    startup.main()
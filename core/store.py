@@ -0,0 +1,293 @@
+"""Shared data access for every page.
+
+Datasets are partitioned by league and season (see `core.catalog`); every
+loader takes an optional partition, defaulting to the configured one.
+Each source CSV is parsed once per process, compacted to narrow dtypes (see
+`core.compact`) and kept as a typed columnar copy (Parquet, or memory-mapped
+Arrow IPC for multi-worker serving) under ``settings.CACHE_DIR``, keyed on
+the source file's modification time. When a file only grew (e.g. a new
+round appended to a matches file), just the appended lines are parsed and
+added to the shared frame.
+Pages get the same in-memory frame back on every call, so they must treat it
+as read-only and work on derived frames instead of assigning columns to it.
+Importing this module turns on pandas copy-on-write for the process, so
+those derived frames never write back into the shared ones.
+"""
+import glob
+import io
+import os
+import threading
+import zlib
+
+import pandas as pd
+
+from core import catalog, compact, schema, settings
+from core.cache import TableCache
+
+# Set here rather than by each entry point: every process that gets a shared frame
+# imported this module first, and slices and reshapes of it are then copied lazily
+pd.set_option("mode.copy_on_write", True)
+
+
+# Chronological orders used for the derived time columns
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTH_MAP = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
+             7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
+
+# Columns added on load that are not part of the source file
+DERIVED_COLUMNS = ['day_of_week', 'month_name', 'league', 'season']
+
+_lock = threading.Lock()
+_frames = {}  # path -> (mtime_ns, DataFrame)
+_sources = {}  # path -> (bytes parsed, their CRC-32, [(mtime_ns, rows)] of the versions the frame extends)
+
+
+def derive_match_columns(df, partition):
+    """Validates a freshly parsed matches file and adds the derived columns.
+
+    'month_name' is ordered by when each month first occurs in the season, so
+    calendar-year and Aug-May seasons both plot chronologically.
+    """
+    schema.validate_matches(df, source=partition.key)
+    df['utc_time'] = pd.to_datetime(df['utc_time'])
+    df['day_of_week'] = pd.Categorical(df['utc_time'].dt.day_name(), categories=DAY_ORDER, ordered=True)
+    months = df['utc_time'].dt.month.map(MONTH_MAP)
+    month_order = list(dict.fromkeys(months.iloc[df['utc_time'].argsort()]))
+    df['month_name'] = pd.Categorical(months, categories=month_order, ordered=True)
+    df['league'] = pd.Categorical([partition.league] * len(df))
+    df['season'] = pd.Categorical([partition.season] * len(df))
+    return df
+
+
+def _cache_stem(path, tag):
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(settings.DATA_DIR))
+    stem = os.path.splitext(relative)[0].replace(os.sep, "__")
+    return f"{stem}.{tag}" if tag else stem
+
+
+def cache_path(stem, version):
+    """Returns the columnar cache file of `stem` at `version`, in the configured format."""
+    return os.path.join(settings.CACHE_DIR, f"{stem}.{version}.{settings.CACHE_FORMAT}")
+
+
+def read_cache(path):
+    """Reads a columnar cache file.
+
+    Arrow files are memory-mapped: numeric columns are views of the mapped
+    pages and strings stay in Arrow buffers instead of becoming Python objects,
+    so forked workers share one copy through the page cache and reference
+    counting never dirties it.
+    """
+    if settings.CACHE_FORMAT == 'arrow':
+        import pyarrow as pa
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        strings = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+        return table.to_pandas(split_blocks=True, types_mapper=strings.get)
+    return pd.read_parquet(path)
+
+
+def write_cache(cache_file, stem, df):
+    """Atomically writes `df` to `cache_file` and removes older versions of the same stem."""
+    try:
+        os.makedirs(settings.CACHE_DIR, exist_ok=True)
+        # Write next to the target and rename, so concurrent workers never read a partial file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        if settings.CACHE_FORMAT == 'arrow':
+            from pyarrow import feather
+            feather.write_feather(df, tmp_file, compression='uncompressed')
+        else:
+            df.to_parquet(tmp_file)
+        os.replace(tmp_file, cache_file)
+        pattern = f"{glob.escape(stem)}.[0-9]*.{settings.CACHE_FORMAT}"
+        for stale in glob.glob(os.path.join(settings.CACHE_DIR, pattern)):
+            if stale != cache_file:
+                os.remove(stale)
+    except OSError:
+        # The cache is only an optimisation; a read-only checkout still works from the CSV
+        pass
+
+
+def read_table(path, derive=None, tag=None, **read_csv_kwargs):
+    """Reads a CSV through its columnar cache, parsing the CSV only when the cache is stale.
+
+    `derive` is applied to freshly parsed frames before they are compacted and
+    cached; pass a `tag` to keep its output apart from other caches of the same file.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    stem = _cache_stem(path, tag)
+    cache_file = cache_path(stem, mtime_ns)
+    if os.path.exists(cache_file):
+        # A no-op for caches written compact; older caches are compacted in memory
+        return compact.compact_frame(read_cache(cache_file))
+
+    df = pd.read_csv(path, **read_csv_kwargs)
+    if derive is not None:
+        df = derive(df)
+    df = compact.compact_frame(df)
+    write_cache(cache_file, stem, df)
+    return df
+
+
+def prepare_table(path, progress=None, chunk_rows=100_000):
+    """Makes sure `path` has an up-to-date columnar cache for `read_table`; returns its version.
+
+    A stale cache is rebuilt by parsing the CSV in chunks, calling
+    `progress(fraction)` with the share of the file read so far.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    stem = _cache_stem(path, None)
+    cache_file = cache_path(stem, mtime_ns)
+    if not os.path.exists(cache_file):
+        size = os.path.getsize(path) or 1
+        chunks = []
+        with open(path, 'rb') as f:
+            for chunk in pd.read_csv(f, chunksize=chunk_rows):
+                chunks.append(chunk)
+                if progress is not None:
+                    progress(min(f.tell() / size, 1.0))
+        write_cache(cache_file, stem, compact.compact_frame(pd.concat(chunks)))
+    return mtime_ns
+
+
+def _checksum(path, size, block_size=1 << 20):
+    crc = 0
+    with open(path, 'rb') as f:
+        while size > 0:
+            block = f.read(min(size, block_size))
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            size -= len(block)
+    return crc
+
+
+def _source(path, mtime_ns, rows):
+    # Files not ending in a newline could be extended mid-line, so they are always reloaded
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(size - 1, 0))
+        if f.read(1) != b'\n':
+            return None
+    return size, _checksum(path, size), [(mtime_ns, rows)]
+
+
+def concat_rows(df, rows):
+    """Appends `rows` to `df`; categorical columns keep their categories, new values are added after them."""
+    dtypes = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = rows[col].cat.categories if isinstance(rows[col].dtype, pd.CategoricalDtype) else rows[col].dropna().unique()
+            known = set(dtype.categories)
+            dtypes[col] = pd.CategoricalDtype([*dtype.categories, *(v for v in values if v not in known)], ordered=dtype.ordered)
+    return pd.concat([df.astype(dtypes), rows.astype(dtypes)])
+
+
+def _append_rows(path, mtime_ns, derive, tag, read_csv_kwargs):
+    # Extends the shared frame with the lines appended since it was read; None unless the file only grew
+    source = _sources.get(path)
+    if source is None:
+        return None
+    parsed, checksum, history = source
+    size = os.path.getsize(path)
+    if size < parsed or _checksum(path, parsed) != checksum:
+        return None
+
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(parsed)
+        tail = f.read(size - parsed)
+    # A line still being written is left for the next change
+    tail = tail[:tail.rfind(b'\n') + 1]
+    df = _frames[path][1]
+    if tail:
+        rows = pd.read_csv(io.BytesIO(header + tail), **read_csv_kwargs)
+        if derive is not None:
+            rows = derive(rows)
+        if list(rows.columns) != list(df.columns):
+            return None
+        df = compact.compact_frame(concat_rows(df, rows))
+        parsed, checksum = parsed + len(tail), zlib.crc32(tail, checksum)
+        if parsed == size:
+            stem = _cache_stem(path, tag)
+            write_cache(cache_path(stem, mtime_ns), stem, df)
+    _sources[path] = (parsed, checksum, history + [(mtime_ns, len(df))])
+    return df
+
+
+def shared_table(path, derive=None, tag=None, **read_csv_kwargs):
+    """Returns the process-wide frame for `path`, reloading it only when the file changes.
+
+    When the file only grew, the appended lines are parsed (with `derive`) and
+    added to the frame instead.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _frames.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    with _lock:
+        cached = _frames.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            df = _append_rows(path, mtime_ns, derive, tag, read_csv_kwargs) if cached is not None else None
+            if df is None:
+                df = read_table(path, derive=derive, tag=tag, **read_csv_kwargs)
+                _sources[path] = _source(path, mtime_ns, len(df))
+            cached = (mtime_ns, df)
+            _frames[path] = cached
+    return cached[1]
+
+
+def rows_since(path, version):
+    """Rows added to the shared frame of `path` since the file's mtime was `version`.
+
+    Returns None when the frame has been reloaded since, so derived data must be rebuilt.
+    """
+    with _lock:
+        cached, source = _frames.get(path), _sources.get(path)
+    if cached is None or source is None:
+        return None
+    for mtime_ns, rows in source[2]:
+        if mtime_ns == version:
+            return cached[1].iloc[rows:]
+    return None
+
+
+def load_matches(partition=None):
+    """Returns the shared matches frame of a partition, with the derived columns."""
+    partition = catalog.parse(partition)
+    return shared_table(
+        catalog.matches_path(partition),
+        derive=lambda df: derive_match_columns(df, partition),
+        tag="matches",
+        index_col=0,
+    )
+
+
+def load_matches_for(league=None, seasons=None):
+    """Concatenates the matches of the partitions matching the filters; other partitions are never read."""
+    frames = [load_matches(partition) for partition in catalog.prune(league, seasons)]
+    if not frames:
+        return load_matches().iloc[0:0]
+    return pd.concat(frames, ignore_index=True)
+
+
+# Parsed Stats page tables, kept within the configured memory budget
+stats_cache = TableCache(read_table, settings.STATS_CACHE_BYTES)
+
+
+def load_stats_table(path):
+    """Returns a parsed stats table from the bounded LRU cache."""
+    return stats_cache.get(path)
+
+
+def matches_version(partition=None):
+    """Returns a token that changes whenever the partition's matches file does."""
+    return os.stat(catalog.matches_path(partition)).st_mtime_ns
+
+
+def matches_since(partition, version):
+    """The matches appended to a partition since `matches_version` returned `version`, or None."""
+    partition = catalog.parse(partition)
+    load_matches(partition)
+    return rows_since(catalog.matches_path(partition), version)
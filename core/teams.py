@@ -0,0 +1,154 @@
+"""Team-centric index over a partition's matches.
+
+`team_match_table` reshapes the matches into one row per team per match,
+with a ``<metric>_for`` and ``<metric>_against`` column for every match
+metric and categorical team, opponent, venue and result columns, in
+chronological order. `TeamIndex` keeps the row positions of every team, of
+every team at home or away and of every ordered team pair, so head-to-head
+records, rolling form and home/away splits are a lookup plus a slice of a
+few hundred rows instead of a scan of the whole frame.
+"""
+import numpy as np
+import pandas as pd
+
+from core import catalog, startup, store, watcher
+
+
+VENUES = ('all', 'home', 'away')
+RESULTS = ['W', 'D', 'L']
+POINTS = {'W': 3, 'D': 1, 'L': 0}
+
+# Metric -> (home column, away column) of the matches frame
+SIDE_METRICS = {
+    'goals': ('full_time_home_team_goals', 'full_time_away_team_goals'),
+    'half_time_goals': ('half_time_home_team_goals', 'half_time_away_team_goals'),
+    **{
+        metric: (f'home_team_{metric}', f'away_team_{metric}')
+        for metric in ['shots', 'shots_on_target', 'fouls_committed', 'corners', 'yellow_cards', 'red_cards']
+    },
+}
+
+# Averaged per game by `TeamIndex.split` and `TeamIndex.rolling`
+SUMMARY_METRICS = ['points', 'goals_for', 'goals_against', 'shots_for', 'shots_against']
+
+
+def team_match_table(df):
+    """Returns one row per team per match, oldest first.
+
+    'match' is the row position of the match in `df`; teams and opponents
+    share one categorical dtype over every team of the partition.
+    """
+    teams = pd.CategoricalDtype(sorted(set(df['home_team'].astype(str)) | set(df['away_team'].astype(str))))
+    results = {'home': df['full_time_result'].map({'H': 'W', 'D': 'D', 'A': 'L'}),
+               'away': df['full_time_result'].map({'H': 'L', 'D': 'D', 'A': 'W'})}
+    frames = []
+    for venue, team, opponent in (('home', 'home_team', 'away_team'), ('away', 'away_team', 'home_team')):
+        ours, theirs = (0, 1) if venue == 'home' else (1, 0)
+        columns = {
+            'match': np.arange(len(df), dtype=np.int32),
+            'round': df['round'].to_numpy(),
+            'utc_time': df['utc_time'].to_numpy(),
+            'team': df[team].astype(str).to_numpy(),
+            'opponent': df[opponent].astype(str).to_numpy(),
+            'venue': venue,
+            'result': results[venue].to_numpy(),
+        }
+        for metric, sides in SIDE_METRICS.items():
+            columns[f'{metric}_for'] = df[sides[ours]].to_numpy()
+            columns[f'{metric}_against'] = df[sides[theirs]].to_numpy()
+        frames.append(pd.DataFrame(columns))
+
+    long = pd.concat(frames, ignore_index=True)
+    long = long.sort_values(['utc_time', 'match', 'venue'], kind='stable', ignore_index=True)
+    long['points'] = long['result'].map(POINTS).astype('int8')
+    return long.astype({
+        'team': teams,
+        'opponent': teams,
+        'venue': pd.CategoricalDtype(['home', 'away']),
+        'result': pd.CategoricalDtype(RESULTS),
+    })
+
+
+def _positions(grouped):
+    return {key: np.sort(rows) for key, rows in grouped.indices.items()}
+
+
+class TeamIndex:
+    """Row positions of every team, team and venue, and ordered team pair in the team-match table."""
+
+    def __init__(self, df):
+        self.table = team_match_table(df)
+        self.teams = list(self.table['team'].cat.categories)
+        self.team_rows = _positions(self.table.groupby('team', observed=True))
+        self.venue_rows = _positions(self.table.groupby(['team', 'venue'], observed=True))
+        self.pair_rows = _positions(self.table.groupby(['team', 'opponent'], observed=True))
+        self._empty = np.array([], dtype=np.intp)
+
+    def rows(self, team, venue='all', opponent=None):
+        """Positions of `team`'s games in the table, oldest first, optionally against one opponent."""
+        if opponent is not None:
+            rows = self.pair_rows.get((team, opponent), self._empty)
+            if venue != 'all':
+                rows = rows[self.table['venue'].to_numpy()[rows] == venue]
+            return rows
+        if venue == 'all':
+            return self.team_rows.get(team, self._empty)
+        return self.venue_rows.get((team, venue), self._empty)
+
+    def games(self, team, venue='all', opponent=None):
+        """`team`'s games from its point of view, oldest first."""
+        return self.table.iloc[self.rows(team, venue, opponent)]
+
+    def matches(self, team, venue='all', opponent=None):
+        """Row positions in the matches frame of `team`'s games."""
+        return self.table['match'].to_numpy()[self.rows(team, venue, opponent)]
+
+    def head_to_head(self, team, opponent):
+        """Games of `team` against `opponent`, and its wins, draws, losses and goals in them."""
+        games = self.games(team, opponent=opponent)
+        record = {result: int((games['result'] == result).sum()) for result in RESULTS}
+        record['goals_for'] = int(games['goals_for'].sum())
+        record['goals_against'] = int(games['goals_against'].sum())
+        return games, record
+
+    def form(self, team, n=5, venue='all'):
+        """Results of `team`'s last n games, oldest first, e.g. 'WDLWW'."""
+        rows = self.rows(team, venue)[-n:]
+        return ''.join(self.table['result'].to_numpy()[rows].astype(str))
+
+    def rolling(self, team, n=5, venue='all', metrics=SUMMARY_METRICS):
+        """Per-game averages of `metrics` over each game and the n - 1 before it."""
+        rows = self.rows(team, venue)
+        games = self.table.iloc[rows]
+        values = games[list(metrics)].to_numpy(dtype=float)
+        totals = np.cumsum(values, axis=0)
+        totals[n:] = totals[n:] - totals[:-n]
+        counts = np.minimum(np.arange(1, len(rows) + 1), n)[:, None]
+        averages = pd.DataFrame(totals / counts, columns=list(metrics))
+        return averages.assign(round=games['round'].to_numpy(), opponent=games['opponent'].to_numpy(),
+                               venue=games['venue'].to_numpy(), result=games['result'].to_numpy())
+
+    def split(self, team):
+        """`team`'s record and per-game averages overall, at home and away, one row per venue."""
+        rows = []
+        for venue in VENUES:
+            games = self.games(team, venue)
+            row = {'venue': venue.title(), 'played': len(games)}
+            row.update({result: int((games['result'] == result).sum()) for result in RESULTS})
+            for metric in SUMMARY_METRICS:
+                row[metric] = round(float(games[metric].mean()), 2) if len(games) else 0.0
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+@startup.deferred("team index", version=store.matches_version)
+def _build(partition):
+    return TeamIndex(store.load_matches(partition))
+
+
+watcher.on_change('matches')(_build.refresh)
+
+
+def load_index(partition=None):
+    """Returns the shared team index of a partition, rebuilt when its matches file changes."""
+    return _build(catalog.parse(partition))
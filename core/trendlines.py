@@ -0,0 +1,190 @@
+"""Trendlines for scatter plots, computed with NumPy instead of statsmodels.
+
+`PairwiseStats` fits the least-squares line of every numerical column pair
+in one batched pass: the slope, intercept and R² of `y ~ x` all follow from
+the column means and the covariance matrix, which also gives the
+correlation matrix used by the heatmap. LOWESS and rolling-mean lines are
+computed per pair on demand and memoized by `TrendlineEngine`.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+TRENDLINE_KINDS = {
+    'ols': 'OLS',
+    'lowess': 'LOWESS',
+    'rolling': 'Rolling Mean',
+}
+
+
+def pairwise_sums(values):
+    """Returns the (n, sums, sums of squares, cross-products) k x k arrays of a rows x k array.
+
+    Entry [i, j] only counts the rows where columns i and j are both finite;
+    `sums[i, j]` and the sums of squares are those of column i over such rows.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    weights = finite.astype(float)
+    values = np.where(finite, values, 0.0)
+    return weights.T @ weights, values.T @ weights, (values * values).T @ weights, values.T @ values
+
+
+class PairwiseStats:
+    """Means, covariance, correlation and OLS coefficients for all column pairs.
+
+    Each pair is computed on the rows where both columns are finite, like
+    `DataFrame.corr()`: `mean[i, j]` and `var[i, j]` are the mean and variance
+    of column i over the rows it shares with column j.
+    `slope.loc[x, y]` and `intercept.loc[x, y]` describe the fit of `y` on `x`.
+    """
+
+    def __init__(self, columns, n, mean, var, cov):
+        self.columns = list(columns)
+        self.n = np.asarray(n, dtype=float)
+        self.mean = np.asarray(mean, dtype=float)
+        self.var = np.asarray(var, dtype=float)
+        self.cov = np.asarray(cov, dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.corr = self.cov / np.sqrt(self.var * self.var.T)
+            slope = self.cov / self.var
+        intercept = self.mean.T - slope * self.mean
+
+        self.slope = pd.DataFrame(slope, index=self.columns, columns=self.columns)
+        self.intercept = pd.DataFrame(intercept, index=self.columns, columns=self.columns)
+        self.r2 = pd.DataFrame(self.corr ** 2, index=self.columns, columns=self.columns)
+
+    @classmethod
+    def from_sums(cls, columns, n, sums, sumsq, cross):
+        """Builds the statistics from the arrays returned by `pairwise_sums` (or their totals)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums / n
+            dof = np.maximum(n - 1, 1)
+            var = (sumsq - sums * mean) / dof
+            cov = (cross - sums * mean.T) / dof
+        return cls(columns, n, mean, var, cov)
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls.from_sums(frame.columns, *pairwise_sums(frame.to_numpy(dtype=float)))
+
+    def corr_frame(self):
+        return pd.DataFrame(self.corr, index=self.columns, columns=self.columns)
+
+    def ols(self, x_col, y_col):
+        """Returns (slope, intercept, r2) of `y_col ~ x_col`."""
+        return (
+            self.slope.at[x_col, y_col],
+            self.intercept.at[x_col, y_col],
+            self.r2.at[x_col, y_col],
+        )
+
+
+def lowess(x, y, frac=2 / 3, max_points=200, chunk_size=16):
+    """Locally weighted linear regression with tricube weights.
+
+    The curve is evaluated at up to `max_points` x positions, processed in
+    chunks so memory stays at `chunk_size * len(x)` floats. Pairs with a
+    missing or infinite value are left out.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = x[keep], y[keep]
+    n = len(x)
+    if n == 0:
+        return np.array([]), np.array([])
+    k = min(n, max(2, int(np.ceil(frac * n))))
+
+    grid = np.unique(x)
+    if len(grid) > max_points:
+        grid = np.unique(np.quantile(x, np.linspace(0, 1, max_points)))
+
+    fitted = np.empty(len(grid))
+    for start in range(0, len(grid), chunk_size):
+        points = grid[start:start + chunk_size, None]
+        distance = np.abs(x[None, :] - points)
+        bandwidth = np.partition(distance, k - 1, axis=1)[:, k - 1:k]
+        bandwidth[bandwidth == 0] = 1.0
+        w = np.clip(1 - (distance / bandwidth) ** 3, 0, None) ** 3
+
+        sw = w.sum(axis=1)
+        swx = w @ x
+        swy = w @ y
+        swxx = w @ (x * x)
+        swxy = w @ (x * y)
+        denominator = sw * swxx - swx ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denominator > 1e-12, (sw * swxy - swx * swy) / denominator, 0.0)
+            intercept = (swy - slope * swx) / sw
+        fitted[start:start + chunk_size] = intercept + slope * points[:, 0]
+    return grid, fitted
+
+
+def rolling_mean(x, y, window=None, max_points=200):
+    """Centered rolling mean of `y` after sorting by `x`, averaged per distinct x.
+
+    With more than `max_points` distinct x values the curve is sampled at that many.
+    Pairs with a missing or infinite value are left out.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    points = pd.DataFrame({'x': x[keep], 'y': y[keep]}).groupby('x', sort=True)['y'].mean()
+    if points.empty:
+        return np.array([]), np.array([])
+    window = window or max(3, len(points) // 10)
+    smoothed = points.rolling(window, center=True, min_periods=1).mean()
+    line_x, line_y = smoothed.index.to_numpy(dtype=float), smoothed.to_numpy()
+    if len(line_x) > max_points:
+        grid = np.linspace(line_x[0], line_x[-1], max_points)
+        line_x, line_y = grid, np.interp(grid, line_x, line_y)
+    return line_x, line_y
+
+
+class TrendlineEngine:
+    """Serves trendline coordinates for column pairs of one numerical frame."""
+
+    def __init__(self, frame, stats=None):
+        self.frame = frame
+        self.stats = stats if stats is not None else PairwiseStats.from_frame(frame)
+        self._lines = {}
+        self._lock = threading.Lock()
+
+    def line(self, x_col, y_col, kind='ols', rows=None):
+        """Returns (x, y, label) for the trendline of `y_col` against `x_col`.
+
+        `rows` is an optional boolean mask of the rows to fit; such lines are not memoized.
+        """
+        if rows is not None:
+            selected = self.frame.loc[rows, list(dict.fromkeys([x_col, y_col]))]
+            if len(selected) < 2:
+                return np.array([]), np.array([]), TRENDLINE_KINDS.get(kind, kind)
+            return TrendlineEngine(selected)._build(x_col, y_col, kind)
+        key = (x_col, y_col, kind)
+        line = self._lines.get(key)
+        if line is None:
+            line = self._build(x_col, y_col, kind)
+            with self._lock:
+                self._lines[key] = line
+        return line
+
+    def _build(self, x_col, y_col, kind):
+        # Every kind fits the rows where both values are finite, the rows of the pair's OLS moments
+        x = self.frame[x_col].to_numpy(dtype=float)
+        y = self.frame[y_col].to_numpy(dtype=float)
+        rows = np.isfinite(x) & np.isfinite(y)
+        x, y = x[rows], y[rows]
+        if kind == 'ols':
+            slope, intercept, r2 = self.stats.ols(x_col, y_col)
+            line_x = np.array([x.min(), x.max()]) if len(x) else np.array([])
+            label = f"OLS: y = {slope:.3f}x + {intercept:.3f} (R² = {r2:.3f})"
+            return line_x, intercept + slope * line_x, label
+        if kind == 'lowess':
+            line_x, line_y = lowess(x, y)
+            return line_x, line_y, "LOWESS"
+        line_x, line_y = rolling_mean(x, y)
+        return line_x, line_y, "Rolling Mean"
@@ -0,0 +1,134 @@
+"""Wide player and team tables merged from the split stats CSVs.
+
+Every file in the stats folder is one narrow leaderboard sharing the
+`Rank, Player, Team, ..., Minutes, Matches, Country` layout. The ingest stage
+merges them into one row per player (keyed by Player and Team) and one row per
+team, with a column per metric, and persists both in the store's columnar
+cache, keyed on the source files' modification times. Tables are built per
+league/season partition.
+
+Run ``python -m core.warehouse`` to rebuild the tables ahead of time.
+"""
+import glob
+import os
+import threading
+import unicodedata
+import zlib
+
+from core import catalog, store
+
+
+# Spellings used by the stats files, mapped to the names used in the matches file
+TEAM_ALIASES = {
+    'Alaves': 'Deportivo Alaves',
+    'Atletico de Madrid': 'Atletico Madrid',
+    'Celta de Vigo': 'Celta Vigo',
+    'Granada CF': 'Granada',
+    'Valencia CF': 'Valencia',
+}
+
+PLAYER_KEYS = ['Player', 'Team']
+TEAM_KEYS = ['Team']
+
+# Columns repeated in every file that describe the row rather than a metric
+IDENTITY_COLUMNS = ['Country', 'Minutes', 'Matches']
+
+_lock = threading.Lock()
+_tables = {}  # (kind, partition key) -> (signature, DataFrame)
+
+
+def normalize_team_name(name):
+    """Strips accents and maps known aliases, e.g. 'Almería' -> 'Almeria', 'Valencia CF' -> 'Valencia'."""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').strip()
+    return TEAM_ALIASES.get(ascii_name, ascii_name)
+
+
+def stats_files(kind, partition=None):
+    """Lists a partition's source files for 'players' or 'teams'."""
+    files = sorted(glob.glob(os.path.join(catalog.stats_dir(partition), '*.csv')))
+    is_player = [os.path.basename(f).startswith('player_') for f in files]
+    return [f for f, p in zip(files, is_player) if p == (kind == 'players')]
+
+
+def _signature(files):
+    # A numeric fingerprint of the file set and their mtimes, used as the cache version
+    parts = [(os.path.basename(f), os.stat(f).st_mtime_ns) for f in files]
+    return zlib.crc32(repr(parts).encode())
+
+
+def merge_stats(files, keys):
+    """Merges narrow leaderboard files into one wide frame indexed by `keys`.
+
+    Metrics that appear in several files (e.g. 'Yellow Cards') are combined,
+    keeping the first non-missing value.
+    """
+    wide = None
+    metric_order = []
+    for path in files:
+        df = store.read_table(path).drop(columns=['Rank'])
+        df = df.assign(Team=df['Team'].map(normalize_team_name))
+        # A few players appear twice in one file (e.g. split seasons); keep their first row
+        df = df.drop_duplicates(subset=keys).set_index(keys)
+        metric_order += [c for c in df.columns if c not in metric_order and c not in IDENTITY_COLUMNS]
+        wide = df if wide is None else wide.combine_first(df)
+
+    identity = [c for c in IDENTITY_COLUMNS if c in wide.columns]
+    wide = wide[identity + metric_order].sort_index()
+    wide['Country'] = wide['Country'].astype('category')
+    for col in ('Minutes', 'Matches'):
+        if col in wide.columns:
+            wide[col] = wide[col].astype('Int32')
+    return wide
+
+
+def load_table(kind, partition=None):
+    """Returns the shared wide table for 'players' or 'teams', rebuilding it when a source file changes."""
+    partition = catalog.parse(partition)
+    files = stats_files(kind, partition)
+    signature = _signature(files)
+    key = (kind, partition.key)
+    cached = _tables.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _lock:
+        cached = _tables.get(key)
+        if cached is None or cached[0] != signature:
+            stem = f"warehouse.{partition.league}.{partition.season}.{kind}"
+            cache_file = store.cache_path(stem, signature)
+            if os.path.exists(cache_file):
+                table = store.read_cache(cache_file)
+            else:
+                table = merge_stats(files, PLAYER_KEYS if kind == 'players' else TEAM_KEYS)
+                store.write_cache(cache_file, stem, table)
+            cached = (signature, table)
+            _tables[key] = cached
+    return cached[1]
+
+
+def load_players(partition=None):
+    return load_table('players', partition)
+
+
+def load_teams(partition=None):
+    return load_table('teams', partition)
+
+
+def player_profile(player, team=None, partition=None):
+    """Returns every metric for a player, as one row per team they appear for."""
+    players = load_players(partition)
+    if team is not None:
+        return players.loc[[(player, normalize_team_name(team))]]
+    return players.loc[[player]]
+
+
+def team_profile(team, partition=None):
+    """Returns every metric for a team as a Series."""
+    return load_teams(partition).loc[normalize_team_name(team)]
+
+
+if __name__ == '__main__':
+    for partition in catalog.discover():
+        for kind in ('players', 'teams'):
+            table = load_table(kind, partition)
+            print(f"{partition.key} {kind}: {table.shape[0]} rows x {table.shape[1]} columns")
@@ -0,0 +1,163 @@
+"""Live refresh of the data files while the app runs.
+
+With ``LALIGA_WATCH=1`` a daemon thread polls the modification time and size
+of every partition's matches file and Stats files every
+``settings.WATCH_INTERVAL`` seconds, and ingests what changed:
+
+* a matches file that only grew is extended with its new lines (see
+  `store.shared_table`); any other change reloads it;
+* a changed or new Stats file gets its columnar cache rebuilt and, if the
+  table cache holds it, is read again; the partition's other files are left alone;
+* the hooks registered with `on_change` then bring the aggregates built so
+  far up to date, e.g. the trend cube and the correlation moments fold in
+  the new matches instead of being rebuilt.
+
+Once that is done the partition's `versions` change. Open pages poll them
+through the navbar's interval (see `components/navbars.py`) and the
+callbacks showing the changed data take the matching refresh store as an
+input, so only those components are redrawn.
+"""
+import glob
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from core import catalog, settings, store
+
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('matches', 'stats')
+
+_hooks = defaultdict(list)  # kind -> [func(partition)]
+
+
+def on_change(kind):
+    """Registers `func(partition)` to run after a partition's `kind` files have been ingested; returns it unchanged."""
+    def decorator(func):
+        _hooks[kind].append(func)
+        return func
+    return decorator
+
+
+def watched_files():
+    """Every data file the watcher follows, as path -> (partition, kind)."""
+    files = {}
+    for partition in catalog.discover():
+        for path in sorted(glob.glob(os.path.join(partition.path, 'matches', '*.csv')))[:1]:
+            files[path] = (partition, 'matches')
+        for path in glob.glob(os.path.join(catalog.stats_dir(partition), '*.csv')):
+            files[path] = (partition, 'stats')
+    return files
+
+
+def _state(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Watcher:
+    """Polls the data files, ingests the changed ones and keeps a version token per partition and kind."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.versions = {}  # partition key -> {kind: token}
+        self._files = {}  # path -> (partition, kind, (mtime_ns, size))
+        self._lock = threading.Lock()
+
+    def poll(self, ingest=True):
+        """Checks every file once; returns the (partition, kind) pairs that changed."""
+        files = {path: (partition, kind, _state(path)) for path, (partition, kind) in sorted(watched_files().items())}
+        changed = defaultdict(list)
+        for path in files.keys() | self._files.keys():
+            before, after = self._files.get(path), files.get(path)
+            if (before and before[2]) != (after and after[2]):
+                partition, kind, _ = after or before
+                changed[(partition, kind)].append(path)
+        self._files = files
+
+        for (partition, kind), paths in changed.items():
+            if ingest:
+                try:
+                    self.ingest(partition, kind, paths)
+                except Exception:
+                    # A file caught mid-write or failing validation is retried on its next change
+                    logger.exception("Could not ingest %s", ', '.join(paths))
+
+        versions = defaultdict(dict)
+        for path, (partition, kind, state) in files.items():
+            versions[partition.key][kind] = zlib.crc32(repr((path, state)).encode(), versions[partition.key].get(kind, 0))
+        with self._lock:
+            self.versions = dict(versions)
+        return list(changed)
+
+    def ingest(self, partition, kind, paths):
+        if kind == 'matches':
+            store.load_matches(partition)
+        else:
+            for path in paths:
+                if not os.path.exists(path):
+                    store.stats_cache.invalidate(path)
+                    continue
+                store.prepare_table(path)
+                if path in store.stats_cache:
+                    store.load_stats_table(path)
+        for hook in _hooks[kind]:
+            hook(partition)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception:
+                # e.g. a partition directory removed while it was listed; the next poll starts over
+                logger.exception("Polling the data files failed")
+
+    def get_versions(self, partition):
+        with self._lock:
+            return self.versions.get(partition.key, {})
+
+
+_watcher = None
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+
+def start():
+    """Starts the watcher thread of this process, once; a forked worker starts its own."""
+    global _watcher, _watcher_pid
+    with _watcher_lock:
+        if _watcher_pid != os.getpid():
+            _watcher = Watcher(settings.WATCH_INTERVAL)
+            _watcher.poll(ingest=False)
+            threading.Thread(target=_watcher.run, name="watcher", daemon=True).start()
+            _watcher_pid = os.getpid()
+    return _watcher
+
+
+def snapshot():
+    """Version tokens of every partition as of the last poll, or None when the watcher is not running in this process."""
+    with _watcher_lock:
+        running = _watcher if _watcher_pid == os.getpid() else None
+    if running is None:
+        return None
+    with running._lock:
+        return running.versions
+
+
+def versions(partition=None):
+    """Version tokens of a partition's matches and Stats files, as of the last completed poll.
+
+    Empty when the watcher was not started in this process (see `start`).
+    """
+    tokens = snapshot()
+    if tokens is None:
+        return {}
+    return tokens.get(catalog.parse(partition).key, {})
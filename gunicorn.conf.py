@@ -0,0 +1,46 @@
+"""Gunicorn settings for serving the dashboard: ``gunicorn -c gunicorn.conf.py wsgi:server``.
+
+The app and its data are loaded once in the master (`preload_app`), then the
+workers are forked from it. Two things keep the shared pages shared:
+
+* the cached tables are memory-mapped Arrow files (see `wsgi.py`), so their
+  buffers live in the page cache rather than in each worker's heap;
+* `gc.freeze()` before forking moves every object loaded so far into the
+  permanent generation, so the workers' garbage collections never write to
+  (and thereby copy) the pages holding them.
+"""
+import gc
+import multiprocessing
+import os
+
+
+bind = os.environ.get("LALIGA_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("LALIGA_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("LALIGA_THREADS", 2))
+worker_class = "gthread"
+timeout = 120
+preload_app = True
+
+# Recycle workers now and then so any slow growth of private memory is bounded
+max_requests = int(os.environ.get("LALIGA_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Collect once, then freeze what is left; nothing allocated so far is scanned again
+    gc.collect()
+    gc.freeze()
+    server.log.info("Froze %d objects before forking workers", gc.get_freeze_count())
+
+
+def pre_fork(server, worker):
+    # Objects created by the master since the last fork (e.g. by restarts) are frozen too
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Threads do not survive the fork, so every worker watches the data files itself
+    from core import settings
+    if settings.WATCH:
+        from core import watcher
+        watcher.start()
@@ -1,15 +1,39 @@
+from core import http, settings, startup
+
+# Installed before the heavy imports below so the startup report can account for them
+if settings.STARTUP_REPORT:
+    startup.import_timer.install()
+
 from dash import Dash, html
 import dash
 import dash_bootstrap_components as dbc
 
 # Initialize the app and tell it to use pages.
 # This file is the main "shell" and is NOT a page itself.
-app = Dash(__name__, use_pages=True, pages_folder='apps', external_stylesheets=[dbc.themes.BOOTSTRAP])
+# Page modules only register themselves here; their data and figures are built on
+# first visit or by the warm-up below.
+with startup.timed("Dash app and page registration"):
+    app = Dash(__name__, use_pages=True, pages_folder='apps', external_stylesheets=[dbc.themes.BOOTSTRAP],
+               compress=settings.COMPRESS)
+
+# ETags and cache headers for page shells and deterministic callbacks
+http.install(app)
+
+# Opt-in per-callback timing, served on /metrics and /metrics/prometheus
+if settings.METRICS:
+    from core import metrics
+    metrics.install(app)
 
 # The layout for the entire app. It must include dash.page_container.
 app.layout = html.Div([
     dash.page_container
 ])
 
+startup.run_warmup(settings.WARMUP, print_report=settings.STARTUP_REPORT)
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Ingest changed data files while the app runs (see core/watcher.py)
+    if settings.WATCH:
+        from core import watcher
+        watcher.start()
+    app.run(debug=True)
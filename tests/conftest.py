@@ -0,0 +1,67 @@
+import os
+import re
+
+# Page modules are imported by the Dash app some tests build; keep them from warming up
+# or writing figures next to the real datasets
+os.environ.setdefault("LALIGA_WARMUP", "off")
+os.environ.setdefault("LALIGA_FIGURE_CACHE", "off")
+
+import pandas as pd
+import pytest
+
+from core import catalog, settings
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MATCHES_FILE = os.path.join(ROOT, "datasets", "laliga", "2023-24", "matches", "preprocessed_laliga2324_matches.csv")
+
+
+@pytest.fixture(scope="session")
+def match_lines():
+    """Header and match lines of the bundled LaLiga 2023-24 file."""
+    with open(MATCHES_FILE, 'rb') as f:
+        return f.read().splitlines(keepends=True)
+
+
+@pytest.fixture(scope="session")
+def bundled_matches():
+    """The bundled LaLiga 2023-24 matches, as read from the CSV."""
+    return pd.read_csv(MATCHES_FILE, index_col=0)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty data and cache directory for the test."""
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "data"
+
+
+class MatchesFile:
+    """A partition's matches file, rewritten with explicit, strictly increasing mtimes."""
+
+    def __init__(self, partition):
+        self.partition = partition
+        self.path = os.path.join(partition.path, "matches", "matches.csv")
+        self._mtime_ns = 1_700_000_000 * 10**9
+        os.makedirs(os.path.dirname(self.path))
+
+    def _touch(self):
+        self._mtime_ns += 10**9
+        os.utime(self.path, ns=(self._mtime_ns, self._mtime_ns))
+
+    def write(self, lines):
+        with open(self.path, 'wb') as f:
+            f.writelines(lines)
+        self._touch()
+
+    def append(self, lines):
+        with open(self.path, 'ab') as f:
+            f.writelines(lines)
+        self._touch()
+
+
+@pytest.fixture
+def matches_file(data_dir, request):
+    """A matches file in a partition of its own, so per-partition caches never carry over between tests."""
+    return MatchesFile(catalog.Partition("testliga", re.sub(r"\W", "_", request.node.name)))
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+
+from core.cache import TableCache
+
+
+def table(rows):
+    return pd.DataFrame({"value": range(rows)})
+
+
+def write(path, mtime_s):
+    path.write_text("value\n1\n")
+    os.utime(path, (mtime_s, mtime_s))
+    return str(path)
+
+
+def test_hit_until_the_file_changes(tmp_path):
+    loads = []
+    cache = TableCache(lambda path: loads.append(path) or table(10), max_bytes=10**6)
+    path = write(tmp_path / "a.csv", 1_000)
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+    write(tmp_path / "a.csv", 2_000)
+    assert cache.get(path) is not first
+
+    assert loads == [path, path]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    nbytes = int(table(100).memory_usage(deep=True).sum())
+    cache = TableCache(lambda path: table(100), max_bytes=2 * nbytes)
+    a, b, c = (write(tmp_path / f"{name}.csv", 1_000) for name in "abc")
+
+    cache.get(a)
+    cache.get(b)
+    cache.get(a)
+    cache.get(c)
+
+    assert a in cache and c in cache and b not in cache
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 2 * nbytes
+
+
+def test_table_over_budget_is_not_cached(tmp_path):
+    cache = TableCache(lambda path: table(1_000), max_bytes=100)
+    path = write(tmp_path / "a.csv", 1_000)
+
+    assert len(cache.get(path)) == 1_000
+    assert path not in cache and cache.stats()['bytes'] == 0
+
+
+def test_invalidate(tmp_path):
+    cache = TableCache(lambda path: table(10), max_bytes=10**6)
+    a, b = (write(tmp_path / f"{name}.csv", 1_000) for name in "ab")
+    cache.get(a)
+    cache.get(b)
+
+    cache.invalidate(a)
+    assert a not in cache and b in cache
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
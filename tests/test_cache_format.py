@@ -0,0 +1,57 @@
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from core import settings, store
+
+
+@pytest.fixture(params=["parquet", "arrow"])
+def cache_format(request, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_FORMAT", request.param)
+    return request.param
+
+
+def cache_files(cache_format):
+    return glob.glob(os.path.join(settings.CACHE_DIR, f"*.{cache_format}"))
+
+
+def test_cached_copy_equals_the_parsed_csv(matches_file, match_lines, cache_format):
+    matches_file.write(match_lines)
+    parsed = store.read_table(matches_file.path, index_col=0)
+    [cache_file] = cache_files(cache_format)
+
+    cached = store.read_table(matches_file.path, index_col=0)
+
+    pd.testing.assert_frame_equal(cached, parsed, check_dtype=False, check_categorical=False)
+    assert cached['home_team'].dtype == 'category'
+    assert cached['home_team_shots'].dtype == parsed['home_team_shots'].dtype
+    assert cache_files(cache_format) == [cache_file]
+
+
+def test_new_version_replaces_the_old_cache_file(matches_file, match_lines, cache_format):
+    matches_file.write(match_lines[:11])
+    store.read_table(matches_file.path, index_col=0)
+    [old] = cache_files(cache_format)
+
+    matches_file.write(match_lines[:21])
+    assert len(store.read_table(matches_file.path, index_col=0)) == 20
+
+    [new] = cache_files(cache_format)
+    assert new != old and not os.path.exists(old)
+
+
+def test_arrow_cache_is_memory_mapped(matches_file, match_lines, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_FORMAT", "arrow")
+    matches_file.write(match_lines)
+    store.read_table(matches_file.path, index_col=0)
+
+    [cache_file] = cache_files("arrow")
+    allocated = pa.total_allocated_bytes()
+    cached = store.read_cache(cache_file)
+
+    # Column buffers point into the mapped file instead of being read into Arrow's memory pool
+    assert pa.total_allocated_bytes() - allocated < os.path.getsize(cache_file) / 10
+    assert len(cached) == len(match_lines) - 1
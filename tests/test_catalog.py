@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from core import catalog, settings
+
+
+@pytest.fixture
+def data(data_dir):
+    for folder in ["laliga/2023-24/matches", "laliga/2022-23/stats", "serie-a/2023-24/matches",
+                   "laliga/2021-22/events", ".cache/figures/x/matches"]:
+        os.makedirs(data_dir / folder)
+    (data_dir / "laliga/2023-24/matches/b.csv").write_text("")
+    (data_dir / "laliga/2023-24/matches/a.csv").write_text("")
+    return data_dir
+
+
+def test_parse(monkeypatch):
+    monkeypatch.setattr(settings, "DEFAULT_PARTITION", "laliga/2023-24")
+    partition = catalog.Partition("premier-league", "2022-23")
+
+    assert catalog.parse("premier-league/2022-23") == partition
+    assert catalog.parse(partition) is partition
+    assert catalog.parse(None) == catalog.Partition("laliga", "2023-24")
+    assert partition.key == "premier-league/2022-23"
+    assert partition.label == "Premier League 2022/23"
+    assert catalog.Partition("eredivisie", "2023-24").label == "Eredivisie 2023/24"
+
+
+def test_discover_lists_partitions_with_matches_or_stats(data):
+    assert catalog.discover() == [
+        catalog.Partition("laliga", "2022-23"),
+        catalog.Partition("laliga", "2023-24"),
+        catalog.Partition("serie-a", "2023-24"),
+    ]
+
+
+def test_prune(data):
+    assert catalog.prune(league="laliga") == [catalog.Partition("laliga", "2022-23"), catalog.Partition("laliga", "2023-24")]
+    assert catalog.prune(seasons={"2023-24"}) == [catalog.Partition("laliga", "2023-24"), catalog.Partition("serie-a", "2023-24")]
+    assert catalog.prune(league="serie-a", seasons={"2022-23"}) == []
+
+
+def test_matches_path(data):
+    assert catalog.matches_path("laliga/2023-24") == str(data / "laliga/2023-24/matches/a.csv")
+    with pytest.raises(FileNotFoundError, match="serie-a/2023-24"):
+        catalog.matches_path("serie-a/2023-24")
+
+
+def test_dropdown_options(data):
+    assert catalog.dropdown_options()[-1] == {'label': "Serie A 2023/24", 'value': "serie-a/2023-24"}
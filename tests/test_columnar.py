@@ -0,0 +1,46 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import columnar
+
+
+def decode(encoded):
+    """What assets/clientside.js reads back: the typed array, or the category of every row."""
+    values = np.frombuffer(base64.b64decode(encoded['data']), dtype=np.dtype(encoded['dtype']).newbyteorder('<'))
+    if 'categories' in encoded:
+        return [encoded['categories'][code] for code in values]
+    return values
+
+
+@pytest.mark.parametrize("values, dtype", [
+    ([1, 38, 20], "int8"),
+    ([0, 300], "int16"),
+    ([-5, 100_000], "int32"),
+    ([1.5, np.nan], "float64"),
+])
+def test_numeric_columns_round_trip_narrowed(values, dtype):
+    encoded = columnar.encode_column(pd.Series(values))
+
+    assert encoded['dtype'] == dtype
+    np.testing.assert_array_equal(decode(encoded), np.asarray(values, dtype=float))
+
+
+def test_text_is_dictionary_encoded_in_order_of_appearance():
+    series = pd.Series(["Girona", "Betis", "Girona", "Sevilla"], dtype="category")
+    encoded = columnar.encode_column(series)
+
+    assert encoded['dtype'] == "uint8"
+    assert encoded['categories'] == ["Girona", "Betis", "Sevilla"]
+    assert decode(encoded) == list(series)
+
+
+def test_encode_frame(bundled_matches):
+    encoded = columnar.encode_frame(bundled_matches, ['round', 'home_team', 'home_team_shots'])
+
+    assert encoded['length'] == len(bundled_matches)
+    assert set(encoded['columns']) == {'round', 'home_team', 'home_team_shots'}
+    assert decode(encoded['columns']['home_team']) == list(bundled_matches['home_team'])
+    np.testing.assert_array_equal(decode(encoded['columns']['round']), bundled_matches['round'].to_numpy())
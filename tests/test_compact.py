@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import compact
+
+
+@pytest.mark.parametrize("values, dtype", [
+    ([0, 1, 38], np.int8),
+    ([0, 40_000], np.int32),
+    ([-200, 30_000], np.int16),
+    ([0, 2**40], np.int64),
+    ([21.0, 3.0, 0.0], np.int8),
+    ([21.0, np.nan, 3.0], np.float32),
+    ([0.33, 1.5], np.float64),
+    ([float(2**25), np.nan], np.float64),
+])
+def test_numeric_columns_get_the_narrowest_exact_dtype(values, dtype):
+    series = pd.Series(values)
+    compacted = compact.compact_column(series)
+
+    assert compacted.dtype == dtype
+    np.testing.assert_array_equal(compacted.to_numpy(dtype=float), series.to_numpy(dtype=float))
+
+
+def test_text_columns_follow_the_schema_type():
+    names = pd.Series(["Pedri", "Pedri", "Gavi", "Pedri"])
+
+    assert compact.compact_column(names, 'text') is names
+    assert isinstance(compact.compact_column(names, 'categorical').dtype, pd.CategoricalDtype)
+    # Outside the schema, repeated text becomes categorical and unique text is left alone
+    assert isinstance(compact.compact_column(names).dtype, pd.CategoricalDtype)
+    unique = pd.Series(["a", "b", "c"])
+    assert compact.compact_column(unique) is unique
+
+
+def test_compacting_twice_copies_nothing(bundled_matches):
+    compacted = compact.compact_frame(bundled_matches)
+
+    assert compact.compact_frame(compacted) is compacted
+    assert compacted['home_team'].dtype == 'category'
+    assert compacted['round'].dtype == np.int8
+    pd.testing.assert_frame_equal(compacted, bundled_matches, check_dtype=False, check_categorical=False)
+
+
+def test_memory_report_totals(bundled_matches):
+    report = compact.memory_report(bundled_matches)
+    total = report.iloc[-1]
+
+    assert total['column'] == 'Total'
+    assert total['bytes_before'] == bundled_matches.memory_usage(deep=True, index=False).sum()
+    assert total['bytes_after'] < total['bytes_before']
+    assert set(report['column'][:-1]) == set(bundled_matches.columns)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import correlation
+
+
+@pytest.fixture
+def matches():
+    rng = np.random.default_rng(11)
+    n = 120
+    x = rng.normal(size=n)
+    df = pd.DataFrame({
+        'round': rng.integers(1, 5, n),
+        'home_team': rng.choice(['Alaves', 'Betis', 'Cadiz'], n),
+        'away_team': rng.choice(['Getafe', 'Girona'], n),
+        'x': x,
+        'y': 2 * x + rng.normal(size=n),
+        'z': rng.normal(size=n),
+    })
+    df.loc[::9, 'x'] = np.nan
+    df.loc[5, 'z'] = np.nan
+    df.loc[::17, 'y'] = np.nan
+    return df
+
+
+COLUMNS = ['x', 'y', 'z']
+
+
+def test_pearson_matches_dataframe_corr_with_missing_values(matches):
+    engine = correlation.CorrelationEngine.from_frame(matches, COLUMNS)
+    pd.testing.assert_frame_equal(engine.pearson(), matches[COLUMNS].corr())
+
+
+def test_filtered_pearson_matches_dataframe_corr(matches):
+    engine = correlation.CorrelationEngine.from_frame(matches, COLUMNS)
+    rows = matches['round'].between(2, 3) & ((matches['home_team'] == 'Betis') | (matches['away_team'] == 'Betis'))
+    pd.testing.assert_frame_equal(engine.pearson(team='Betis', rounds=(2, 3)), matches.loc[rows, COLUMNS].corr())
+
+
+def test_rows_added_one_at_a_time_match_a_frame(matches):
+    engine = correlation.CorrelationEngine.from_frame(matches.iloc[:60], COLUMNS)
+    for _, row in matches.iloc[60:].iterrows():
+        engine.add_row(row)
+    pd.testing.assert_frame_equal(engine.pearson(), matches[COLUMNS].corr())
+
+
+def test_ols_coefficients_use_each_pairs_rows(matches):
+    stats = correlation.CorrelationEngine.from_frame(matches, COLUMNS).pairwise_stats()
+    pair = matches[['x', 'y']].dropna()
+    slope, intercept = np.polyfit(pair['x'], pair['y'], 1)
+    assert stats.ols('x', 'y') == pytest.approx((slope, intercept, pair.corr().at['x', 'y'] ** 2))
@@ -0,0 +1,71 @@
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import cube, store
+
+
+@pytest.fixture
+def matches():
+    rng = np.random.default_rng(7)
+    teams = ['Alaves', 'Betis', 'Cadiz', 'Getafe']
+    n = 60
+    home = rng.integers(0, len(teams), n)
+    away = (home + rng.integers(1, len(teams), n)) % len(teams)
+    df = pd.DataFrame({
+        'round': rng.integers(1, 6, n),
+        'day_of_week': pd.Categorical(rng.choice(['Saturday', 'Sunday', 'Monday'], n), categories=store.DAY_ORDER),
+        'month_name': pd.Categorical(rng.choice(['Aug', 'Sep'], n), categories=['Aug', 'Sep']),
+        'home_team': np.array(teams)[home],
+        'away_team': np.array(teams)[away],
+        'shots': rng.integers(0, 25, n).astype(float),
+        'corners': rng.normal(5, 2, n),
+    })
+    df.loc[rng.random(n) < 0.2, 'corners'] = np.nan
+    return df
+
+
+def expected_trend(df, metric, by, level=0.95):
+    grouped = df.groupby(by, observed=True, sort=True)[metric]
+    expected = grouped.agg(['count', 'mean', 'var', 'std', 'min', 'max']).rename(columns={'var': 'variance'})
+    margin = statistics.NormalDist().inv_cdf((1 + level) / 2) * expected['std'] / np.sqrt(expected['count'])
+    expected['ci_low'] = expected['mean'] - margin
+    expected['ci_high'] = expected['mean'] + margin
+    expected = expected[expected['count'] > 0].reset_index()
+    expected[by] = expected[by].astype(object)
+    expected['count'] = expected['count'].astype(float)
+    return expected
+
+
+def actual_trend(trend_cube, *args, **kwargs):
+    trend = trend_cube.trend(*args, **kwargs)
+    return trend.astype({trend.columns[0]: object})
+
+
+@pytest.mark.parametrize('by', cube.TREND_DIMENSIONS)
+@pytest.mark.parametrize('metric', ['shots', 'corners'])
+def test_trend_matches_groupby(matches, metric, by):
+    trend_cube = cube.TrendCube.from_frame(matches, ['shots', 'corners'])
+    pd.testing.assert_frame_equal(actual_trend(trend_cube, metric, by), expected_trend(matches, metric, by))
+
+
+@pytest.mark.parametrize('venue', cube.VENUES)
+def test_team_trend_matches_groupby(matches, venue):
+    trend_cube = cube.TrendCube.from_frame(matches, ['shots', 'corners'])
+    at_home, away = matches['home_team'] == 'Betis', matches['away_team'] == 'Betis'
+    rows = {'either': at_home | away, 'home': at_home, 'away': away}[venue]
+    pd.testing.assert_frame_equal(
+        actual_trend(trend_cube, 'corners', 'round', team='Betis', venue=venue),
+        expected_trend(matches[rows], 'corners', 'round'),
+    )
+
+
+def test_added_rows_match_a_cube_built_at_once(matches):
+    metrics = ['shots', 'corners']
+    trend_cube = cube.TrendCube.from_frame(matches.iloc[:25], metrics)
+    trend_cube.add_frame(matches.iloc[25:])
+    whole = cube.TrendCube.from_frame(matches, metrics)
+    for by in cube.TREND_DIMENSIONS:
+        pd.testing.assert_frame_equal(trend_cube.trend('corners', by), whole.trend('corners', by))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from core import downsample
+
+
+def test_histogram_counts_every_finite_value():
+    rng = np.random.default_rng(1)
+    values = np.append(rng.normal(size=10_000), [np.nan, np.inf])
+
+    edges, counts = downsample.histogram(values, nbins=40)
+
+    assert len(edges) == 41 and counts.sum() == 10_000
+    assert edges[0] == values[np.isfinite(values)].min()
+
+
+def test_histogram_of_small_integers_has_one_bin_per_value():
+    edges, counts = downsample.histogram([0, 1, 1, 3, 3, 3], nbins=40)
+
+    np.testing.assert_array_equal(edges, [-0.5, 0.5, 1.5, 2.5, 3.5])
+    np.testing.assert_array_equal(counts, [1, 2, 0, 3])
+
+
+def test_histogram_of_a_constant_or_empty_column():
+    assert downsample.histogram([2.5, 2.5], nbins=10)[1].sum() == 2
+    edges, counts = downsample.histogram([np.nan], nbins=10)
+    assert list(counts) == [0] and len(edges) == 2
+
+
+def test_box_stats_match_pandas_quartiles():
+    rng = np.random.default_rng(2)
+    values = np.append(rng.normal(size=1_000), 50.0)
+    groups = np.append(rng.choice(["H", "D", "A"], 1_000), "H")
+
+    stats = downsample.box_stats(values, groups).set_index("group")
+
+    frame = pd.DataFrame({"group": groups, "value": values})
+    quartiles = frame.groupby("group")["value"].quantile([0.25, 0.5, 0.75]).unstack()
+    np.testing.assert_allclose(stats[["q1", "median", "q3"]].to_numpy(), quartiles.to_numpy())
+    assert stats.loc["H", "upperfence"] < 50.0
+    assert stats["count"].sum() == 1_001
+    assert (stats["lowerfence"] >= stats["q1"] - 1.5 * (stats["q3"] - stats["q1"])).all()
+
+
+def test_density_grid_keeps_every_point():
+    rng = np.random.default_rng(3)
+    x, y = rng.normal(size=(2, 5_000))
+    x[0] = np.nan
+
+    xc, yc, counts = downsample.density_grid(x, y, size=20)
+
+    assert counts.shape == (20, 20) and len(xc) == len(yc) == 20
+    assert np.nansum(counts) == 4_999
+    assert not (counts == 0).any()
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+
+import plotly.graph_objects as go
+import pytest
+
+from core import figcache
+
+
+FIGURE = json.dumps({"data": [{"type": "bar", "y": [1, 2, 3]}], "layout": {}})
+
+
+@pytest.fixture(params=["memory", "disk"])
+def backend(request, tmp_path):
+    return figcache.make_backend(request.param, str(tmp_path / "figures"), max_bytes=10 * len(FIGURE))
+
+
+def test_backend_round_trip_and_counters(backend):
+    assert backend.get("a") is None
+    backend.set("a", FIGURE)
+
+    assert backend.get("a") == json.loads(FIGURE)
+    assert (backend.hits, backend.misses) == (1, 1)
+    assert backend.size() == (1, len(FIGURE))
+
+
+def test_backend_stays_under_its_budget(backend):
+    for key in range(15):
+        backend.set(str(key), FIGURE)
+        if isinstance(backend, figcache.DiskBackend):
+            # Distinct mtimes, so the oldest files are trimmed first
+            path = backend._path(str(key))
+            os.utime(path, ns=(key * 10**9, key * 10**9))
+
+    entries, nbytes = backend.size()
+    assert nbytes <= backend.max_bytes and entries == 10
+    assert backend.get("14") is not None
+    assert backend.get("0") is None
+
+
+def test_oversized_figure_is_not_stored(backend):
+    backend.set("big", FIGURE * 11)
+    assert backend.get("big") is None
+    assert backend.size() == (0, 0)
+
+
+def test_disk_backend_tolerates_a_removed_file(tmp_path):
+    backend = figcache.DiskBackend(str(tmp_path), max_bytes=10 * len(FIGURE))
+    backend.set("a", FIGURE)
+    backend.set("b", FIGURE)
+    os.remove(backend._path("a"))
+
+    assert backend.get("a") is None
+    assert backend.size() == (1, len(FIGURE))
+    backend.set("c", FIGURE)
+    backend.clear()
+    assert backend.size() == (0, 0)
+
+
+def test_disk_backend_ignores_a_partial_file(tmp_path):
+    backend = figcache.DiskBackend(str(tmp_path), max_bytes=10 * len(FIGURE))
+    with open(backend._path("a"), "w", encoding="utf-8") as f:
+        f.write(FIGURE[:10])
+
+    assert backend.get("a") is None
+
+
+def test_cached_builds_each_figure_once_per_version(backend):
+    # Room for full figures, template included
+    backend.max_bytes = 10**7
+    version = {"value": 1}
+    cache = figcache.FigureCache(backend, version=lambda *args: version["value"])
+    calls = []
+
+    @cache.cached("bars")
+    def bars(n):
+        calls.append(n)
+        return go.Figure(go.Bar(y=list(range(n))))
+
+    first = bars(3)
+    assert bars(3) == first
+    bars(4)
+    version["value"] = 2
+    bars(3)
+
+    assert calls == [3, 4, 3]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_counters_are_exact_under_concurrent_lookups(backend):
+    backend.set("a", FIGURE)
+    threads = [threading.Thread(target=lambda: [backend.get(k) for k in ("a", "b") * 200]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (backend.hits, backend.misses) == (1600, 1600)
+
+
+def test_cache_off_always_builds():
+    cache = figcache.FigureCache(figcache.make_backend("off", None, 0))
+
+    @cache.cached("bars")
+    def bars(n):
+        return go.Figure(go.Bar(y=list(range(n))))
+
+    assert bars(2)["data"][0]["type"] == "bar"
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from benchmarks import generate
+from core import schema
+
+
+def read(path):
+    return pd.read_csv(path, index_col=0)
+
+
+def test_generated_matches_follow_the_schema(tmp_path, bundled_matches):
+    path = tmp_path / "matches.csv"
+    generate.generate_matches(str(path), 1_000, bundled_matches, seed=3)
+    df = read(path)
+
+    schema.validate_matches(df)
+    assert list(df.columns) == list(bundled_matches.columns)
+    assert len(df) == 1_000 and list(df.index) == list(range(1_000))
+    assert df['round'].between(1, generate.ROUNDS).all() and df['round'].is_monotonic_increasing
+    assert (df['home_team'] != df['away_team']).all()
+    assert set(df['home_team']) <= set(bundled_matches['home_team'])
+    assert (df['home_team_shots_on_target'] <= df['home_team_shots']).all()
+    assert (df['half_time_away_team_goals'] <= df['full_time_away_team_goals']).all()
+    expected = generate._result(df['full_time_home_team_goals'], df['full_time_away_team_goals'])
+    assert (df['full_time_result'] == expected).all()
+
+
+def test_chunked_writes_equal_one_chunk(tmp_path, bundled_matches, monkeypatch):
+    generate.generate_matches(str(tmp_path / "whole.csv"), 500, bundled_matches, seed=1)
+    monkeypatch.setattr(generate, "CHUNK_ROWS", 500)
+    generate.generate_matches(str(tmp_path / "same.csv"), 500, bundled_matches, seed=1)
+    monkeypatch.setattr(generate, "CHUNK_ROWS", 120)
+    generate.generate_matches(str(tmp_path / "chunked.csv"), 500, bundled_matches, seed=1)
+
+    pd.testing.assert_frame_equal(read(tmp_path / "whole.csv"), read(tmp_path / "same.csv"))
+    chunked = read(tmp_path / "chunked.csv")
+    assert len(chunked) == 500 and list(chunked.index) == list(range(500))
+    assert chunked['round'].is_monotonic_increasing
+    schema.validate_matches(chunked)
+
+
+def test_stats_file_resamples_the_template(tmp_path):
+    template = pd.DataFrame({
+        'Rank': [1, 2], 'Player': ["A", "B"], 'Team': ["Girona", "Betis"], 'Goals': [10, 3],
+    })
+    path = tmp_path / "player_goals.csv"
+    generate.generate_stats_file(str(path), 50, template, seed=2)
+    df = pd.read_csv(path)
+
+    assert list(df.columns) == list(template.columns) and len(df) == 50
+    assert list(df['Rank']) == list(range(1, 51)) and df['Player'].is_unique
+    assert set(df['Goals']) <= {10, 3} and set(df['Team']) <= {"Girona", "Betis"}
@@ -0,0 +1,47 @@
+import dash
+from dash import Input, Output, html
+
+from core import http
+
+
+def make_app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Div("hello", id="source"), html.Div(id="target")])
+    app.callback(Output("target", "children"), Input("source", "children"))(str.upper)
+    http.install(app)
+    return app.server.test_client()
+
+
+def test_get_responses_are_revalidated_with_an_etag():
+    client = make_app()
+
+    first = client.get("/_dash-layout")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"].strip('"')
+    assert etag == http.content_etag(first)
+
+    repeat = client.get("/_dash-layout", headers={"If-None-Match": f'"{etag}"'})
+    assert repeat.status_code == 304 and repeat.data == b""
+    assert client.get("/_dash-layout", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_page_shell_gets_an_etag():
+    client = make_app()
+
+    response = client.get("/")
+    assert response.mimetype == "text/html" and "ETag" in response.headers
+
+
+def test_callback_responses_are_left_alone():
+    client = make_app()
+    client.get("/")
+
+    response = client.post("/_dash-update-component", json={
+        "output": "target.children",
+        "outputs": {"id": "target", "property": "children"},
+        "inputs": [{"id": "source", "property": "children", "value": "hello"}],
+        "changedPropIds": ["source.children"],
+    })
+    assert response.status_code == 200 and b"HELLO" in response.data
+    assert "ETag" not in response.headers and "Cache-Control" not in response.headers
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+from core import catalog, ingest, schema
+
+
+@pytest.fixture
+def partition(matches_file, match_lines):
+    """A partition with the first ten matches of the bundled season."""
+    matches_file.write(match_lines[:11])
+    os.makedirs(catalog.events_dir(matches_file.partition))
+    return matches_file.partition
+
+
+def write_events(partition, rows, name='feed.csv'):
+    events = pd.DataFrame(rows, columns=list(ingest.EVENT_DTYPES))
+    events.to_csv(os.path.join(catalog.events_dir(partition), name), index=False)
+
+
+def test_ingest_counts_events_per_match_and_side(partition):
+    fixtures = ingest.load_fixtures(partition)
+    home, away = fixtures.loc[3, 'home_team'], fixtures.loc[3, 'away_team']
+    write_events(partition, [
+        (3, home, 'shot', 10, 1),
+        (3, home, 'shot', 20, 0),
+        (3, away, 'shot', 30, 1),
+        (3, away, 'corner', 31, 0),
+        (3, home, 'yellow_card', 45, 0),
+        (3, home, 'pass', 46, 0),
+    ])
+    write_events(partition, [(3, away, 'red_card', 90, 0), (5, fixtures.loc[5, 'home_team'], 'foul', 1, 0)], 'more.csv')
+
+    metrics = ingest.ingest(partition, chunk_size=2)
+
+    assert list(metrics.index) == [3, 5]
+    assert metrics.loc[3, ['home_team_shots', 'home_team_shots_on_target', 'away_team_shots',
+                           'away_team_shots_on_target', 'away_team_corners', 'home_team_yellow_cards',
+                           'away_team_red_cards', 'home_team_fouls_committed']].tolist() == [2, 1, 1, 1, 1, 1, 1, 0]
+    assert metrics.loc[5, 'home_team_fouls_committed'] == 1 and metrics.loc[5, 'home_team_shots'] == 0
+    pd.testing.assert_frame_equal(pd.read_parquet(ingest.output_path(partition)), metrics)
+
+
+def test_merge_metrics_replaces_only_the_covered_matches(partition):
+    matches = pd.read_csv(catalog.matches_path(partition), index_col=0)
+    metrics = pd.DataFrame(0, index=pd.Index([3], name='match_id'), columns=ingest.METRIC_COLUMNS)
+    metrics.loc[3, 'home_team_shots'] = 42
+
+    merged = ingest.merge_metrics(matches, metrics)
+
+    assert merged.loc[3, 'home_team_shots'] == 42 and merged.loc[3, 'away_team_corners'] == 0
+    pd.testing.assert_frame_equal(merged.drop(index=3), matches.drop(index=3))
+    assert merged.dtypes.equals(matches.dtypes)
+
+
+@pytest.mark.parametrize('row, problem', [
+    ((3, None, 'shot', 70000, 0), "'minute' has values outside 0 to 130"),
+    ((3, None, 'shot', 10, 300), "'on_target' has values outside 0 to 1"),
+    ((3, None, 'shot', 10, 257), "'on_target' has values outside 0 to 1"),
+    ((3, None, 'shot', -1, 0), "'minute' has negative values"),
+    ((2**31 + 3, None, 'shot', 10, 0), "1 events refer to matches not in the matches file"),
+    ((3, None, 'dive', 10, 0), "'event' has unknown types: dive"),
+    ((3, 'Nobody FC', 'shot', 10, 0), "1 events credit a team that did not play the match"),
+])
+def test_invalid_events_are_rejected_before_narrowing(partition, row, problem):
+    match_id, team, event, minute, on_target = row
+    team = team or ingest.load_fixtures(partition).loc[3, 'home_team']
+    write_events(partition, [(match_id, team, event, minute, on_target)])
+    with pytest.raises(schema.SchemaError, match=problem):
+        ingest.ingest(partition)
+
+
+def test_values_that_are_not_integers_are_rejected(partition):
+    path = os.path.join(catalog.events_dir(partition), 'feed.csv')
+    with open(path, 'w') as f:
+        f.write("match_id,team,event,minute,on_target\n3,Girona,shot,ten,0\n")
+    with pytest.raises(schema.SchemaError, match="does not match the schema"):
+        ingest.ingest(partition)
+
+
+def test_validated_chunks_are_narrowed(partition):
+    write_events(partition, [(3, ingest.load_fixtures(partition).loc[3, 'home_team'], 'shot', 10, 1)])
+    path = os.path.join(catalog.events_dir(partition), 'feed.csv')
+    chunk, = ingest.read_events(path, ingest.load_fixtures(partition))
+    assert chunk.dtypes[list(ingest.EVENT_COMPACT_DTYPES)].astype(str).to_dict() == ingest.EVENT_COMPACT_DTYPES
@@ -0,0 +1,73 @@
+import dash
+import diskcache
+import pytest
+
+from core import jobs
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """A shared job manager whose jobs are fake ids that stay running until terminated."""
+    started, terminated = [], []
+
+    def call_job_fn(self, key, job_fn, args, context):
+        started.append(key)
+        return 1000 + len(started)
+
+    monkeypatch.setattr(dash.DiskcacheManager, "call_job_fn", call_job_fn)
+    monkeypatch.setattr(dash.DiskcacheManager, "terminate_job", lambda self, job: terminated.append(job))
+    monkeypatch.setattr(jobs.SharedJobManager, "job_running", lambda self, job: job not in terminated)
+    manager = jobs.SharedJobManager(diskcache.Cache(str(tmp_path)), expire=60)
+    return manager, started, terminated
+
+
+def test_requests_with_the_same_key_share_one_job(manager):
+    manager, started, _ = manager
+
+    first = manager.call_job_fn("key", None, (), {})
+    assert manager.call_job_fn("key", None, (), {}) == first
+    assert manager.call_job_fn("other", None, (), {}) != first
+
+    assert started == ["key", "other"]
+    assert manager.handle.get("key-waiters") == 2
+
+
+def test_job_is_cancelled_once_no_request_waits_for_it(manager):
+    manager, started, terminated = manager
+    job = manager.call_job_fn("key", None, (), {})
+    manager.call_job_fn("key", None, (), {})
+
+    manager.terminate_job(job)
+    assert terminated == []
+    manager.terminate_job(job)
+    assert terminated == [job]
+
+    # A new request after the cancellation starts a new job
+    assert manager.call_job_fn("key", None, (), {}) != job
+    assert len(started) == 2
+
+
+def test_stored_result_is_served_without_a_job(manager):
+    manager, started, terminated = manager
+    job = manager.call_job_fn("key", None, (), {})
+    manager.handle.set("key", "result")
+
+    assert manager.call_job_fn("key", None, (), {}) == 0
+    # Dash terminates finished jobs too; that is not a cancellation
+    manager.terminate_job(job)
+    assert terminated == [job] and manager.handle.get("key-job") == job
+    assert started == ["key"]
+
+
+def test_without_background_the_function_runs_inline(monkeypatch):
+    registered = []
+    monkeypatch.setattr(jobs.settings, "BACKGROUND", False)
+    monkeypatch.setattr(dash, "callback", lambda *args, **kwargs: registered.append(kwargs) or (lambda func: func))
+
+    @jobs.background_callback(dash.Output("out", "children"), dash.Input("in", "value"), running=[])
+    def compute(set_progress, value):
+        set_progress(["50%"])
+        return value * 2
+
+    assert compute(21) == 42
+    assert registered == [{"running": []}]
@@ -0,0 +1,92 @@
+import json
+import types
+
+import dash
+import pytest
+from dash import Input, Output, html
+from dash.exceptions import PreventUpdate
+
+from core import metrics, settings
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """A one-callback app registered through `metrics.callback`, with a fresh registry."""
+    monkeypatch.setattr(settings, "METRICS", True)
+    monkeypatch.setattr(metrics, "registry", metrics.Registry())
+    # Keep the test callback out of the callbacks the pages registered with dash.callback
+    monkeypatch.setattr(dash._callback, "GLOBAL_CALLBACK_MAP", {})
+    monkeypatch.setattr(dash._callback, "GLOBAL_CALLBACK_LIST", [])
+
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Div(id="source"), html.Div(id="target")])
+
+    @metrics.callback(Output("target", "children"), Input("source", "children"))
+    def echo(value):
+        if value == "prevent":
+            raise PreventUpdate
+        if value == "fail":
+            raise ValueError(value)
+        return value * 100
+
+    metrics.install(app)
+    app.server.config["PROPAGATE_EXCEPTIONS"] = False
+    return app
+
+
+def dispatch(app, value):
+    body = {
+        "output": "target.children",
+        "outputs": {"id": "target", "property": "children"},
+        "inputs": [{"id": "source", "property": "children", "value": value}],
+        "changedPropIds": ["source.children"],
+    }
+    client = app.server.test_client()
+    client.get("/")
+    return client.post("/_dash-update-component", data=json.dumps(body), content_type="application/json")
+
+
+def summary():
+    return {row["callback"]: row for row in metrics.registry.summary()}
+
+
+def test_dispatched_callback_is_recorded(app):
+    response = dispatch(app, "x")
+
+    assert response.status_code == 200
+    row = summary()["target.children"]
+    assert (row["calls"], row["errors"], row["prevented"]) == (1, 0, 0)
+    assert row["p50_ms"] >= row["pandas_ms"] >= 0
+    assert row["mean_kb"] > 0
+
+
+def test_prevented_and_failed_callbacks(app):
+    assert dispatch(app, "prevent").status_code == 204
+    assert dispatch(app, "fail").status_code == 500
+
+    row = summary()["target.children"]
+    assert (row["calls"], row["errors"], row["prevented"]) == (0, 1, 1)
+
+
+def test_prometheus_only_answers_local_requests(app, monkeypatch):
+    dispatch(app, "x")
+    client = app.server.test_client()
+
+    local = client.get("/metrics/prometheus")
+    assert local.status_code == 200
+    assert b'laliga_callback_duration_seconds_count{callback="target.children"} 1' in local.data
+
+    remote = {"REMOTE_ADDR": "10.0.0.1"}
+    assert client.get("/metrics/prometheus", environ_base=remote).status_code == 404
+    monkeypatch.setattr(settings, "METRICS_PUBLIC", True)
+    assert client.get("/metrics/prometheus", environ_base=remote).status_code == 200
+
+
+def test_timed_module_keeps_attributes():
+    module = types.SimpleNamespace(line=lambda data: data, Constants=dict, colors=("red",))
+    timed = metrics.TimedModule(module)
+
+    assert timed.line("data") == "data"
+    assert timed.line is timed.line
+    assert timed.Constants is dict and timed.colors == ("red",)
+    assert metrics._phase_clock()["plotly"] > 0
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from core import paging
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        'team': ['Girona', 'Real Madrid', 'Barcelona', 'Atletico Madrid', 'Athletic Club', 'Real Sociedad'],
+        'points': [81, 95, 85, 76, 68, 60],
+        'kickoff': pd.to_datetime(['2023-08-11', '2023-08-12', '2023-08-13', '2023-09-01', '2023-09-02', '2023-10-01'], utc=True),
+    })
+
+
+@pytest.mark.parametrize('part, expected', [
+    ('{points} ge 80', ('points', 'ge', 80.0)),
+    ('{points} >= 80', ('points', 'ge', 80.0)),
+    ('{points} < 70', ('points', 'lt', 70.0)),
+    ('{team} = "Real Madrid"', ('team', 'eq', 'Real Madrid')),
+    ("{team} ne 'It\\'s'", ('team', 'ne', "It's")),
+    ('{team} contains madrid', ('team', 'contains', 'madrid')),
+    ('{kickoff} datestartswith 2023-09', ('kickoff', 'datestartswith', '2023-09')),
+    ('points', (None, None, None)),
+])
+def test_split_filter_part(part, expected):
+    assert paging.split_filter_part(part) == expected
+
+
+@pytest.mark.parametrize('query, teams', [
+    ('{points} > 80', ['Girona', 'Real Madrid', 'Barcelona']),
+    ('{points} <= 68', ['Athletic Club', 'Real Sociedad']),
+    ('{team} contains MADRID && {points} != 95', ['Atletico Madrid']),
+    ('{kickoff} datestartswith 2023-09', ['Atletico Madrid', 'Athletic Club']),
+    ('{points} = many', []),
+    ('{unknown} = 1', ['Girona', 'Real Madrid', 'Barcelona', 'Atletico Madrid', 'Athletic Club', 'Real Sociedad']),
+])
+def test_filter_frame(table, query, teams):
+    assert list(paging.filter_frame(table, query)['team']) == teams
+
+
+def test_sort_frame_is_stable_and_skips_unknown_columns(table):
+    table = table.assign(group=[1, 2, 1, 2, 1, 2])
+    sort_by = [{'column_id': 'group', 'direction': 'desc'}, {'column_id': 'missing', 'direction': 'asc'}]
+    assert list(paging.sort_frame(table, sort_by)['team']) == [
+        'Real Madrid', 'Atletico Madrid', 'Real Sociedad', 'Girona', 'Barcelona', 'Athletic Club']
+    assert paging.sort_frame(table, [{'column_id': 'missing', 'direction': 'asc'}]) is table
+
+
+def test_query_page_sorts_filters_and_slices(table):
+    sort_by = [{'column_id': 'points', 'direction': 'desc'}]
+    records, page_count, page_current = paging.query_page(table, 1, 2, sort_by, '{points} > 65')
+    assert [r['team'] for r in records] == ['Girona', 'Atletico Madrid']
+    assert (page_count, page_current) == (3, 1)
+    assert records[0]['kickoff'] == '2023-08-11 00:00:00+00:00'
+
+
+@pytest.mark.parametrize('requested, shown', [(None, 0), (0, 0), (1, 1), (7, 1)])
+def test_query_page_clamps_to_the_last_page(table, requested, shown):
+    records, page_count, page_current = paging.query_page(table, requested, 2, None, '{points} > 70')
+    assert (page_count, page_current) == (2, shown)
+    assert len(records) == 2
+
+
+def test_query_page_of_an_empty_result(table):
+    assert paging.query_page(table, 3, 2, None, '{points} > 100') == ([], 1, 0)
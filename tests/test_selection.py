@@ -0,0 +1,82 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from core import selection, store
+
+
+@pytest.fixture(scope="module")
+def visualization():
+    """The Visualization page, registered on the app like in production."""
+    importlib.import_module("start")
+    return importlib.import_module("apps.visualization")
+
+
+@pytest.fixture
+def matches(matches_file, match_lines):
+    matches_file.write(match_lines)
+    return matches_file.partition, store.load_matches(matches_file.partition)
+
+
+def selection_data(partition, bitmap, category=None, category_bitmap=None):
+    """The selection store's data, as `update_selection` writes it."""
+    return {
+        'partition': partition.key,
+        'version': store.matches_version(partition),
+        'category': category,
+        'mask': selection.to_base64(bitmap),
+        'category_mask': selection.to_base64(bitmap if category_bitmap is None else category_bitmap),
+    }
+
+
+def test_select_matches_pandas_filters(matches):
+    _, df = matches
+    index = selection.SelectionIndex(df)
+    team = df['home_team'].iloc[0]
+    points = np.zeros(len(df), dtype=bool)
+    points[::3] = True
+
+    bitmap = index.select(team, [5, 12], ('full_time_result', 'H'), selection.pack(points))
+
+    expected = (
+        ((df['home_team'] == team) | (df['away_team'] == team))
+        & df['round'].between(5, 12)
+        & (df['full_time_result'] == 'H')
+        & points
+    )
+    np.testing.assert_array_equal(index.mask(bitmap), expected.to_numpy())
+    assert index.count(bitmap) == expected.sum()
+
+
+def test_select_without_filters_is_none(matches):
+    _, df = matches
+    index = selection.SelectionIndex(df)
+
+    assert index.select() is None
+    assert index.select(rounds=[int(df['round'].min()), int(df['round'].max())]) is None
+
+
+def test_pie_has_no_empty_slices(matches, visualization):
+    partition, df = matches
+    index = selection.load_index(partition)
+    bitmap = index.round_range(1, 1)
+
+    figure = visualization.update_pie_chart('home_team', selection_data(partition, bitmap), partition.key)
+
+    labels = figure['data'][0]['labels']
+    assert sorted(labels) == sorted(df.loc[df['round'] == 1, 'home_team'].astype(str))
+
+
+def test_pie_pulls_the_clicked_slice(matches, visualization):
+    partition, df = matches
+    index = selection.load_index(partition)
+    team = df['home_team'].iloc[0]
+    category = ('home_team', team)
+    data = selection_data(partition, index.select(category=category), list(category), index.full)
+
+    figure = visualization.update_pie_chart('home_team', data, partition.key)
+
+    trace = figure['data'][0]
+    assert len(trace['labels']) == df['home_team'].nunique()
+    assert [label for label, pull in zip(trace['labels'], trace['pull']) if pull] == [team]
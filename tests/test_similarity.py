@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import similarity, watcher
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(5)
+    n = 40
+    players = pd.DataFrame({
+        'partition': np.where(np.arange(n) < 25, 'laliga/2023-24', 'laliga/2022-23'),
+        'Player': [f"Player {i}" for i in range(n)],
+        'Team': rng.choice(['Betis', 'Girona'], n),
+        'Country': 'ESP',
+        'Minutes': rng.integers(100, 3000, n),
+    })
+    values = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f"m{i}" for i in range(6)])
+    values.iloc[::5, 2] = np.nan
+    return similarity.SimilarityIndex(players, values, min_minutes=500)
+
+
+def brute_force(index, row, candidates):
+    """Cosine similarities of `row` to every candidate, best first, one pair at a time."""
+    scores = []
+    for other in range(len(index)):
+        if other != row and candidates[other]:
+            a, b = index.zscores[row], index.zscores[other]
+            scores.append((float(a @ b / np.linalg.norm(a) / np.linalg.norm(b)), other))
+    return sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize('partitions, min_minutes', [(None, None), (['laliga/2022-23'], None), (None, 2000)])
+def test_most_similar_matches_brute_force(index, partitions, min_minutes):
+    candidates = index.candidates(partitions, min_minutes)
+    positions, scores = index.most_similar([0, 3], k=5, candidates=candidates)
+    for row, found, found_scores in zip([0, 3], positions, scores):
+        expected = brute_force(index, row, candidates)[:5]
+        assert list(found[:len(expected)]) == [other for _, other in expected]
+        np.testing.assert_allclose(found_scores[:len(expected)], [score for score, _ in expected], rtol=1e-5)
+
+
+def test_fewer_candidates_than_k_are_padded(index):
+    candidates = np.zeros(len(index), dtype=bool)
+    candidates[[1, 2]] = True
+    positions, scores = index.most_similar([0], k=4, candidates=candidates)
+    assert sorted(positions[0][:2]) == [1, 2]
+    assert list(positions[0][2:]) == [-1, -1] and np.isneginf(scores[0][2:]).all()
+
+
+def test_neighbours_of_a_key(index):
+    key = index.keys[0]
+    neighbours = index.neighbours(key, k=3)
+    assert len(neighbours) == 3 and key not in set(neighbours['Player'])
+    assert neighbours['similarity'].is_monotonic_decreasing
+    assert index.neighbours('nobody|x|y').empty
+
+
+def test_stats_version_stats_the_files_at_most_once_per_interval(data_dir, monkeypatch):
+    stats_dir = data_dir / 'testliga' / '2023-24' / 'stats'
+    stats_dir.mkdir(parents=True)
+    path = stats_dir / 'player_goals.csv'
+    path.write_text("Rank,Player,Team,Goals,Minutes,Matches,Country\n")
+    clock = [1000.0]
+    monkeypatch.setattr(similarity.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(similarity, '_files_snapshot', None)
+    monkeypatch.setattr(watcher, 'snapshot', lambda: None)
+
+    first = similarity.stats_version()
+    os.utime(path, ns=(1, 1))
+    assert similarity.stats_version() == first
+
+    clock[0] += similarity.settings.WATCH_INTERVAL
+    assert similarity.stats_version() != first
+
+
+def test_stats_version_follows_the_watcher_tokens(monkeypatch):
+    monkeypatch.setattr(watcher, 'snapshot', lambda: {'laliga/2023-24': {'matches': 1, 'stats': 2}})
+    assert similarity.stats_version() == (('laliga/2023-24', 2),)
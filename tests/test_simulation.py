@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import settings, simulation
+
+
+@pytest.mark.parametrize('trials, sizes', [
+    (simulation.BATCH_TRIALS * 3, [simulation.BATCH_TRIALS] * 3),
+    (simulation.BATCH_TRIALS * 2 + 7, [simulation.BATCH_TRIALS, simulation.BATCH_TRIALS, 7]),
+    (7, [7]),
+    (0, []),
+])
+def test_batch_sizes(trials, sizes):
+    assert simulation.batch_sizes(trials) == sizes
+
+
+def test_a_seed_gives_the_same_result_whatever_the_workers(bundled_matches, monkeypatch):
+    trials = simulation.BATCH_TRIALS * 2 + 100
+    monkeypatch.setattr(settings, 'SIMULATION_WORKERS', 1)
+    serial = simulation.SeasonSimulation(bundled_matches, 30, trials, seed=7)
+    monkeypatch.setattr(settings, 'SIMULATION_WORKERS', 2)
+    monkeypatch.setattr(simulation, '_pool', None)
+    pooled = simulation.SeasonSimulation(bundled_matches, 30, trials, seed=7)
+    simulation.pool().shutdown()
+    monkeypatch.setattr(simulation, '_pool', None)
+
+    np.testing.assert_array_equal(serial.counts, pooled.counts)
+    pd.testing.assert_frame_equal(serial.summary(), pooled.summary())
+    assert serial.counts.sum(axis=1).tolist() == [trials] * len(serial.teams)
+
+
+def test_another_seed_gives_another_sample(bundled_matches, monkeypatch):
+    monkeypatch.setattr(settings, 'SIMULATION_WORKERS', 1)
+    first = simulation.SeasonSimulation(bundled_matches, 30, 2000, seed=1)
+    second = simulation.SeasonSimulation(bundled_matches, 30, 2000, seed=2)
+    assert not np.array_equal(first.counts, second.counts)
+
+
+def test_a_finished_season_ends_in_its_final_table(bundled_matches, monkeypatch):
+    monkeypatch.setattr(settings, 'SIMULATION_WORKERS', 1)
+    sim = simulation.SeasonSimulation(bundled_matches, 38, 100, seed=0)
+    assert sim.remaining == 0
+    assert sim.summary()['title'].max() == 1.0
@@ -0,0 +1,90 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import standings
+
+
+def matches_frame(results):
+    """A matches frame from (round, home team, away team, home goals, away goals) tuples."""
+    df = pd.DataFrame(results, columns=['round', 'home_team', 'away_team',
+                                        'full_time_home_team_goals', 'full_time_away_team_goals'])
+    df['utc_time'] = [f"2023-08-{10 + i:02d} 20:00:00+00:00" for i in range(len(df))]
+    df['full_time_result'] = np.select(
+        [df['full_time_home_team_goals'] > df['full_time_away_team_goals'],
+         df['full_time_home_team_goals'] < df['full_time_away_team_goals']],
+        ['H', 'A'], 'D')
+    return df
+
+
+def loop_table(df, last_round, venue='all'):
+    """The league table and form after `last_round`, one match at a time."""
+    totals = defaultdict(lambda: dict.fromkeys(standings.STAT_COLUMNS, 0))
+    results = defaultdict(str)
+    for match in df.sort_values(['round', 'utc_time'], kind='stable').itertuples():
+        sides = [('home', match.home_team, match.full_time_home_team_goals, match.full_time_away_team_goals),
+                 ('away', match.away_team, match.full_time_away_team_goals, match.full_time_home_team_goals)]
+        for side, team, scored, conceded in sides:
+            totals[team]  # Every team gets a row, played or not
+            if match.round > last_round or venue not in ('all', side):
+                continue
+            result = 'W' if scored > conceded else 'D' if scored == conceded else 'L'
+            row = totals[team]
+            row['played'] += 1
+            row['won'] += result == 'W'
+            row['drawn'] += result == 'D'
+            row['lost'] += result == 'L'
+            row['goals_for'] += scored
+            row['goals_against'] += conceded
+            row['points'] += {'W': 3, 'D': 1, 'L': 0}[result]
+            results[team] += result
+
+    ranked = sorted(totals, key=lambda team: (-totals[team]['points'],
+                                              -(totals[team]['goals_for'] - totals[team]['goals_against']),
+                                              -totals[team]['goals_for'], team))
+    rows = [{'position': i, 'team': team, **totals[team],
+             'goal_difference': totals[team]['goals_for'] - totals[team]['goals_against'],
+             'form': results[team][-standings.FORM_LENGTH:]}
+            for i, team in enumerate(ranked, start=1)]
+    return pd.DataFrame(rows)[standings.TABLE_COLUMNS]
+
+
+def teams_in_order(df):
+    return list(standings.Standings(df).table()['team'])
+
+
+def test_points_rank_first():
+    df = matches_frame([(1, 'Alaves', 'Betis', 1, 0), (1, 'Cadiz', 'Deportivo', 5, 5)])
+    assert teams_in_order(df) == ['Alaves', 'Cadiz', 'Deportivo', 'Betis']
+
+
+def test_goal_difference_breaks_points_ties():
+    df = matches_frame([(1, 'Alaves', 'Betis', 1, 0), (1, 'Cadiz', 'Deportivo', 4, 0)])
+    assert teams_in_order(df) == ['Cadiz', 'Alaves', 'Betis', 'Deportivo']
+
+
+def test_goals_for_breaks_goal_difference_ties():
+    df = matches_frame([(1, 'Alaves', 'Betis', 2, 1), (1, 'Cadiz', 'Deportivo', 3, 2)])
+    assert teams_in_order(df) == ['Cadiz', 'Alaves', 'Deportivo', 'Betis']
+
+
+def test_name_breaks_full_ties():
+    df = matches_frame([(1, 'Deportivo', 'Cadiz', 1, 1), (1, 'Betis', 'Alaves', 1, 1)])
+    assert teams_in_order(df) == ['Alaves', 'Betis', 'Cadiz', 'Deportivo']
+
+
+def test_form_is_the_last_results_oldest_first():
+    df = matches_frame([(r, 'Alaves', 'Betis', goals, 1) for r, goals in enumerate([0, 1, 2, 2, 1, 0, 3], start=1)])
+    table = standings.Standings(df).table().set_index('team')
+    assert table.loc['Alaves', 'form'] == 'WWDLW'
+    assert table.loc['Betis', 'form'] == 'LLDWL'
+    assert standings.Standings(df).form(round=2) == ['LD', 'WD']
+
+
+@pytest.mark.parametrize('venue', standings.VENUES)
+@pytest.mark.parametrize('last_round', [1, 7, 19, 38])
+def test_table_matches_a_loop(bundled_matches, venue, last_round):
+    table = standings.Standings(bundled_matches).table(last_round, venue)
+    pd.testing.assert_frame_equal(table, loop_table(bundled_matches, last_round, venue), check_dtype=False)
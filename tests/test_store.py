@@ -0,0 +1,102 @@
+import pandas as pd
+
+from core import store
+
+
+def full_reload(matches_file):
+    """The partition's matches as a fresh process would read them."""
+    partition = matches_file.partition
+    return store.read_table(
+        matches_file.path,
+        derive=lambda df: store.derive_match_columns(df, partition),
+        tag="fresh",
+        index_col=0,
+    )
+
+
+def test_appended_rows_equal_full_reload(matches_file, match_lines):
+    matches_file.write(match_lines[:101])
+    first = store.load_matches(matches_file.partition)
+    version = store.matches_version(matches_file.partition)
+
+    matches_file.append(match_lines[101:])
+    df = store.load_matches(matches_file.partition)
+
+    assert len(first) == 100
+    pd.testing.assert_frame_equal(df, full_reload(matches_file), check_categorical=False)
+    pd.testing.assert_frame_equal(store.matches_since(matches_file.partition, version), df.iloc[100:])
+
+
+def test_partial_line_waits_for_its_newline(matches_file, match_lines):
+    matches_file.write(match_lines[:101])
+    store.load_matches(matches_file.partition)
+
+    line = match_lines[101]
+    matches_file.append([match_lines[101][:20]])
+    assert len(store.load_matches(matches_file.partition)) == 100
+
+    matches_file.append([line[20:]])
+    df = store.load_matches(matches_file.partition)
+    assert len(df) == 101
+    pd.testing.assert_frame_equal(df, full_reload(matches_file), check_categorical=False)
+
+
+def test_truncated_file_is_read_again(matches_file, match_lines):
+    matches_file.write(match_lines[:201])
+    store.load_matches(matches_file.partition)
+    version = store.matches_version(matches_file.partition)
+
+    matches_file.write(match_lines[:101])
+    df = store.load_matches(matches_file.partition)
+
+    assert len(df) == 100
+    pd.testing.assert_frame_equal(df, full_reload(matches_file))
+    assert store.matches_since(matches_file.partition, version) is None
+
+
+def test_rewritten_file_is_read_again(matches_file, match_lines):
+    matches_file.write(match_lines[:101])
+    first = store.load_matches(matches_file.partition)
+    version = store.matches_version(matches_file.partition)
+
+    # Same prefix length, different content, then more lines: not an append
+    lines = [match_lines[0], match_lines[2], match_lines[1], *match_lines[3:151]]
+    matches_file.write(lines)
+    df = store.load_matches(matches_file.partition)
+
+    assert df is not first
+    assert list(df['home_team'].iloc[:2]) == [first['home_team'].iloc[1], first['home_team'].iloc[0]]
+    pd.testing.assert_frame_equal(df, full_reload(matches_file))
+    assert store.matches_since(matches_file.partition, version) is None
+
+
+def test_rows_since_follows_appends_until_a_reload(matches_file, match_lines):
+    matches_file.write(match_lines[:101])
+    store.load_matches(matches_file.partition)
+    v1 = store.matches_version(matches_file.partition)
+    matches_file.append(match_lines[101:151])
+    store.load_matches(matches_file.partition)
+    v2 = store.matches_version(matches_file.partition)
+    matches_file.append(match_lines[151:201])
+    store.load_matches(matches_file.partition)
+
+    assert len(store.matches_since(matches_file.partition, v1)) == 100
+    assert len(store.matches_since(matches_file.partition, v2)) == 50
+
+    matches_file.write([match_lines[0], match_lines[2], match_lines[1], *match_lines[3:201]])
+    store.load_matches(matches_file.partition)
+    assert store.matches_since(matches_file.partition, v1) is None
+    assert store.matches_since(matches_file.partition, v2) is None
+
+
+def test_derived_frames_never_write_into_the_shared_one(matches_file, match_lines):
+    matches_file.write(match_lines[:11])
+    shared = store.load_matches(matches_file.partition)
+    shots = shared['home_team_shots'].copy(deep=True)
+
+    derived = shared[shared['round'] >= 0]
+    derived.loc[:, 'home_team_shots'] = -1
+    column = shared['home_team_shots']
+    column.iloc[0] = -1
+
+    pd.testing.assert_series_equal(store.load_matches(matches_file.partition)['home_team_shots'], shots)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import teams
+
+
+@pytest.fixture(scope="module")
+def index(bundled_matches):
+    return teams.TeamIndex(bundled_matches)
+
+
+def test_one_row_per_team_per_match(index, bundled_matches):
+    table = index.table
+
+    assert len(table) == 2 * len(bundled_matches)
+    assert table['utc_time'].is_monotonic_increasing
+    assert (table.groupby('match').size() == 2).all()
+    assert table['goals_for'].sum() == table['goals_against'].sum()
+    assert table['points'].sum() == sum(
+        3 if result != 'D' else 2 for result in bundled_matches['full_time_result']
+    )
+
+
+def test_rows_match_a_scan_of_the_matches(index, bundled_matches):
+    team, opponent = index.teams[0], index.teams[1]
+    home = bundled_matches['home_team'] == team
+    away = bundled_matches['away_team'] == team
+
+    assert list(index.matches(team)) == list(np.flatnonzero((home | away).to_numpy()))
+    assert list(index.matches(team, 'home')) == list(np.flatnonzero(home.to_numpy()))
+    assert list(index.matches(team, 'away', opponent)) == list(
+        np.flatnonzero((away & (bundled_matches['home_team'] == opponent)).to_numpy())
+    )
+    assert len(index.rows('Nobody FC')) == 0
+
+
+def test_head_to_head(index, bundled_matches):
+    team, opponent = index.teams[0], index.teams[1]
+    games, record = index.head_to_head(team, opponent)
+
+    played = bundled_matches[
+        ((bundled_matches['home_team'] == team) & (bundled_matches['away_team'] == opponent))
+        | ((bundled_matches['home_team'] == opponent) & (bundled_matches['away_team'] == team))
+    ]
+    assert len(games) == len(played) == record['W'] + record['D'] + record['L']
+    goals = np.where(played['home_team'] == team, played['full_time_home_team_goals'], played['full_time_away_team_goals'])
+    assert record['goals_for'] == goals.sum()
+
+
+def test_form_and_rolling(index):
+    team = index.teams[2]
+    games = index.games(team)
+
+    assert index.form(team, n=5) == ''.join(games['result'].astype(str).iloc[-5:])
+    rolling = index.rolling(team, n=3)
+    expected = games['goals_for'].rolling(3, min_periods=1).mean().to_numpy()
+    np.testing.assert_allclose(rolling['goals_for'].to_numpy(), expected)
+
+
+def test_split_adds_up(index):
+    team = index.teams[3]
+    split = index.split(team).set_index('venue')
+
+    assert split.loc['All', 'played'] == split.loc['Home', 'played'] + split.loc['Away', 'played']
+    assert split.loc['All', 'W'] == split.loc['Home', 'W'] + split.loc['Away', 'W']
+    games = index.games(team)
+    assert split.loc['All', 'points'] == round(games['points'].mean(), 2)
+    pd.testing.assert_index_equal(split.index, pd.Index(['All', 'Home', 'Away'], name='venue'))
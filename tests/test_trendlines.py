@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import correlation, trendlines
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 300
+    x = rng.normal(size=n)
+    df = pd.DataFrame({'x': x, 'y': 0.5 * x + rng.normal(size=n), 'z': rng.normal(size=n)})
+    df.loc[::7, 'x'] = np.nan
+    df.loc[::11, 'y'] = np.inf
+    df.loc[::13, 'z'] = np.nan
+    return df
+
+
+def pair_rows(frame, x_col='x', y_col='y'):
+    return frame[[x_col, y_col]].replace([np.inf, -np.inf], np.nan).dropna()
+
+
+@pytest.mark.parametrize('smoother', [trendlines.lowess, trendlines.rolling_mean])
+def test_smoothers_leave_out_non_finite_pairs(frame, smoother):
+    finite = pair_rows(frame)
+    line_x, line_y = smoother(frame['x'].to_numpy(), frame['y'].to_numpy())
+    expected_x, expected_y = smoother(finite['x'].to_numpy(), finite['y'].to_numpy())
+    np.testing.assert_array_equal(line_x, expected_x)
+    np.testing.assert_allclose(line_y, expected_y)
+    assert np.isfinite(line_y).all()
+
+
+def engines(frame):
+    """The engine built from the frame alone, and the one built like the Visualization page's."""
+    moments = correlation.CorrelationEngine.from_frame(frame.assign(round=1, home_team='A', away_team='B'), list(frame.columns))
+    return {
+        'frame': trendlines.TrendlineEngine(frame),
+        'app': trendlines.TrendlineEngine(frame, stats=moments.pairwise_stats()),
+    }
+
+
+@pytest.mark.parametrize('source', ['frame', 'app'])
+@pytest.mark.parametrize('kind', list(trendlines.TRENDLINE_KINDS))
+def test_every_kind_fits_the_pairs_finite_rows(frame, source, kind):
+    # An unrelated column with missing values changes nothing for the x-y pair
+    engine = engines(frame.replace(np.inf, np.nan))[source]
+    finite = pair_rows(frame)
+
+    line_x, line_y, _ = engine.line('x', 'y', kind)
+    expected_x, expected_y, _ = trendlines.TrendlineEngine(finite).line('x', 'y', kind)
+    np.testing.assert_allclose(line_x, expected_x)
+    np.testing.assert_allclose(line_y, expected_y)
+
+
+@pytest.mark.parametrize('source', ['frame', 'app'])
+def test_ols_matches_a_least_squares_fit_of_the_pair(frame, source):
+    engine = engines(frame.replace(np.inf, np.nan))[source]
+    finite = pair_rows(frame)
+    slope, intercept = np.polyfit(finite['x'], finite['y'], 1)
+    assert engine.stats.ols('x', 'y') == pytest.approx((slope, intercept, finite.corr().at['x', 'y'] ** 2))
+    assert engine.stats.n[0, 1] == len(finite)
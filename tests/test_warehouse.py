@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+import pytest
+
+from core import catalog, warehouse
+
+
+PLAYER_FILES = {
+    "player_expected_assists.csv": (
+        "Rank,Player,Team,Expected Assists (xA),Yellow Cards,Minutes,Matches,Country\n"
+        "1,Savio,Girona,9.9,,2989,37,BRA\n"
+        "2,Isco,Real Betis,5.1,4,2000,25,ESP\n"
+        "3,Isco,Real Betis,0.1,0,10,1,ESP\n"
+    ),
+    "player_yellow_card.csv": (
+        "Rank,Player,Team,Yellow Cards,Minutes,Matches,Country\n"
+        "1,Savio,Girona,7,2989,37,BRA\n"
+        "2,Nico Williams,Athletic Club,3,2500,31,ESP\n"
+    ),
+}
+TEAM_FILES = {
+    "accurate_pass_team.csv": "Rank,Team,Accurate Passes per Match,Matches,Country\n1,Valencia CF,400.5,38,ESP\n2,Almería,350.0,38,ESP\n",
+    "clean_sheet_team.csv": "Rank,Team,Clean Sheets,Matches,Country\n1,Almeria,3,38,ESP\n",
+}
+
+
+@pytest.fixture
+def partition(data_dir, request):
+    partition = catalog.Partition("testliga", request.node.name)
+    os.makedirs(catalog.stats_dir(partition))
+    for name, text in {**PLAYER_FILES, **TEAM_FILES}.items():
+        with open(os.path.join(catalog.stats_dir(partition), name), "w", encoding="utf-8") as f:
+            f.write(text)
+    return partition
+
+
+def test_normalize_team_name():
+    assert warehouse.normalize_team_name("Almería") == "Almeria"
+    assert warehouse.normalize_team_name(" Valencia CF ") == "Valencia"
+    assert warehouse.normalize_team_name("Girona") == "Girona"
+
+
+def test_player_table_merges_every_file(partition):
+    players = warehouse.load_players(partition)
+
+    assert list(players.columns) == ["Country", "Minutes", "Matches", "Expected Assists (xA)", "Yellow Cards"]
+    assert list(players.index) == [("Isco", "Real Betis"), ("Nico Williams", "Athletic Club"), ("Savio", "Girona")]
+    # The first non-missing value of a metric found in several files, and a duplicated player's first row
+    assert players.loc[("Savio", "Girona"), "Yellow Cards"] == 7
+    assert players.loc[("Isco", "Real Betis"), "Expected Assists (xA)"] == 5.1
+    assert pd.isna(players.loc[("Nico Williams", "Athletic Club"), "Expected Assists (xA)"])
+    assert players["Minutes"].dtype == "Int32" and players["Country"].dtype == "category"
+
+
+def test_team_table_uses_normalized_names(partition):
+    teams = warehouse.load_teams(partition)
+
+    assert list(teams.index) == ["Almeria", "Valencia"]
+    assert teams.loc["Almeria", "Clean Sheets"] == 3
+    assert warehouse.team_profile("Almería", partition)["Accurate Passes per Match"] == 350.0
+
+
+def test_table_is_shared_until_a_file_changes(partition):
+    players = warehouse.load_players(partition)
+    assert warehouse.load_players(partition) is players
+
+    path = os.path.join(catalog.stats_dir(partition), "player_yellow_card.csv")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("3,Pedri,Barcelona,1,1500,20,ESP\n")
+    os.utime(path, ns=(2_000_000_000 * 10**9, 2_000_000_000 * 10**9))
+
+    reloaded = warehouse.load_players(partition)
+    assert reloaded is not players
+    assert warehouse.player_profile("Pedri", partition=partition).shape[0] == 1
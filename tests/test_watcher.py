@@ -0,0 +1,95 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import correlation, cube, store, watcher
+
+
+@pytest.fixture(scope="module")
+def visualization():
+    """The Visualization page, registered on the app like in production."""
+    importlib.import_module("start")
+    return importlib.import_module("apps.visualization")
+
+
+def record_calls(monkeypatch, obj, name):
+    calls = []
+    method = getattr(obj, name)
+
+    def wrapper(frame):
+        calls.append(len(frame))
+        return method(frame)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+def test_poll_folds_only_new_matches_into_the_cube_and_moments(visualization, matches_file, match_lines, monkeypatch):
+    partition = matches_file.partition
+    matches_file.write(match_lines[:201])
+    trend_cube = visualization.trend_cube(partition)
+    corr_engine, _ = visualization.engines(partition)
+    cube_rows = record_calls(monkeypatch, trend_cube, "add_frame")
+    corr_rows = record_calls(monkeypatch, corr_engine, "add_frame")
+
+    files = watcher.Watcher(interval=3600)
+    files.poll(ingest=False)
+    matches_file.append(match_lines[201:251])
+    assert files.poll() == [(partition, "matches")]
+
+    assert cube_rows == [50] and corr_rows == [50]
+    assert visualization.trend_cube(partition) is trend_cube
+    assert visualization.engines(partition)[0] is corr_engine
+
+    df = store.load_matches(partition)
+    metrics = visualization.numerical_columns(df)
+    fresh_cube = cube.TrendCube.from_frame(df, metrics)
+    for by in visualization.group_by_cols:
+        pd.testing.assert_frame_equal(trend_cube.trend("home_team_shots", by), fresh_cube.trend("home_team_shots", by))
+    fresh_corr = correlation.CorrelationEngine.from_frame(df, metrics)
+    np.testing.assert_allclose(corr_engine.pearson().to_numpy(), fresh_corr.pearson().to_numpy(), equal_nan=True)
+
+
+class StopWatching(BaseException):
+    pass
+
+
+def test_run_survives_failing_polls(monkeypatch, caplog):
+    files = watcher.Watcher(interval=0)
+    polls = []
+
+    def poll():
+        polls.append(None)
+        if len(polls) < 3:
+            raise FileNotFoundError("partition removed")
+        raise StopWatching
+
+    monkeypatch.setattr(files, "poll", poll)
+    with pytest.raises(StopWatching):
+        files.run()
+
+    assert len(polls) == 3
+    assert caplog.text.count("Polling the data files failed") == 2
+
+
+def test_failed_ingest_is_logged(matches_file, match_lines, monkeypatch, caplog):
+    matches_file.write(match_lines[:11])
+    files = watcher.Watcher(interval=3600)
+    files.poll(ingest=False)
+
+    def fail(*args):
+        raise ValueError("caught mid-write")
+
+    monkeypatch.setattr(files, "ingest", fail)
+    matches_file.append(match_lines[11:21])
+    assert files.poll() == [(matches_file.partition, "matches")]
+    assert "Could not ingest" in caplog.text and "caught mid-write" in caplog.text
+
+
+def test_versions_do_not_start_the_watcher(matches_file, match_lines):
+    matches_file.write(match_lines[:11])
+
+    assert watcher.versions(matches_file.partition) == {}
+    assert watcher.snapshot() is None
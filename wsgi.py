@@ -0,0 +1,36 @@
+"""WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Unlike ``python start.py`` (the single-process Flask development server), this
+module is meant to be imported once in a preforking server's master process:
+it loads every partition's matches, the stats warehouse tables and the page
+engines before the workers are forked, so they start with the data already in
+memory and share it with the master instead of each building a private copy.
+"""
+import os
+
+# Memory-mapped Arrow caches and eager warm-up, unless configured otherwise
+os.environ.setdefault("LALIGA_CACHE_FORMAT", "arrow")
+os.environ.setdefault("LALIGA_WARMUP", "eager")
+# Every worker would start its own simulation pool; the workers already use the cores
+os.environ.setdefault("LALIGA_SIMULATION_WORKERS", "1")
+
+from core import catalog, startup, store, warehouse  # noqa: E402
+from start import app  # noqa: E402
+
+
+def preload():
+    """Loads the shared tables of every partition into this process."""
+    for partition in catalog.discover():
+        with startup.timed(f"preload {partition.key}"):
+            if os.path.isdir(os.path.join(partition.path, 'matches')):
+                store.load_matches(partition)
+            if os.path.isdir(catalog.stats_dir(partition)):
+                warehouse.load_players(partition)
+                warehouse.load_teams(partition)
+
+
+preload()
+
+server = app.server